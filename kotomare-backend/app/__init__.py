@@ -17,16 +17,41 @@ def create_app(config_name: str = None):
     from app.config import config
     app.config.from_object(config[config_name])
 
+    # Logging estructurado, métricas, profiling bajo demanda, compresión y plazos por petición
+    from app.utils.log import configure_logging
+    from app.utils.metrics import init_metrics
+    from app.utils.profiling import init_profiling
+    from app.utils.compression import init_compression
+    from app.utils.deadline import init_deadlines
+    configure_logging(app)
+    init_metrics(app)
+    init_profiling(app)
+    init_compression(app)
+    init_deadlines(app)
+
+    # Mirrors y hedging de las fuentes
+    from app.scrapers.mirrors import configure_mirrors
+    configure_mirrors(app)
+
     # Inicializar extensiones
-    from app.extensions import db, jwt, cors
+    from app.extensions import db, jwt, cors, cache, popularity, rate_limiter, password_hasher, thumbnails
     db.init_app(app)
     jwt.init_app(app)
     cors.init_app(app, origins=['http://localhost:3000'])
+    cache.init_app(app)
+    popularity.init_app(app)
+    rate_limiter.init_app(app)
+    password_hasher.init_app(app)
+    thumbnails.init_app(app)
 
     # Registrar rutas
     from app.routes import register_routes
     register_routes(app)
 
+    # Registrar comandos de CLI
+    from app.commands import register_commands
+    register_commands(app)
+
     # Crear tablas de la base de datos
     with app.app_context():
         db.create_all()
@@ -0,0 +1,229 @@
+import asyncio
+import io
+import sys
+from typing import Optional
+from flask import request
+from werkzeug.exceptions import HTTPException
+from app import create_app
+from app.utils.aio import ASYNC_VIEWS, close_http_client, get_executor
+
+
+class AsgiApp:
+    """
+    Sirve la app de Flask por ASGI.
+
+    - Los endpoints con variante registrada con `@async_view` (búsqueda,
+      episodios y videos) se ejecutan como corrutinas en el event loop:
+      mientras esperan a las fuentes externas no ocupan ningún hilo.
+    - El resto de rutas (auth, usuario, health...) se ejecutan tal cual
+      como WSGI en el pool de hilos compartido, igual que antes.
+
+    Los hooks de Flask (métricas, CORS, profiling, JWT, errores) se aplican
+    en ambos casos.
+
+    El cuerpo de las peticiones WSGI no se lee de antemano: la vista lo va
+    recibiendo a medida que lo consume (`request.stream`), así que un import
+    de biblioteca no se guarda entero en memoria. Flask corta con 413 al
+    pasar de MAX_CONTENT_LENGTH.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.executor = get_executor(app)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        if scope['type'] != 'http':
+            raise ValueError(f"Tipo de conexión no soportado: {scope['type']}")
+
+        environ = _build_environ(scope)
+
+        view = self._match_async_view(environ)
+        if view:
+            # Las vistas asíncronas son GET: basta con lo que quepa en el límite
+            environ['wsgi.input'] = io.BytesIO(await _read_body(receive, self.app.config['MAX_CONTENT_LENGTH']))
+            await self._dispatch_async(view, environ, send)
+        else:
+            loop = asyncio.get_running_loop()
+            environ['wsgi.input'] = io.BufferedReader(_ReceiveStream(receive, loop))
+            await loop.run_in_executor(self.executor, self._dispatch_wsgi, environ, send, loop)
+
+    def _match_async_view(self, environ):
+        """Vista asíncrona del endpoint al que va la petición (o None)"""
+        adapter = self.app.url_map.bind_to_environ(environ)
+        try:
+            endpoint, _ = adapter.match()
+        except HTTPException:
+            return None
+        return ASYNC_VIEWS.get(endpoint)
+
+    async def _dispatch_async(self, view, environ, send):
+        """Equivalente a `Flask.full_dispatch_request` con la vista asíncrona"""
+        app = self.app
+
+        with app.request_context(environ):
+            try:
+                try:
+                    rv = app.preprocess_request()
+                    if rv is None:
+                        rv = await view(**request.view_args)
+                except Exception as e:
+                    rv = app.handle_user_exception(e)
+                response = app.finalize_request(rv)
+            except Exception as e:
+                response = app.handle_exception(e)
+
+            try:
+                await send(_response_start(response.status_code, response.headers.to_wsgi_list()))
+                if response.is_streamed:
+                    for chunk in response.iter_encoded():
+                        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                    await send({'type': 'http.response.body'})
+                else:
+                    await send({'type': 'http.response.body', 'body': response.get_data()})
+            finally:
+                response.close()
+
+    def _dispatch_wsgi(self, environ, send, loop):
+        """Ejecuta la app WSGI en un hilo del pool y envía la respuesta por el loop"""
+        def call(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['message'] = _response_start(int(status.split(' ', 1)[0]), headers)
+
+        result = self.app(environ, start_response)
+        try:
+            for chunk in result:
+                if 'message' in started:
+                    call(started.pop('message'))
+                if chunk:
+                    call({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+            if 'message' in started:
+                call(started.pop('message'))
+            call({'type': 'http.response.body'})
+        finally:
+            # Dispara los `call_on_close` (métricas y profiling de la petición)
+            if hasattr(result, 'close'):
+                result.close()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await close_http_client()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+async def _read_body(receive, limit: Optional[int] = None) -> bytes:
+    """
+    Cuerpo completo de la petición, o sus primeros `limit` + 1 bytes si es
+    más largo (lo justo para que Flask responda 413 si la vista lo lee).
+    """
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunk = message.get('body', b'')
+        chunks.append(chunk)
+        size += len(chunk)
+        if not message.get('more_body') or (limit is not None and size > limit):
+            break
+    return b''.join(chunks)
+
+
+class _ReceiveStream(io.RawIOBase):
+    """
+    `wsgi.input` que pide el cuerpo al canal ASGI a medida que se lee.
+
+    Se lee desde el hilo del pool que ejecuta la vista; cada mensaje se
+    pide al event loop y se espera su resultado.
+    """
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._chunk = b''
+        self._offset = 0
+        self._done = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._offset >= len(self._chunk) and not self._done:
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message['type'] == 'http.disconnect':
+                self._done = True
+                break
+            self._chunk, self._offset = message.get('body', b''), 0
+            self._done = not message.get('more_body')
+
+        size = min(len(buffer), len(self._chunk) - self._offset)
+        buffer[:size] = self._chunk[self._offset:self._offset + size]
+        self._offset += size
+        return size
+
+
+def _build_environ(scope) -> dict:
+    """Traduce el scope ASGI a un environ WSGI (PEP 3333)"""
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path.encode('utf-8').decode('latin1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.errors': sys.stderr,
+        # El cuerpo acaba donde acaba el canal ASGI (también sin Content-Length);
+        # así Werkzeug lo lee en streaming y aplica MAX_CONTENT_LENGTH
+        'wsgi.input_terminated': True,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        value = value.decode('latin1')
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+
+    return environ
+
+
+def _response_start(status: int, headers) -> dict:
+    return {
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in headers]
+    }
+
+
+def create_asgi_app(config_name: str = None) -> AsgiApp:
+    """Factory de la aplicación en modo ASGI"""
+    return AsgiApp(create_app(config_name))
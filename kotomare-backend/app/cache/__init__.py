@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import os
+from typing import Any, Optional
+from app.cache.base import CacheBackend
+from app.cache.memory import MemoryCache
+from app.cache.sqlite import SQLiteCache
+from app.utils.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Backends disponibles (CACHE_BACKEND); 'none' desactiva la caché
+CACHE_BACKENDS = {
+    'sqlite': SQLiteCache,
+    'memory': MemoryCache,
+}
+
+
+def create_backend(config) -> Optional[CacheBackend]:
+    """Crea el backend configurado en CACHE_BACKEND"""
+    name = config['CACHE_BACKEND']
+    if not name or name == 'none':
+        return None
+
+    backend_class = CACHE_BACKENDS.get(name)
+    if not backend_class:
+        raise ValueError(f"Backend de caché desconocido: {name}")
+
+    if backend_class is SQLiteCache:
+        return SQLiteCache(config['CACHE_PATH'], max_bytes=config['CACHE_MAX_BYTES'])
+    return backend_class(max_bytes=config['CACHE_MAX_BYTES'])
+
+
+class Cache:
+    """
+    Caché compartida de la app (páginas scrapeadas, búsquedas, videos).
+
+    Las claves llevan un espacio de nombres como prefijo ('page:...',
+    'search:...', 'videos:...') que se usa para las métricas y para el TTL
+    por defecto (CACHE_TTL_<ESPACIO>). Los errores del backend se registran
+    y se tratan como fallos de caché: nunca rompen una petición.
+
+    Se usa también desde hilos sin app context (crawler, scrapers), por eso
+    guarda el backend y los TTL al inicializarse en vez de leer current_app.
+    Desde el event loop (modo ASGI) se usan `get_async`/`set_async`, que
+    llevan el acceso al backend a un hilo.
+    """
+
+    def __init__(self, app=None):
+        self.backend: Optional[CacheBackend] = None
+        self.ttls = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('CACHE_PATH'):
+            app.config['CACHE_PATH'] = os.path.join(app.instance_path, 'cache.db')
+
+        self.backend = create_backend(app.config)
+        self.ttls = {
+            key[len('CACHE_TTL_'):].lower(): value
+            for key, value in app.config.items() if key.startswith('CACHE_TTL_')
+        }
+        app.extensions['cache'] = self
+
+    def ttl(self, namespace: str) -> Optional[float]:
+        return self.ttls.get(namespace)
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.backend is None:
+            return None
+
+        namespace = key.split(':', 1)[0]
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning("Error leyendo de la caché", extra={'key': key, 'error': str(e)})
+            value = None
+
+        CACHE_REQUESTS.inc(cache=namespace, result='miss' if value is None else 'hit')
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        if self.backend is None:
+            return
+
+        if ttl is None:
+            ttl = self.ttl(key.split(':', 1)[0])
+        try:
+            self.backend.set(key, value, ttl)
+        except Exception as e:
+            logger.warning("Error escribiendo en la caché", extra={'key': key, 'error': str(e)})
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """`get` sin bloquear el event loop"""
+        if self.backend is None:
+            return None
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key: str, value: Any, ttl: Optional[float] = None):
+        """`set` sin bloquear el event loop"""
+        if self.backend is None:
+            return
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+    def expires_in(self, key: str) -> Optional[float]:
+        """Vida restante de una entrada (no cuenta como acceso en las métricas)"""
+        if self.backend is None:
+            return None
+        try:
+            return self.backend.expires_in(key)
+        except Exception as e:
+            logger.warning("Error leyendo de la caché", extra={'key': key, 'error': str(e)})
+            return None
+
+    def delete(self, key: str):
+        if self.backend is None:
+            return
+        try:
+            self.backend.delete(key)
+        except Exception as e:
+            logger.warning("Error borrando de la caché", extra={'key': key, 'error': str(e)})
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        if self.backend is None:
+            return {'backend': 'none'}
+        return {'backend': type(self.backend).__name__, **self.backend.stats()}
+
+
+__all__ = ['Cache', 'CacheBackend', 'MemoryCache', 'SQLiteCache', 'CACHE_BACKENDS', 'create_backend']
@@ -0,0 +1,51 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class CacheBackend(ABC):
+    """
+    Interfaz de los backends de caché.
+
+    Los valores se guardan serializados en JSON (deben ser dicts, listas,
+    strings o números) para que puedan compartirse entre procesos.
+    """
+
+    def __init__(self, max_bytes: int, default_ttl: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Retorna el valor guardado o None si no existe o ha caducado"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Guarda un valor durante `ttl` segundos (None = default_ttl)"""
+        pass
+
+    @abstractmethod
+    def expires_in(self, key: str) -> Optional[float]:
+        """Segundos de vida que le quedan a una entrada (None si no existe, inf si no caduca)"""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    def stats(self) -> dict:
+        """Entradas y bytes ocupados (para health/métricas)"""
+        return {}
+
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+    @staticmethod
+    def _loads(data: str) -> Any:
+        return json.loads(data)
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from app.cache.base import CacheBackend
+
+
+class MemoryCache(CacheBackend):
+    """
+    Caché en memoria del proceso (LRU con TTL).
+
+    No se comparte entre workers; pensada para tests y desarrollo.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, default_ttl: Optional[float] = None):
+        super().__init__(max_bytes, default_ttl)
+        self._data = OrderedDict()  # key -> (data, expires_at)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            data, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                return None
+
+            self._data.move_to_end(key)
+        return self._loads(data)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        data = self._dumps(value)
+        if len(data) > self.max_bytes:
+            return
+
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (data, expires_at)
+            self._size += len(data)
+
+            # Expulsar los menos usados hasta caber
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._data)))
+
+    def expires_in(self, key: str) -> Optional[float]:
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at = entry[1]
+        if expires_at is None:
+            return float('inf')
+        remaining = expires_at - time.time()
+        return remaining if remaining > 0 else None
+
+    def delete(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        return {'entries': len(self._data), 'bytes': self._size, 'max_bytes': self.max_bytes}
+
+    def _remove(self, key: str):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[0])
@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+from app.cache.base import CacheBackend
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_cache_accessed_at ON cache (accessed_at);
+'''
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Caché compartida entre procesos del mismo host sobre un fichero SQLite.
+
+    Todos los workers de gunicorn abren el mismo fichero (modo WAL, así
+    que las lecturas no se bloquean entre sí). Las entradas caducan por
+    TTL y, cuando el tamaño total supera `max_bytes`, se expulsan las
+    usadas hace más tiempo (LRU aproximado: `accessed_at` se actualiza
+    como mucho una vez cada `touch_interval` segundos para no escribir en
+    cada lectura).
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, default_ttl: Optional[float] = None,
+                 touch_interval: float = 60, evict_every: int = 100):
+        super().__init__(max_bytes, default_ttl)
+        self.path = path
+        self.touch_interval = touch_interval
+        self.evict_every = evict_every
+        self._local = threading.local()
+        self._writes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Conexión propia de cada hilo (y de cada proceso tras un fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT value, expires_at, accessed_at FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            conn.execute('DELETE FROM cache WHERE key = ? AND expires_at <= ?', (key, now))
+            return None
+
+        if now - accessed_at > self.touch_interval:
+            conn.execute('UPDATE cache SET accessed_at = ? WHERE key = ?', (now, key))
+
+        return self._loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        data = self._dumps(value)
+        size = len(data.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        ttl = ttl if ttl is not None else self.default_ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+
+        self._connect().execute(
+            'INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+            (key, data, size, expires_at, now)
+        )
+
+        # El tamaño total no se mira en cada escritura, solo cada `evict_every`
+        self._writes += 1
+        if self._writes % self.evict_every == 0:
+            self.evict()
+
+    def expires_in(self, key: str) -> Optional[float]:
+        row = self._connect().execute('SELECT expires_at FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[0] is None:
+            return float('inf')
+        remaining = row[0] - time.time()
+        return remaining if remaining > 0 else None
+
+    def delete(self, key: str):
+        self._connect().execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def clear(self):
+        self._connect().execute('DELETE FROM cache')
+
+    def evict(self) -> int:
+        """Borra lo caducado y, si se pasa de tamaño, lo menos usado (hasta el 90%)"""
+        conn = self._connect()
+        removed = conn.execute(
+            'DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?', (time.time(),)
+        ).rowcount
+
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return removed
+
+        target = total - int(self.max_bytes * 0.9)
+        keys, freed = [], 0
+        for key, size in conn.execute('SELECT key, size FROM cache ORDER BY accessed_at'):
+            keys.append(key)
+            freed += size
+            if freed >= target:
+                break
+
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            conn.execute(f"DELETE FROM cache WHERE key IN ({','.join('?' * len(batch))})", batch)
+
+        return removed + len(keys)
+
+    def stats(self) -> dict:
+        entries, size = self._connect().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache'
+        ).fetchone()
+        return {'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes, 'path': self.path}
@@ -0,0 +1,138 @@
+import os
+import click
+
+
+def register_commands(app):
+    """Registra los comandos de CLI (`flask <comando>`)"""
+
+    @app.cli.command('jobs-worker')
+    @click.option('--concurrency', '-c', type=int, default=None, help='Número de hilos worker')
+    @click.option('--poll-interval', type=float, default=None, help='Segundos entre sondeos de la cola')
+    def jobs_worker(concurrency, poll_interval):
+        """Procesa la cola de jobs en segundo plano"""
+        from app.services.job_service import JobWorkerPool
+
+        pool = JobWorkerPool(app, concurrency=concurrency, poll_interval=poll_interval)
+        click.echo(f'Worker de jobs iniciado con {pool.concurrency} hilos')
+        pool.run_forever()
+
+    @app.cli.command('crawl-catalog')
+    @click.option('--source', '-s', default='animeflv', help='Fuente a recorrer')
+    @click.option('--concurrency', '-c', type=int, default=None, help='Páginas descargadas en paralelo')
+    @click.option('--max-pages', type=int, default=None, help='Límite de páginas en esta ejecución')
+    @click.option('--full', is_flag=True, help='No detenerse al llegar a entradas ya conocidas')
+    @click.option('--restart', is_flag=True, help='Ignorar el checkpoint y empezar desde la página 1')
+    def crawl_catalog(source, concurrency, max_pages, full, restart):
+        """Puebla el catálogo recorriendo el directorio de una fuente"""
+        from app.services.crawler_service import CrawlerService
+
+        try:
+            result = CrawlerService.crawl(
+                source,
+                concurrency=concurrency,
+                max_pages=max_pages,
+                full=full,
+                restart=restart,
+                log=click.echo
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(
+            f"Terminado ({result['stopped']}): {result['pages']} páginas, "
+            f"siguiente página {result['checkpoint']['next_page']}"
+        )
+
+    @app.cli.command('refresh-airing')
+    @click.option('--source', '-s', default='animeflv', help='Fuente del feed')
+    @click.option('--interval', type=int, default=None, help='Segundos entre actualizaciones')
+    @click.option('--once', is_flag=True, help='Ejecutar una sola vez y salir')
+    def refresh_airing(source, interval, once):
+        """Actualiza los animes en emisión desde el feed de últimos episodios"""
+        from app.services.airing_service import AiringService
+
+        if once:
+            try:
+                click.echo(AiringService.refresh_from_latest(source))
+            except ValueError as e:
+                raise click.ClickException(str(e))
+            return
+
+        AiringService.run_forever(app, source, interval=interval, log=click.echo)
+
+    @app.cli.command('warm-cache')
+    @click.option('--top', 'top_k', type=int, default=None, help='Entradas más populares por tipo')
+    @click.option('--interval', type=int, default=None, help='Segundos entre pasadas')
+    @click.option('--once', is_flag=True, help='Ejecutar una sola pasada y salir')
+    def warm_cache(top_k, interval, once):
+        """Renueva en la caché lo más pedido antes de que caduque"""
+        from app.services.warming_service import WarmingService
+
+        if once:
+            click.echo(WarmingService.warm(top_k, horizon=interval))
+            return
+
+        WarmingService.run_forever(app, interval=interval, top_k=top_k, log=click.echo)
+
+    @app.cli.command('compute-notifications')
+    def compute_notifications():
+        """Recalcula los avisos de episodios nuevos de todos los usuarios"""
+        from app.services.notification_service import NotificationService
+
+        result = NotificationService.compute_all(log=click.echo)
+        click.echo(f"{result['refreshed']} animes refrescados, {result['notifications']} avisos")
+
+    @app.cli.command('compute-similar')
+    @click.option('--top', 'top_n', type=int, default=None, help='Animes parecidos guardados por anime')
+    @click.option('--full', is_flag=True, help='Recalcular todos, no solo los que han cambiado')
+    def compute_similar(top_n, full):
+        """Precalcula los animes parecidos de cada anime del catálogo"""
+        from app.services.similarity_service import SimilarityService
+
+        result = SimilarityService.compute(top_n=top_n, full=full, log=click.echo)
+        click.echo(
+            f"{result['animes']} animes, {result['changed']} con cambios, "
+            f"{result['recomputed']} recalculados, {result['removed']} eliminados"
+        )
+
+    @app.cli.command('snapshot-export')
+    @click.argument('path', type=click.Path(dir_okay=False))
+    def snapshot_export(path):
+        """Vuelca el catálogo (animes, fuentes y episodios) a un snapshot comprimido"""
+        from app.services.snapshot_service import SnapshotService
+
+        counts = SnapshotService.export(path, log=click.echo)
+        click.echo(f"{path}: {counts['animes']} animes, {counts['episode_lists']} listas de episodios, "
+                   f"{os.path.getsize(path) / 1024 / 1024:.1f} MB")
+
+    @app.cli.command('snapshot-load')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    def snapshot_load(path):
+        """Carga un snapshot del catálogo (en una base vacía conserva los ids)"""
+        import time
+        from app.services.snapshot_service import SnapshotService
+
+        start = time.perf_counter()
+        try:
+            loaded = SnapshotService.load(path, log=click.echo)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"{loaded['animes']} animes y {loaded['episode_lists']} listas de episodios cargados "
+                   f"en {time.perf_counter() - start:.1f}s")
+
+    @app.cli.command('sync-replica')
+    def sync_replica():
+        """Copia la base principal a la réplica (solo SQLite, para desarrollo)"""
+        import sqlite3
+        from app.extensions import db
+        from app.utils.db_routing import REPLICA_BIND
+
+        if REPLICA_BIND not in db.engines:
+            raise click.ClickException('No hay réplica configurada (DATABASE_REPLICA_URL)')
+
+        primary, replica = db.engines[None].url, db.engines[REPLICA_BIND].url
+        if primary.get_backend_name() != 'sqlite' or replica.get_backend_name() != 'sqlite':
+            raise click.ClickException('Solo para SQLite; en producción replica la propia base de datos')
+
+        with sqlite3.connect(primary.database) as source, sqlite3.connect(replica.database) as target:
+            source.backup(target)
+        click.echo(f'{primary.database} -> {replica.database}')
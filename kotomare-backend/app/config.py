@@ -9,15 +9,154 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///kotomare.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Réplica de lectura opcional (ver app/utils/db_routing.py); sin ella todo va a la principal
+    SQLALCHEMY_REPLICA_URI = os.getenv('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': SQLALCHEMY_REPLICA_URI} if SQLALCHEMY_REPLICA_URI else {}
+
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', SECRET_KEY)
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
 
+    # Logging
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # json, text
+
+    # Métricas (/api/metrics); si hay token se exige como Bearer
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+    # Profiling bajo demanda: cabecera X-Profile con el token o 1 de cada N peticiones (0 = nunca)
+    PROFILING_TOKEN = os.getenv('PROFILING_TOKEN')
+    PROFILING_SAMPLE_RATE = int(os.getenv('PROFILING_SAMPLE_RATE', 0))
+    PROFILING_MODE = os.getenv('PROFILING_MODE', 'sampling')  # sampling, cprofile
+    PROFILING_INTERVAL = float(os.getenv('PROFILING_INTERVAL', 0.005))  # segundos entre muestras
+    PROFILING_DIR = os.getenv('PROFILING_DIR', 'profiles')
+
+    # Listas de episodios guardadas
+    EPISODE_LIST_TTL_AIRING = timedelta(hours=int(os.getenv('EPISODE_LIST_TTL_AIRING_HOURS', 6)))
+    EPISODE_LIST_TTL = timedelta(days=int(os.getenv('EPISODE_LIST_TTL_DAYS', 7)))
+    AIRING_REFRESH_INTERVAL = int(os.getenv('AIRING_REFRESH_INTERVAL', 600))  # segundos
+
+    # Cola de jobs en segundo plano
+    JOB_WORKER_CONCURRENCY = int(os.getenv('JOB_WORKER_CONCURRENCY', 4))
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 2))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 5))
+    JOB_RETRY_BASE_DELAY = int(os.getenv('JOB_RETRY_BASE_DELAY', 30))    # segundos
+    JOB_RETRY_MAX_DELAY = int(os.getenv('JOB_RETRY_MAX_DELAY', 3600))    # segundos
+    JOB_STALE_TIMEOUT = int(os.getenv('JOB_STALE_TIMEOUT', 600))         # segundos
+
+    # Crawler del catálogo
+    CRAWLER_CONCURRENCY = int(os.getenv('CRAWLER_CONCURRENCY', 4))
+    CRAWLER_DELAY = float(os.getenv('CRAWLER_DELAY', 1.0))  # segundos entre lotes de páginas
+
+    # Compresión de respuestas (gzip, o br si está instalado brotli) y listas en streaming
+    COMPRESS_BLUEPRINTS = ['anime', 'user', 'auth']
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # bytes
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+    STREAM_MIN_ITEMS = int(os.getenv('STREAM_MIN_ITEMS', 500))  # listas más largas se envían en streaming
+    STREAM_BATCH_SIZE = 200
+
+    # Exportación / importación de bibliotecas (watchlist y favoritos)
+    LIBRARY_EXPORT_BATCH_SIZE = int(os.getenv('LIBRARY_EXPORT_BATCH_SIZE', 500))  # filas leídas por consulta
+    LIBRARY_IMPORT_BATCH_SIZE = int(os.getenv('LIBRARY_IMPORT_BATCH_SIZE', 500))  # entradas por transacción
+    LIBRARY_IMPORT_MAX_ENTRIES = int(os.getenv('LIBRARY_IMPORT_MAX_ENTRIES', 20000))
+
+    # Tamaño máximo del cuerpo de una petición (413 por encima); el import de MAL es el más grande
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 32 * 1024 * 1024))
+
+    # Caché compartida entre workers (sqlite: fichero local común; memory: por proceso; none)
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'sqlite')
+    CACHE_PATH = os.getenv('CACHE_PATH')  # por defecto instance/cache.db
+    CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    CACHE_TTL_PAGE = int(os.getenv('CACHE_TTL_PAGE', 300))        # HTML de fichas scrapeadas
+    CACHE_TTL_SEARCH = int(os.getenv('CACHE_TTL_SEARCH', 600))    # resultados de búsqueda por fuente
+    CACHE_TTL_VIDEOS = int(os.getenv('CACHE_TTL_VIDEOS', 1800))   # servidores de video de un episodio
+
+    # Modo ASGI (asgi.py): hilos para SQLAlchemy/vistas síncronas y cliente HTTP no bloqueante
+    ASGI_THREADS = int(os.getenv('ASGI_THREADS', 16))
+    ASGI_HTTP_MAX_CONNECTIONS = int(os.getenv('ASGI_HTTP_MAX_CONNECTIONS', 200))
+    ASGI_HTTP_TIMEOUT = float(os.getenv('ASGI_HTTP_TIMEOUT', 10))  # segundos
+
+    # Presupuesto de tiempo por petición (segundos) según endpoint; las llamadas a
+    # las fuentes recortan su timeout a lo que queda y se saltan si ya no queda
+    REQUEST_DEADLINES = {
+        'anime.search': float(os.getenv('DEADLINE_SEARCH', 8)),
+        'anime.search_stream': float(os.getenv('DEADLINE_SEARCH', 8)),
+        'anime.get_episodes': float(os.getenv('DEADLINE_EPISODES', 10)),
+        'anime.get_episode_videos': float(os.getenv('DEADLINE_VIDEOS', 10)),
+    }
+    REQUEST_DEADLINE_DEFAULT = float(os.getenv('DEADLINE_DEFAULT', 15))
+
+    # Hash de contraseñas en un pool de procesos aparte (0 = en el hilo de la petición).
+    # Método y coste con el formato de werkzeug; al cambiarlos se rehace el hash en el login
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 32))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 5))  # segundos
+
+    # Límite por cliente (JWT o IP) con ventana deslizante, por worker. 'cheap' cuenta
+    # toda petición (429 al pasarse); 'expensive' las que irían a una fuente externa
+    # (al pasarse se sirven solo datos locales o cacheados)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_WINDOW = int(os.getenv('RATE_LIMIT_WINDOW', 60))  # segundos
+    RATE_LIMIT_CHEAP = int(os.getenv('RATE_LIMIT_CHEAP', 120))
+    RATE_LIMIT_EXPENSIVE = int(os.getenv('RATE_LIMIT_EXPENSIVE', 20))
+    RATE_LIMIT_BLUEPRINTS = ['anime']
+    # Proxies propios delante de la app (0 = ninguno, se usa la IP de la conexión); con N se toma
+    # de X-Forwarded-For la entrada N-ésima por la derecha, la que añadió el proxy más externo
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', 0))
+
+    # Mirrors de las fuentes (URLs base separadas por comas) y peticiones con hedging
+    SCRAPER_MIRRORS = {
+        'animeflv': [url.rstrip('/') for url in os.getenv('ANIMEFLV_MIRRORS', '').split(',') if url],
+    }
+    SCRAPER_HEDGE_ENABLED = os.getenv('SCRAPER_HEDGE_ENABLED', 'true').lower() == 'true'
+    SCRAPER_HEDGE_QUANTILE = float(os.getenv('SCRAPER_HEDGE_QUANTILE', 0.9))
+    SCRAPER_HEDGE_DEFAULT_DELAY = float(os.getenv('SCRAPER_HEDGE_DEFAULT_DELAY', 1.0))  # hasta tener muestras
+    SCRAPER_HEDGE_THREADS = int(os.getenv('SCRAPER_HEDGE_THREADS', 32))
+    SCRAPER_MIRROR_COOLDOWN = int(os.getenv('SCRAPER_MIRROR_COOLDOWN', 30))  # segundos
+
+    # Prefetch de los videos del siguiente episodio (progreso en la watchlist / episodio servido)
+    PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'true').lower() == 'true'
+    PREFETCH_DEPTH = int(os.getenv('PREFETCH_DEPTH', 1))          # episodios por delante (N+1..N+depth)
+    PREFETCH_WORKERS = int(os.getenv('PREFETCH_WORKERS', 2))
+    PREFETCH_MAX_PENDING = int(os.getenv('PREFETCH_MAX_PENDING', 50))
+    PREFETCH_BUDGET_PER_MINUTE = int(os.getenv('PREFETCH_BUDGET_PER_MINUTE', 30))  # por proceso
+
+    # Popularidad (contadores con decaimiento) y calentado de la caché con lo más pedido
+    POPULARITY_HALF_LIFE = int(os.getenv('POPULARITY_HALF_LIFE', 3600))  # segundos
+    POPULARITY_CAPACITY = int(os.getenv('POPULARITY_CAPACITY', 1000))    # claves por tipo
+    POPULARITY_SNAPSHOT_INTERVAL = int(os.getenv('POPULARITY_SNAPSHOT_INTERVAL', 60))
+    WARMING_INTERVAL = int(os.getenv('WARMING_INTERVAL', 300))  # también margen: se renueva lo que caduca antes
+    WARMING_TOP_K = int(os.getenv('WARMING_TOP_K', 20))
+
+    # Animes parecidos (por géneros, tipo y estado), precalculados con `flask compute-similar`
+    SIMILAR_TOP_N = int(os.getenv('SIMILAR_TOP_N', 20))        # guardados por anime
+    SIMILAR_BATCH_SIZE = int(os.getenv('SIMILAR_BATCH_SIZE', 512))  # filas de la matriz por bloque
+
+    # Proxy de portadas con miniaturas en disco (sin Pillow se sirve la original)
+    THUMBNAIL_WIDTHS = [160, 320, 640]
+    THUMBNAIL_CACHE_DIR = os.getenv('THUMBNAIL_CACHE_DIR')  # por defecto instance/thumbnails
+    THUMBNAIL_CACHE_MAX_BYTES = int(os.getenv('THUMBNAIL_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    THUMBNAIL_BASE_URL = os.getenv('THUMBNAIL_BASE_URL', '')  # prefijo de las URLs (p. ej. un CDN)
+    THUMBNAIL_QUALITY = int(os.getenv('THUMBNAIL_QUALITY', 82))  # JPEG
+    THUMBNAIL_FETCH_TIMEOUT = float(os.getenv('THUMBNAIL_FETCH_TIMEOUT', 10))
+    THUMBNAIL_MAX_SOURCE_BYTES = int(os.getenv('THUMBNAIL_MAX_SOURCE_BYTES', 5 * 1024 * 1024))
+    # Hosts de los que se descargan portadas (y sus subdominios); vacío = cualquier host público
+    THUMBNAIL_ALLOWED_HOSTS = [host.strip().lower() for host in os.getenv('THUMBNAIL_ALLOWED_HOSTS', '').split(',')
+                               if host.strip()]
+    THUMBNAIL_MAX_AGE = 365 * 24 * 3600  # Cache-Control de las miniaturas (sus URLs llevan versión)
+
+    # Snapshot del catálogo para arrancar nodos nuevos (flask snapshot-export / snapshot-load)
+    SNAPSHOT_BATCH_SIZE = int(os.getenv('SNAPSHOT_BATCH_SIZE', 1000))  # filas por INSERT
+    SNAPSHOT_GZIP_LEVEL = int(os.getenv('SNAPSHOT_GZIP_LEVEL', 6))
+
 
 class DevelopmentConfig(Config):
     """Configuración de desarrollo"""
     DEBUG = True
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
 
 
 class ProductionConfig(Config):
@@ -29,6 +168,12 @@ class TestingConfig(Config):
     """Configuración de testing"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_BINDS = {}
+    CACHE_BACKEND = 'memory'
+    PREFETCH_ENABLED = False
+    RATE_LIMIT_ENABLED = False
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    PASSWORD_HASH_WORKERS = 0
 
 
 config = {
@@ -1,7 +1,18 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from app.cache import Cache
+from app.utils.passwords import PasswordHasher
+from app.utils.popularity import PopularityTracker
+from app.utils.rate_limit import RateLimiter
+from app.utils.thumbnails import ThumbnailStore
+from app.utils.db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 cors = CORS()
+cache = Cache()
+popularity = PopularityTracker()
+rate_limiter = RateLimiter()
+password_hasher = PasswordHasher()
+thumbnails = ThumbnailStore()
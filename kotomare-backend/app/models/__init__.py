@@ -2,5 +2,11 @@ from app.models.user import User
 from app.models.anime import Anime
 from app.models.favorite import Favorite
 from app.models.watchlist import Watchlist
+from app.models.job import Job
+from app.models.crawl_checkpoint import CrawlCheckpoint
+from app.models.episode_list import EpisodeList
+from app.models.notification import EpisodeNotification
+from app.models.similarity import AnimeSimilarity
 
-__all__ = ['User', 'Anime', 'Favorite', 'Watchlist']
+__all__ = ['User', 'Anime', 'Favorite', 'Watchlist', 'Job', 'CrawlCheckpoint', 'EpisodeList', 'EpisodeNotification',
+           'AnimeSimilarity']
@@ -1,5 +1,6 @@
 from datetime import datetime
-from app.extensions import db
+from sqlalchemy.orm import load_only
+from app.extensions import db, thumbnails
 
 
 class Anime(db.Model):
@@ -40,9 +41,22 @@ class Anime(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Columnas que usan las vistas de listado (tarjetas). La sinopsis y el
+    # JSON de fuentes pesan mucho más que el resto y no se cargan en ellas.
+    SUMMARY_FIELDS = ('id', 'title', 'slug', 'cover_image', 'type', 'status')
+
+    # Columnas que se pueden pedir por separado (selección de campos)
+    FIELDS = ('id', 'title', 'slug', 'synopsis', 'cover_image', 'banner_image', 'status',
+              'type', 'genres', 'sources', 'created_at', 'updated_at')
+
+    # Campos calculados que también se pueden pedir, con las columnas de las que salen
+    DERIVED_FIELDS = {'thumbnails': ('id', 'cover_image')}
+
     # Relaciones
     favorites = db.relationship('Favorite', backref='anime', lazy='dynamic', cascade='all, delete-orphan')
     watchlist_entries = db.relationship('Watchlist', backref='anime', lazy='dynamic', cascade='all, delete-orphan')
+    episode_lists = db.relationship('EpisodeList', backref='anime', lazy='dynamic', cascade='all, delete-orphan')
+    similarity = db.relationship('AnimeSimilarity', uselist=False, cascade='all, delete-orphan')
 
     def add_source(self, source_name, source_data):
         """Añade o actualiza una fuente al anime"""
@@ -65,6 +79,13 @@ class Anime(db.Model):
         """Verifica si el anime tiene una fuente específica"""
         return self.sources and source_name in self.sources
 
+    def is_airing(self):
+        """Indica si el anime sigue en emisión"""
+        if not self.status:
+            return False
+        status = self.status.lower()
+        return 'emision' in status or 'emisión' in status
+
     def to_dict(self, include_sources=True):
         data = {
             'id': self.id,
@@ -76,6 +97,7 @@ class Anime(db.Model):
             'status': self.status,
             'type': self.type,
             'genres': self.genres or [],
+            'thumbnails': thumbnails.urls(self.id, self.cover_image),
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
@@ -83,6 +105,47 @@ class Anime(db.Model):
             data['sources'] = self.sources or {}
         return data
 
+    def to_summary_dict(self):
+        """Versión reducida para listados (SUMMARY_FIELDS y las miniaturas de la portada)"""
+        data = {field: getattr(self, field) for field in self.SUMMARY_FIELDS}
+        data['thumbnails'] = thumbnails.urls(self.id, self.cover_image)
+        return data
+
+    @classmethod
+    def summary_columns(cls):
+        """Columnas de SUMMARY_FIELDS, para proyecciones `db.session.query(*cols)`"""
+        return [getattr(cls, field) for field in cls.SUMMARY_FIELDS]
+
+    @classmethod
+    def summary_from_row(cls, row):
+        """Dict de listado a partir de una fila de `summary_columns()`"""
+        data = dict(zip(cls.SUMMARY_FIELDS, row))
+        data['thumbnails'] = thumbnails.urls(data['id'], data['cover_image'])
+        return data
+
+    @staticmethod
+    def serialize_field(field, value):
+        """Valor de una columna tal como aparece en `to_dict`"""
+        if field == 'genres':
+            return value or []
+        if field == 'sources':
+            return value or {}
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def derive_field(field, values):
+        """Valor de un campo de DERIVED_FIELDS a partir de sus columnas ({columna: valor})"""
+        if field == 'thumbnails':
+            return thumbnails.urls(values['id'], values['cover_image'])
+        raise KeyError(field)
+
+    @classmethod
+    def summary_load(cls):
+        """Opción de carga que difiere las columnas pesadas (sinopsis, fuentes...)"""
+        return load_only(*cls.summary_columns())
+
     @staticmethod
     def generate_slug(title):
         """Genera un slug a partir del título"""
@@ -0,0 +1,39 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class CrawlCheckpoint(db.Model):
+    """Progreso del crawler del directorio de una fuente (para reanudar)"""
+    __tablename__ = 'crawl_checkpoints'
+
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(50), unique=True, nullable=False)
+    next_page = db.Column(db.Integer, default=1)
+    finished = db.Column(db.Boolean, default=False)
+    pages_crawled = db.Column(db.Integer, default=0)
+    animes_created = db.Column(db.Integer, default=0)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def restart(self):
+        """Reinicia el recorrido desde la primera página"""
+        self.next_page = 1
+        self.finished = False
+        self.pages_crawled = 0
+        self.animes_created = 0
+        self.started_at = datetime.utcnow()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'source': self.source,
+            'next_page': self.next_page,
+            'finished': self.finished,
+            'pages_crawled': self.pages_crawled,
+            'animes_created': self.animes_created,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<CrawlCheckpoint {self.source} page={self.next_page} finished={self.finished}>'
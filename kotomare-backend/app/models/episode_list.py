@@ -0,0 +1,40 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class EpisodeList(db.Model):
+    """Lista de episodios de un anime en una fuente, guardada para no re-scrapear"""
+    __tablename__ = 'episode_lists'
+
+    id = db.Column(db.Integer, primary_key=True)
+    anime_id = db.Column(db.Integer, db.ForeignKey('animes.id'), nullable=False)
+    source = db.Column(db.String(50), nullable=False)
+    episodes = db.Column(db.JSON, default=list)            # [{"number": 1, "id": "...", "url": "..."}]
+    episodes_count = db.Column(db.Integer, default=0)
+    last_episode = db.Column(db.Integer, default=0)        # Número del episodio más reciente
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('anime_id', 'source', name='unique_anime_source_episodes'),
+    )
+
+    def set_episodes(self, episodes):
+        """Reemplaza la lista de episodios y recalcula los contadores"""
+        self.episodes = episodes
+        self.episodes_count = len(episodes)
+        self.last_episode = max((ep['number'] for ep in episodes), default=0)
+        self.updated_at = datetime.utcnow()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'anime_id': self.anime_id,
+            'source': self.source,
+            'episodes': self.episodes or [],
+            'episodes_count': self.episodes_count,
+            'last_episode': self.last_episode,
+            'updated_at': self.updated_at.isoformat()
+        }
+
+    def __repr__(self):
+        return f'<EpisodeList anime={self.anime_id} source={self.source} last={self.last_episode}>'
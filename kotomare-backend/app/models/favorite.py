@@ -20,7 +20,7 @@ class Favorite(db.Model):
             'id': self.id,
             'user_id': self.user_id,
             'anime_id': self.anime_id,
-            'anime': self.anime.to_dict(include_sources=False) if self.anime else None,
+            'anime': self.anime.to_summary_dict() if self.anime else None,
             'added_at': self.added_at.isoformat()
         }
 
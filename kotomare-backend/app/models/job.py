@@ -0,0 +1,46 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class Job(db.Model):
+    """Tarea en segundo plano persistida en la cola `jobs`"""
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)        # enrich_anime, ...
+    key = db.Column(db.String(255), nullable=False)        # Identidad para deduplicar
+    payload = db.Column(db.JSON, default=dict)
+    status = db.Column(db.String(20), default='pending', index=True)  # pending, running, done, failed
+    attempts = db.Column(db.Integer, default=0)
+    max_attempts = db.Column(db.Integer, default=5)
+    last_error = db.Column(db.Text, nullable=True)
+    run_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    # Un único job por (tipo, clave): re-encolar reutiliza la fila
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'key', name='unique_job_kind_key'),
+    )
+
+    VALID_STATUSES = ['pending', 'running', 'done', 'failed']
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'key': self.key,
+            'payload': self.payload or {},
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'last_error': self.last_error,
+            'run_at': self.run_at.isoformat() if self.run_at else None,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<Job {self.kind}:{self.key} status={self.status}>'
@@ -0,0 +1,37 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class EpisodeNotification(db.Model):
+    """Episodios nuevos sin ver de un anime de la watchlist (materializado en batch)"""
+    __tablename__ = 'episode_notifications'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    anime_id = db.Column(db.Integer, db.ForeignKey('animes.id'), nullable=False)
+    source = db.Column(db.String(50), nullable=False)
+    last_seen_episode = db.Column(db.Integer, default=0)   # Watchlist.last_episode al calcular
+    latest_episode = db.Column(db.Integer, default=0)      # Último episodio publicado en la fuente
+    unseen_count = db.Column(db.Integer, default=0)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'anime_id', name='unique_user_anime_notification'),
+    )
+
+    anime = db.relationship('Anime')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'anime_id': self.anime_id,
+            'anime': self.anime.to_summary_dict() if self.anime else None,
+            'source': self.source,
+            'last_seen_episode': self.last_seen_episode,
+            'latest_episode': self.latest_episode,
+            'unseen_count': self.unseen_count,
+            'computed_at': self.computed_at.isoformat()
+        }
+
+    def __repr__(self):
+        return f'<EpisodeNotification user={self.user_id} anime={self.anime_id} unseen={self.unseen_count}>'
@@ -0,0 +1,22 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class AnimeSimilarity(db.Model):
+    """Animes más parecidos a uno (por géneros, tipo y estado), precalculados en batch"""
+    __tablename__ = 'anime_similarities'
+
+    anime_id = db.Column(db.Integer, db.ForeignKey('animes.id'), primary_key=True)
+    signature = db.Column(db.String(40), nullable=False)  # Hash de los rasgos usados al calcular
+    similar = db.Column(db.JSON, default=list)             # [[anime_id, puntuación], ...] de mayor a menor
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'anime_id': self.anime_id,
+            'similar': [{'anime_id': anime_id, 'score': score} for anime_id, score in self.similar or []],
+            'computed_at': self.computed_at.isoformat()
+        }
+
+    def __repr__(self):
+        return f'<AnimeSimilarity anime={self.anime_id} similar={len(self.similar or [])}>'
@@ -1,6 +1,5 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
-from app.extensions import db
+from app.extensions import db, password_hasher
 
 
 class User(db.Model):
@@ -22,10 +21,14 @@ class User(db.Model):
     watchlist = db.relationship('Watchlist', backref='user', lazy='dynamic', cascade='all, delete-orphan')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """Si el hash es de otro algoritmo o coste que PASSWORD_HASH_METHOD"""
+        return password_hasher.needs_rehash(self.password_hash)
 
     def to_dict(self):
         return {
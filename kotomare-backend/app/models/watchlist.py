@@ -41,7 +41,7 @@ class Watchlist(db.Model):
             'id': self.id,
             'user_id': self.user_id,
             'anime_id': self.anime_id,
-            'anime': self.anime.to_dict(include_sources=False) if self.anime else None,
+            'anime': self.anime.to_summary_dict() if self.anime else None,
             'last_episode': self.last_episode,
             'status': self.status,
             'preferred_source': self.preferred_source,
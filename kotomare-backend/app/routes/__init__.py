@@ -5,6 +5,8 @@ from app.routes.health import bp as health_bp
 from app.routes.auth import bp as auth_bp
 from app.routes.anime import bp as anime_bp
 from app.routes.user import bp as user_bp
+from app.routes.metrics import bp as metrics_bp
+from app.routes.images import bp as images_bp
 
 
 def register_routes(app):
@@ -13,3 +15,5 @@ def register_routes(app):
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(anime_bp, url_prefix='/api/anime')
     app.register_blueprint(user_bp, url_prefix='/api/user')
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(images_bp, url_prefix='/api/images')
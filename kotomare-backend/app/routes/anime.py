@@ -1,40 +1,198 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
+import json
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+from app.extensions import db, popularity
 from app.models import Anime, User
 from app.services.anime_service import AnimeService
+from app.services.prefetch_service import PrefetchService
+from app.services.similarity_service import SimilarityService
+from app.utils import deadline
+from app.utils.aio import async_view, run_sync
+from app.utils.db_routing import read_only
+from app.utils.json_stream import list_response
 
 bp = Blueprint('anime', __name__)
 
+# Máximo de animes por petición a /batch
+BATCH_MAX_ITEMS = 100
 
-@bp.route('/search', methods=['GET'])
-@jwt_required(optional=True)
-def search():
-    """Busca animes por nombre"""
-    query = request.args.get('q', '').strip()
-
-    if not query or len(query) < 3:
-        return jsonify({'error': 'La búsqueda debe tener al menos 3 caracteres'}), 400
 
-    # Obtener fuentes activas del usuario (o usar todas por defecto)
-    user_id = get_jwt_identity()
-    sources = None
+def _get_user_sources(user_id=None):
+    """Obtiene las fuentes activas del usuario (None = todas)"""
+    user_id = user_id or get_jwt_identity()
 
     if user_id:
         user = User.query.get(user_id)
         if user and user.settings:
-            sources = user.settings.get('sources')
+            return user.settings.get('sources')
 
-    results = AnimeService.search(query, sources=sources)
+    return None
 
-    return jsonify({
+
+def _with_cut_off(payload: dict) -> dict:
+    """Añade a la respuesta las fuentes que se quedaron sin tiempo (siempre, vacía si ninguna)"""
+    payload['cut_off'] = deadline.cut_off_sources()
+    return payload
+
+
+def _search_query():
+    """Término de búsqueda de la petición y, si no es válido, la respuesta de error"""
+    query = request.args.get('q', '').strip()
+
+    if not query or len(query) < 3:
+        return query, (jsonify({'error': 'La búsqueda debe tener al menos 3 caracteres'}), 400)
+
+    popularity.record('search', AnimeService.normalize_query(query))
+    return query, None
+
+
+def _search_response(query: str, results: list):
+    return jsonify(_with_cut_off({
         'query': query,
         'results': results,
         'count': len(results)
+    }))
+
+
+def _source_param() -> str:
+    return request.args.get('source', 'animeflv')
+
+
+def _episodes_response(slug: str, source: str, result):
+    """Respuesta de /<slug>/episodes a partir del resultado del servicio (None = no existe)"""
+    if result is None:
+        return jsonify({'error': 'Anime no encontrado'}), 404
+
+    popularity.record('episodes', f'{source}:{slug}')
+
+    return list_response(
+        _with_cut_off({'anime_id': result['anime_id'], 'source': source}), 'episodes', result['episodes'],
+        count_key=None
+    )
+
+
+def _videos_response(slug: str, episode_number: int, source: str, result):
+    """Respuesta de /<slug>/episode/<n> a partir del resultado del servicio (None = no existe)"""
+    if result is None:
+        return jsonify({'error': 'Anime no encontrado'}), 404
+
+    popularity.record('videos', f'{source}:{slug}:{episode_number}')
+
+    return jsonify(_with_cut_off({
+        'anime_id': result['anime_id'],
+        'episode': episode_number,
+        'source': source,
+        'videos': result['videos']
+    }))
+
+
+def _split_param(value):
+    """'a, b,c' -> ['a', 'b', 'c'] (None si no viene)"""
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+@bp.route('/search', methods=['GET'])
+@jwt_required(optional=True)
+def search():
+    """Busca animes por nombre"""
+    query, error = _search_query()
+    if error:
+        return error
+
+    # Obtener fuentes activas del usuario (o usar todas por defecto)
+    sources = _get_user_sources()
+
+    return _search_response(query, AnimeService.search(query, sources=sources))
+
+
+@bp.route('/search/stream', methods=['GET'])
+@jwt_required(optional=True)
+def search_stream():
+    """
+    Busca animes por nombre emitiendo los resultados por fuente (NDJSON).
+
+    Cada línea es un objeto JSON: primero los resultados de la DB local,
+    luego uno por fuente externa y al final un resumen.
+    """
+    query, error = _search_query()
+    if error:
+        return error
+
+    sources = _get_user_sources()
+    request_deadline = deadline.current_deadline()
+
+    def generate():
+        deadline.use_deadline(request_deadline)
+        for chunk in AnimeService.search_stream(query, sources=sources):
+            yield json.dumps({'query': query, **chunk}) + '\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@bp.route('/batch', methods=['GET', 'POST'])
+@read_only
+def get_batch():
+    """
+    Obtiene varios animes de una vez, en el mismo orden en que se piden.
+
+    GET  /batch?ids=1,2,3&fields=id,title,cover_image
+    GET  /batch?slugs=naruto,one-piece
+    POST /batch  {"ids": [1, 2, 3], "fields": ["id", "title"]}
+
+    Sin `fields` se devuelven las columnas de listado y las miniaturas
+    (`thumbnails`, que también se puede pedir en `fields`). Los que no existen
+    aparecen como null en su posición y se listan en `missing`.
+    """
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        ids, slugs, fields = data.get('ids'), data.get('slugs'), data.get('fields')
+    else:
+        ids = _split_param(request.args.get('ids'))
+        slugs = _split_param(request.args.get('slugs'))
+        fields = _split_param(request.args.get('fields'))
+
+    if bool(ids) == bool(slugs):
+        return jsonify({'error': 'Indica ids o slugs (uno de los dos)'}), 400
+
+    keys, by = (ids, 'id') if ids else (slugs, 'slug')
+    if not isinstance(keys, list) or len(keys) > BATCH_MAX_ITEMS:
+        return jsonify({'error': f'Se aceptan como máximo {BATCH_MAX_ITEMS} animes por petición'}), 400
+
+    if by == 'id':
+        try:
+            keys = [int(key) for key in keys]
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Los ids deben ser números'}), 400
+    else:
+        keys = [str(key) for key in keys]
+
+    if fields is not None:
+        if not isinstance(fields, list) or not fields:
+            return jsonify({'error': 'fields debe ser una lista de campos'}), 400
+        unknown = [
+            field for field in fields
+            if not isinstance(field, str) or (field not in Anime.FIELDS and field not in Anime.DERIVED_FIELDS)
+        ]
+        if unknown:
+            return jsonify({'error': f"Campos desconocidos: {', '.join(map(str, unknown))}"}), 400
+
+    animes = AnimeService.get_many(keys, by=by, fields=fields)
+
+    return jsonify({
+        'animes': animes,
+        'count': sum(1 for anime in animes if anime is not None),
+        'missing': [key for key, anime in zip(keys, animes) if anime is None]
     })
 
 
 @bp.route('/<slug>', methods=['GET'])
+@read_only
 def get_anime(slug):
     """Obtiene el detalle de un anime por su slug"""
     anime = Anime.query.filter_by(slug=slug).first()
@@ -45,40 +203,81 @@ def get_anime(slug):
     return jsonify({'anime': anime.to_dict()})
 
 
-@bp.route('/<slug>/episodes', methods=['GET'])
-def get_episodes(slug):
-    """Obtiene los episodios de un anime"""
-    source = request.args.get('source', 'animeflv')
+@bp.route('/<slug>/similar', methods=['GET'])
+@read_only
+def get_similar(slug):
+    """
+    Animes parecidos por géneros, tipo y estado, de más a menos.
 
-    anime = Anime.query.filter_by(slug=slug).first()
+    GET /<slug>/similar?limit=10
+
+    Se leen de la tabla que precalcula `flask compute-similar`; un anime
+    que aún no ha pasado por el cálculo devuelve la lista vacía.
+    """
+    anime = Anime.query.options(Anime.summary_load()).filter_by(slug=slug).first()
 
     if not anime:
         return jsonify({'error': 'Anime no encontrado'}), 404
 
-    episodes = AnimeService.get_episodes(anime, source=source)
+    limit = max(1, min(request.args.get('limit', 10, type=int), current_app.config['SIMILAR_TOP_N']))
+    similar = SimilarityService.get_similar(anime, limit)
 
-    return jsonify({
-        'anime_id': anime.id,
-        'source': source,
-        'episodes': episodes
-    })
+    return jsonify({'anime_id': anime.id, 'similar': similar, 'count': len(similar)})
+
+
+@bp.route('/<slug>/episodes', methods=['GET'])
+def get_episodes(slug):
+    """Obtiene los episodios de un anime"""
+    source = _source_param()
+    return _episodes_response(slug, source, AnimeService.get_episodes(slug, source=source))
 
 
 @bp.route('/<slug>/episode/<int:episode_number>', methods=['GET'])
 def get_episode_videos(slug, episode_number):
     """Obtiene los videos de un episodio específico"""
-    source = request.args.get('source', 'animeflv')
+    source = _source_param()
 
-    anime = Anime.query.filter_by(slug=slug).first()
+    result = AnimeService.get_episode_videos(slug, episode_number, source=source)
+    if result and result['videos']:
+        PrefetchService.schedule(source, result['source_id'], episode_number, result['episodes_count'])
 
-    if not anime:
-        return jsonify({'error': 'Anime no encontrado'}), 404
+    return _videos_response(slug, episode_number, source, result)
 
-    videos = AnimeService.get_episode_videos(anime, episode_number, source=source)
 
-    return jsonify({
-        'anime_id': anime.id,
-        'episode': episode_number,
-        'source': source,
-        'videos': videos
-    })
+# Variantes asíncronas de los endpoints que esperan a las fuentes externas.
+# Solo se usan al servir con ASGI (asgi.py); la DB se usa desde el pool de
+# hilos con `run_sync` y las fuentes con el cliente HTTP no bloqueante.
+# Validación y respuesta son las mismas que en las vistas síncronas.
+
+@async_view('anime.search')
+async def search_async():
+    """Busca animes por nombre (ASGI)"""
+    query, error = _search_query()
+    if error:
+        return error
+
+    verify_jwt_in_request(optional=True)
+    user_id = get_jwt_identity()
+    sources = await run_sync(_get_user_sources, user_id) if user_id else None
+
+    return _search_response(query, await AnimeService.search_async(query, sources=sources))
+
+
+@async_view('anime.get_episodes')
+async def get_episodes_async(slug):
+    """Obtiene los episodios de un anime (ASGI)"""
+    source = _source_param()
+    return _episodes_response(slug, source, await AnimeService.get_episodes_async(slug, source=source))
+
+
+@async_view('anime.get_episode_videos')
+async def get_episode_videos_async(slug, episode_number):
+    """Obtiene los videos de un episodio específico (ASGI)"""
+    source = _source_param()
+
+    result = await AnimeService.get_episode_videos_async(slug, episode_number, source=source)
+    if result and result['videos']:
+        # Mira la caché (SQLite) por cada episodio siguiente: fuera del event loop
+        await run_sync(PrefetchService.schedule, source, result['source_id'], episode_number, result['episodes_count'])
+
+    return _videos_response(slug, episode_number, source, result)
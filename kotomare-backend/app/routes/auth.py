@@ -61,6 +61,11 @@ def login():
     if not user or not user.check_password(password):
         return jsonify({'error': 'Credenciales inválidas'}), 401
 
+    # Ya tenemos la contraseña en claro: se aprovecha para migrar hashes antiguos
+    if user.password_needs_rehash():
+        user.set_password(password)
+        db.session.commit()
+
     access_token = create_access_token(identity=str(user.id))
     refresh_token = create_refresh_token(identity=str(user.id))
 
@@ -1,7 +1,10 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+from app.routes.metrics import metrics_token_required
 
 bp = Blueprint('health', __name__)
 
+POPULARITY_TOP_MAX = 100
+
 
 @bp.route('/')
 def index():
@@ -15,3 +18,50 @@ def index():
 @bp.route('/api/health')
 def health():
     return jsonify({'status': 'ok'})
+
+
+@bp.route('/api/health/jobs')
+def jobs():
+    """Profundidad de la cola de jobs y latencia de ejecución"""
+    from app.services.job_service import JobService
+    return jsonify(JobService.get_stats())
+
+
+@bp.route('/api/health/cache')
+def cache():
+    """Backend de caché y ocupación"""
+    from app.extensions import cache
+    return jsonify(cache.stats())
+
+
+@bp.route('/api/health/thumbnails')
+def thumbnails():
+    """Ocupación de la caché en disco de miniaturas de portadas"""
+    from app.extensions import thumbnails
+    return jsonify(thumbnails.stats())
+
+
+@bp.route('/api/health/popularity')
+@metrics_token_required
+def popularity():
+    """
+    Lo más pedido según los contadores de popularidad de este proceso.
+
+    Incluye las búsquedas de los usuarios, así que va con el mismo token que
+    /api/metrics.
+    """
+    from app.extensions import popularity
+    from app.utils.popularity import KINDS
+
+    top_k = max(1, min(request.args.get('top', 10, type=int), POPULARITY_TOP_MAX))
+    return jsonify({
+        kind: [{'key': key, 'score': round(score, 3)} for key, score in popularity.top(kind, top_k)]
+        for kind in KINDS
+    })
+
+
+@bp.route('/api/health/scrapers')
+def scrapers():
+    """Latencia y estado de los mirrors de cada fuente"""
+    from app.scrapers.mirrors import mirror_stats
+    return jsonify(mirror_stats())
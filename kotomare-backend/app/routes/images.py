@@ -0,0 +1,39 @@
+from flask import Blueprint, jsonify, redirect, request, send_file
+from app.extensions import db, thumbnails
+from app.models import Anime
+from app.utils.db_routing import read_only
+
+bp = Blueprint('images', __name__)
+
+# Cache-Control de las respuestas que no se pueden marcar como inmutables
+# (versión de la URL desfasada, o redirección a la portada original)
+SHORT_MAX_AGE = 300
+
+
+@bp.route('/cover/<int:anime_id>/<int:width>', methods=['GET'])
+@read_only
+def cover(anime_id, width):
+    """
+    Miniatura de la portada de un anime (las URLs salen de `thumbnails` en
+    los dicts de Anime). Si la portada no se puede descargar se redirige a
+    la original.
+    """
+    if width not in thumbnails.widths:
+        return jsonify({'error': f'Ancho no disponible. Válidos: {list(thumbnails.widths)}'}), 404
+
+    cover_image = db.session.query(Anime.cover_image).filter(Anime.id == anime_id).scalar()
+    if not cover_image:
+        return jsonify({'error': 'Portada no encontrada'}), 404
+
+    result = thumbnails.get(cover_image, width)
+    if result is None:
+        response = redirect(cover_image)
+        response.cache_control.max_age = SHORT_MAX_AGE
+        return response
+
+    path, mimetype = result
+    current = request.args.get('v') == thumbnails.version(cover_image)
+    response = send_file(path, mimetype=mimetype, max_age=thumbnails.max_age if current else SHORT_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = current
+    return response
@@ -0,0 +1,23 @@
+from functools import wraps
+from flask import Blueprint, Response, current_app, jsonify, request
+from app.utils.metrics import REGISTRY
+
+bp = Blueprint('metrics', __name__)
+
+
+def metrics_token_required(view):
+    """Si hay METRICS_TOKEN, exige `Authorization: Bearer <token>` (endpoints de operación)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = current_app.config['METRICS_TOKEN']
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return jsonify({'error': 'No autorizado'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@bp.route('/api/metrics')
+@metrics_token_required
+def metrics():
+    """Exporta las métricas en formato de texto de Prometheus"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
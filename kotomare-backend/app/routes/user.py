@@ -1,15 +1,34 @@
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import joinedload
 from app.extensions import db
 from app.models import User, Anime, Favorite, Watchlist
+from app.services.library_service import LibraryService
+from app.services.notification_service import NotificationService
+from app.services.prefetch_service import PrefetchService
+from app.utils.db_routing import read_only
+from app.utils.json_stream import list_response
 
 bp = Blueprint('user', __name__)
 
 
+def _parse_last_episode(value):
+    """Episodio como entero no negativo ('3' también vale); None si no es válido"""
+    if isinstance(value, bool):
+        return None
+    try:
+        episode = int(value)
+    except (TypeError, ValueError):
+        return None
+    return episode if episode >= 0 else None
+
+
 # ==================== SETTINGS ====================
 
 @bp.route('/settings', methods=['GET'])
 @jwt_required()
+@read_only
 def get_settings():
     """Obtiene la configuración del usuario"""
     user = User.query.get(int(get_jwt_identity()))
@@ -43,15 +62,15 @@ def update_settings():
 
 @bp.route('/favorites', methods=['GET'])
 @jwt_required()
+@read_only
 def get_favorites():
     """Obtiene los favoritos del usuario"""
     user_id = int(get_jwt_identity())
-    favorites = Favorite.query.filter_by(user_id=user_id).all()
+    favorites = Favorite.query.filter_by(user_id=user_id).options(
+        joinedload(Favorite.anime).options(Anime.summary_load())
+    )
 
-    return jsonify({
-        'favorites': [f.to_dict() for f in favorites],
-        'count': len(favorites)
-    })
+    return list_response({}, 'favorites', favorites, serialize=Favorite.to_dict)
 
 
 @bp.route('/favorites/<int:anime_id>', methods=['POST'])
@@ -98,21 +117,19 @@ def remove_favorite(anime_id):
 
 @bp.route('/watchlist', methods=['GET'])
 @jwt_required()
+@read_only
 def get_watchlist():
     """Obtiene la watchlist del usuario"""
     user_id = int(get_jwt_identity())
     status = request.args.get('status')  # Filtrar por status opcional
 
-    query = Watchlist.query.filter_by(user_id=user_id)
+    query = Watchlist.query.filter_by(user_id=user_id).options(
+        joinedload(Watchlist.anime).options(Anime.summary_load())
+    )
     if status:
         query = query.filter_by(status=status)
 
-    entries = query.all()
-
-    return jsonify({
-        'watchlist': [e.to_dict() for e in entries],
-        'count': len(entries)
-    })
+    return list_response({}, 'watchlist', query, serialize=Watchlist.to_dict)
 
 
 @bp.route('/watchlist/<int:anime_id>', methods=['POST'])
@@ -163,6 +180,11 @@ def update_watchlist_entry(anime_id):
     if not entry:
         return jsonify({'error': 'El anime no está en la watchlist'}), 404
 
+    if 'last_episode' in data:
+        last_episode = _parse_last_episode(data['last_episode'])
+        if last_episode is None:
+            return jsonify({'error': 'last_episode debe ser un número entero no negativo'}), 400
+
     if 'status' in data:
         if data['status'] not in Watchlist.VALID_STATUSES:
             return jsonify({'error': f'Status inválido. Válidos: {Watchlist.VALID_STATUSES}'}), 400
@@ -171,7 +193,7 @@ def update_watchlist_entry(anime_id):
             entry.mark_completed()
 
     if 'last_episode' in data:
-        entry.update_progress(data['last_episode'])
+        entry.update_progress(last_episode)
 
     if 'preferred_source' in data:
         entry.preferred_source = data['preferred_source']
@@ -179,8 +201,14 @@ def update_watchlist_entry(anime_id):
     if 'notes' in data:
         entry.notes = data['notes']
 
+    if 'status' in data or 'last_episode' in data:
+        NotificationService.sync_entry(entry)
+
     db.session.commit()
 
+    if 'last_episode' in data:
+        PrefetchService.schedule_for_anime(entry.anime, entry.last_episode, entry.preferred_source)
+
     return jsonify({
         'message': 'Watchlist actualizada',
         'entry': entry.to_dict()
@@ -201,3 +229,69 @@ def remove_from_watchlist(anime_id):
     db.session.commit()
 
     return jsonify({'message': 'Anime eliminado de la watchlist'})
+
+
+# ==================== LIBRARY ====================
+
+@bp.route('/library/export', methods=['GET'])
+@jwt_required()
+@read_only
+def export_library():
+    """Descarga la watchlist y los favoritos del usuario en NDJSON (en streaming)"""
+    user = User.query.get(int(get_jwt_identity()))
+
+    return Response(
+        stream_with_context(LibraryService.export_lines(user)),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=kotomare-library.ndjson'}
+    )
+
+
+@bp.route('/library/import', methods=['POST'])
+@jwt_required()
+def import_library():
+    """
+    Importa una biblioteca: export XML de MyAnimeList o NDJSON de /library/export.
+
+    POST /library/import?format=mal|ndjson&overwrite=true   (cuerpo: el archivo)
+
+    Sin `format` se deduce del Content-Type. La respuesta es NDJSON con el
+    progreso por lotes; la última línea es el resumen, con los títulos que
+    no se encontraron en el catálogo, o {"stage": "error"} si un lote falló.
+    """
+    user_id = int(get_jwt_identity())
+    fmt = request.args.get('format') or ('mal' if 'xml' in (request.mimetype or '') else 'ndjson')
+    if fmt not in ('mal', 'ndjson'):
+        return jsonify({'error': 'Formato inválido. Válidos: mal, ndjson'}), 400
+    overwrite = request.args.get('overwrite', 'false').lower() == 'true'
+
+    entries, error = LibraryService.read_entries(request.stream, fmt)
+    if error:
+        return jsonify({'error': error}), 400
+
+    def generate():
+        for progress in LibraryService.import_entries(user_id, entries, overwrite=overwrite):
+            yield json.dumps(progress, ensure_ascii=False) + '\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+# ==================== NOTIFICATIONS ====================
+
+@bp.route('/notifications', methods=['GET'])
+@jwt_required()
+@read_only
+def get_notifications():
+    """Obtiene los animes de la watchlist con episodios nuevos sin ver"""
+    user_id = int(get_jwt_identity())
+    notifications = NotificationService.get_for_user(user_id)
+
+    return jsonify({
+        'notifications': [n.to_dict() for n in notifications],
+        'count': len(notifications),
+        'unseen_total': sum(n.unseen_count for n in notifications)
+    })
@@ -10,15 +10,44 @@ class AnimeFLVScraper(BaseScraper):
 
     name = "animeflv"
     base_url = "https://www3.animeflv.net"
+    supports_browse = True
+    supports_latest = True
 
     def search(self, query: str) -> List[Dict]:
         """Busca animes en AnimeFLV"""
         url = f"{self.base_url}/browse?q={query}"
-        html = self._make_request(url)
+        html = self._make_request(url, operation='search')
 
         if not html:
             return []
 
+        with self._parse_timer('search'):
+            return self._parse_anime_list(html)
+
+    async def search_async(self, query: str) -> List[Dict]:
+        """Busca animes en AnimeFLV sin bloquear el event loop"""
+        url = f"{self.base_url}/browse?q={query}"
+        html = await self._make_request_async(url, operation='search')
+
+        if not html:
+            return []
+
+        with self._parse_timer('search'):
+            return self._parse_anime_list(html)
+
+    def browse(self, page: int = 1, order: str = 'added') -> Optional[List[Dict]]:
+        """Obtiene una página del directorio de AnimeFLV (más recientes primero)"""
+        url = f"{self.base_url}/browse?order={order}&page={page}"
+        html = self._make_request(url, operation='browse')
+
+        if not html:
+            return None
+
+        with self._parse_timer('browse'):
+            return self._parse_anime_list(html)
+
+    def _parse_anime_list(self, html: str) -> List[Dict]:
+        """Parsea un listado de animes (búsqueda o directorio)"""
         soup = BeautifulSoup(html, 'html.parser')
         results = []
 
@@ -69,7 +98,7 @@ class AnimeFLVScraper(BaseScraper):
                 })
 
             except Exception as e:
-                print(f"Error parseando anime: {e}")
+                self._parse_error('list', e)
                 continue
 
         return results
@@ -77,11 +106,16 @@ class AnimeFLVScraper(BaseScraper):
     def get_anime_detail(self, anime_id: str) -> Optional[Dict]:
         """Obtiene el detalle de un anime"""
         url = f"{self.base_url}/anime/{anime_id}"
-        html = self._make_request(url)
+        html = self._make_request(url, operation='detail', cache=True)
 
         if not html:
             return None
 
+        with self._parse_timer('detail'):
+            return self._parse_anime_detail(html, anime_id, url)
+
+    def _parse_anime_detail(self, html: str, anime_id: str, url: str) -> Optional[Dict]:
+        """Parsea la ficha de un anime"""
         soup = BeautifulSoup(html, 'html.parser')
 
         try:
@@ -153,10 +187,10 @@ class AnimeFLVScraper(BaseScraper):
             scripts = soup.find_all('script')
             for script in scripts:
                 if script.string and 'var episodes' in script.string:
-                    match = re.search(r'var episodes = \[(.*?)\]', script.string, re.DOTALL)
+                    match = re.search(r'var episodes = \[(.*?)\];', script.string, re.DOTALL)
                     if match:
                         episodes_data = match.group(1)
-                        episodes_count = len(re.findall(r'\[', episodes_data))
+                        episodes_count = len(re.findall(r'\[\d+,\d+\]', episodes_data))
 
             return {
                 'id': anime_id,
@@ -174,17 +208,33 @@ class AnimeFLVScraper(BaseScraper):
             }
 
         except Exception as e:
-            print(f"Error obteniendo detalle de {anime_id}: {e}")
+            self._parse_error('detail', e, anime_id=anime_id)
             return None
 
-    def get_episodes(self, anime_id: str) -> List[Dict]:
+    def get_episodes(self, anime_id: str, refresh: bool = False) -> List[Dict]:
         """Obtiene la lista de episodios"""
         url = f"{self.base_url}/anime/{anime_id}"
-        html = self._make_request(url)
+        html = self._make_request(url, operation='episodes', cache=True, refresh=refresh)
 
         if not html:
             return []
 
+        with self._parse_timer('episodes'):
+            return self._parse_episodes(html, anime_id)
+
+    async def get_episodes_async(self, anime_id: str, refresh: bool = False) -> List[Dict]:
+        """Obtiene la lista de episodios sin bloquear el event loop"""
+        url = f"{self.base_url}/anime/{anime_id}"
+        html = await self._make_request_async(url, operation='episodes', cache=True, refresh=refresh)
+
+        if not html:
+            return []
+
+        with self._parse_timer('episodes'):
+            return self._parse_episodes(html, anime_id)
+
+    def _parse_episodes(self, html: str, anime_id: str) -> List[Dict]:
+        """Parsea la lista de episodios del script de la ficha"""
         episodes = []
 
         try:
@@ -206,18 +256,81 @@ class AnimeFLVScraper(BaseScraper):
             episodes.sort(key=lambda x: x['number'])
 
         except Exception as e:
-            print(f"Error obteniendo episodios de {anime_id}: {e}")
+            self._parse_error('episodes', e, anime_id=anime_id)
+
+        return episodes
+
+    def get_latest_episodes(self) -> List[Dict]:
+        """Obtiene los últimos episodios publicados desde la portada"""
+        html = self._make_request(f"{self.base_url}/", operation='latest')
+
+        if not html:
+            return []
+
+        with self._parse_timer('latest'):
+            return self._parse_latest_episodes(html)
+
+    def _parse_latest_episodes(self, html: str) -> List[Dict]:
+        """Parsea la lista de episodios recientes de la portada"""
+        soup = BeautifulSoup(html, 'html.parser')
+        episodes = []
+
+        # Los episodios recientes están en una lista con clase "ListEpisodios"
+        episode_list = soup.find('ul', class_='ListEpisodios')
+        if not episode_list:
+            return []
+
+        for item in episode_list.find_all('li'):
+            try:
+                link = item.find('a')
+                if not link:
+                    continue
+
+                # El enlace tiene el formato /ver/{anime_id}-{numero}
+                href = link.get('href', '')
+                match = re.search(r'/ver/(.+)-(\d+)/?$', href)
+                if not match:
+                    continue
+
+                title_elem = item.find('strong', class_='Title')
+
+                episodes.append({
+                    'anime_id': match.group(1),
+                    'episode': int(match.group(2)),
+                    'title': title_elem.text.strip() if title_elem else '',
+                    'url': f"{self.base_url}{href}"
+                })
+
+            except Exception as e:
+                self._parse_error('latest', e)
+                continue
 
         return episodes
 
     def get_video_sources(self, anime_id: str, episode_number: int) -> List[Dict]:
         """Obtiene las fuentes de video de un episodio"""
         url = f"{self.base_url}/ver/{anime_id}-{episode_number}"
-        html = self._make_request(url)
+        html = self._make_request(url, operation='videos')
 
         if not html:
             return []
 
+        with self._parse_timer('videos'):
+            return self._parse_video_sources(html, anime_id, episode_number)
+
+    async def get_video_sources_async(self, anime_id: str, episode_number: int) -> List[Dict]:
+        """Obtiene las fuentes de video de un episodio sin bloquear el event loop"""
+        url = f"{self.base_url}/ver/{anime_id}-{episode_number}"
+        html = await self._make_request_async(url, operation='videos')
+
+        if not html:
+            return []
+
+        with self._parse_timer('videos'):
+            return self._parse_video_sources(html, anime_id, episode_number)
+
+    def _parse_video_sources(self, html: str, anime_id: str, episode_number: int) -> List[Dict]:
+        """Parsea los servidores de video del script de la página del episodio"""
         sources = []
 
         try:
@@ -237,9 +350,7 @@ class AnimeFLVScraper(BaseScraper):
                             'ads': server.get('ads', 0)
                         })
 
-        except json.JSONDecodeError as e:
-            print(f"Error parseando JSON de videos: {e}")
         except Exception as e:
-            print(f"Error obteniendo videos de {anime_id} ep {episode_number}: {e}")
+            self._parse_error('videos', e, anime_id=anime_id, episode=episode_number)
 
         return sources
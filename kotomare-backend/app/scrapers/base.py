@@ -1,5 +1,14 @@
+import asyncio
+import logging
+import time
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional
+from app.extensions import cache as page_cache
+from app.scrapers.mirrors import get_mirror_pool, hedged_fetch, hedged_fetch_async
+from app.utils import deadline
+from app.utils.metrics import SCRAPER_ERRORS, SCRAPER_FETCH, SCRAPER_PARSE
+
+logger = logging.getLogger(__name__)
 
 
 class BaseScraper(ABC):
@@ -7,6 +16,17 @@ class BaseScraper(ABC):
 
     name: str = "base"
     base_url: str = ""
+    # Mirrors alternativos de `base_url` (SCRAPER_MIRRORS); con alguno se usa hedging
+    mirrors: tuple = ()
+    # Timeout máximo por petición; con presupuesto de petición se recorta a lo que quede
+    timeout: float = 10
+    # Capacidades opcionales: las fuentes que implementan `browse` o
+    # `get_latest_episodes` lo declaran aquí (se consultan antes de llamarlos)
+    supports_browse: bool = False
+    supports_latest: bool = False
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    }
 
     @abstractmethod
     def search(self, query: str) -> List[Dict]:
@@ -46,12 +66,13 @@ class BaseScraper(ABC):
         pass
 
     @abstractmethod
-    def get_episodes(self, anime_id: str) -> List[Dict]:
+    def get_episodes(self, anime_id: str, refresh: bool = False) -> List[Dict]:
         """
         Obtiene la lista de episodios de un anime.
 
         Args:
             anime_id: ID del anime en la fuente
+            refresh: Descargar la ficha aunque esté en la caché de páginas
 
         Returns:
             Lista de episodios:
@@ -88,18 +109,192 @@ class BaseScraper(ABC):
         """
         pass
 
-    def _make_request(self, url: str, **kwargs) -> Optional[str]:
-        """Hace una petición HTTP y retorna el contenido"""
+    def browse(self, page: int = 1) -> Optional[List[Dict]]:
+        """
+        Obtiene una página del directorio completo de la fuente.
+
+        Opcional: solo lo implementan las fuentes que tienen un listado
+        paginado, que además ponen `supports_browse = True`. Las páginas
+        deben ir de más reciente a más antiguo.
+
+        Args:
+            page: Número de página (empieza en 1)
+
+        Returns:
+            Lista con el mismo formato que `search` (vacía si no hay más
+            páginas) o None si la página no pudo obtenerse (siempre None
+            en las fuentes sin directorio)
+        """
+        return None
+
+    def get_latest_episodes(self) -> List[Dict]:
+        """
+        Obtiene los últimos episodios publicados en la fuente (portada).
+
+        Opcional: permite actualizar los animes en emisión sin pedir la
+        ficha de cada uno. Las fuentes que lo implementan ponen
+        `supports_latest = True`.
+
+        Returns:
+            Lista de episodios recientes:
+            [
+                {
+                    'anime_id': str,
+                    'episode': int,
+                    'title': str,
+                    'url': str
+                }
+            ]
+            (siempre vacía en las fuentes sin feed)
+        """
+        return []
+
+    # Variantes asíncronas (modo ASGI). Por defecto ejecutan la versión
+    # síncrona en un hilo; las fuentes que puedan las sobrescriben usando
+    # `_make_request_async` para no ocupar un hilo mientras esperan.
+
+    async def search_async(self, query: str) -> List[Dict]:
+        """Versión asíncrona de `search`"""
+        return await asyncio.to_thread(self.search, query)
+
+    async def get_episodes_async(self, anime_id: str, refresh: bool = False) -> List[Dict]:
+        """Versión asíncrona de `get_episodes`"""
+        return await asyncio.to_thread(self.get_episodes, anime_id, refresh)
+
+    async def get_video_sources_async(self, anime_id: str, episode_number: int) -> List[Dict]:
+        """Versión asíncrona de `get_video_sources`"""
+        return await asyncio.to_thread(self.get_video_sources, anime_id, episode_number)
+
+    def _make_request(self, url: str, operation: str = 'request', cache: bool = False,
+                      refresh: bool = False, **kwargs) -> Optional[str]:
+        """
+        Hace una petición HTTP y retorna el contenido.
+
+        Con `cache=True` la página se guarda en la caché compartida (espacio
+        'page'), así que los demás workers y operaciones que piden la misma
+        URL (p. ej. detalle y episodios) no vuelven a descargarla. Con
+        `refresh=True` se descarga igualmente y se reemplaza la copia guardada
+        (los refrescos periódicos no deben leer una página de hace minutos).
+        """
+        if cache and not refresh:
+            html = page_cache.get(f'page:{url}')
+            if html is not None:
+                return html
+
+        html = self._fetch(url, operation, **kwargs)
+        if cache and html:
+            page_cache.set(f'page:{url}', html)
+        return html
+
+    def _fetch(self, url: str, operation: str, **kwargs) -> Optional[str]:
+        """
+        Descarga una URL. Si la fuente tiene mirrors, la ruta se pide al más
+        rápido y, si tarda más de lo habitual, también a otro (hedging).
+        """
+        pool = get_mirror_pool(self)
+        if pool is None or not url.startswith(self.base_url):
+            return self._fetch_url(url, operation, **kwargs)
+
+        path = url[len(self.base_url):]
+        return hedged_fetch(pool, lambda base_url: self._fetch_url(f'{base_url}{path}', operation, **kwargs))
+
+    def _fetch_url(self, url: str, operation: str, **kwargs) -> Optional[str]:
+        """Descarga una URL registrando métricas y errores"""
         import requests
 
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
+        # Se mira una sola vez: entre `expired()` y `timeout_for()` el presupuesto
+        # puede acabarse y requests no acepta timeout=0
+        timeout = deadline.timeout_for(self.timeout)
+        if timeout is not None and timeout <= 0:
+            self._cut_off(operation, url)
+            return None
 
+        start = time.perf_counter()
         try:
-            response = requests.get(url, headers=headers, timeout=10, **kwargs)
+            response = requests.get(url, headers=self.headers, timeout=timeout, **kwargs)
             response.raise_for_status()
             return response.text
         except requests.RequestException as e:
-            print(f"Error en request a {url}: {e}")
+            if isinstance(e, requests.Timeout) and deadline.expired():
+                self._cut_off(operation, url)
+                return None
+            SCRAPER_ERRORS.inc(scraper=self.name, operation=operation, stage='fetch')
+            logger.warning("Error en request", extra={
+                'scraper': self.name, 'operation': operation, 'url': url, 'error': str(e)
+            })
+            return None
+        finally:
+            SCRAPER_FETCH.observe(time.perf_counter() - start, scraper=self.name, operation=operation)
+
+    async def _make_request_async(self, url: str, operation: str = 'request', cache: bool = False,
+                                  refresh: bool = False, **kwargs) -> Optional[str]:
+        """Como `_make_request` pero con el cliente HTTP no bloqueante compartido"""
+        if cache and not refresh:
+            html = await page_cache.get_async(f'page:{url}')
+            if html is not None:
+                return html
+
+        html = await self._fetch_async(url, operation, **kwargs)
+        if cache and html:
+            await page_cache.set_async(f'page:{url}', html)
+        return html
+
+    async def _fetch_async(self, url: str, operation: str, **kwargs) -> Optional[str]:
+        """Como `_fetch` sin bloquear el event loop (la petición perdedora se cancela)"""
+        pool = get_mirror_pool(self)
+        if pool is None or not url.startswith(self.base_url):
+            return await self._fetch_url_async(url, operation, **kwargs)
+
+        path = url[len(self.base_url):]
+        return await hedged_fetch_async(
+            pool, lambda base_url: self._fetch_url_async(f'{base_url}{path}', operation, **kwargs)
+        )
+
+    async def _fetch_url_async(self, url: str, operation: str, **kwargs) -> Optional[str]:
+        """Descarga una URL sin bloquear el event loop registrando métricas y errores"""
+        import httpx
+        from app.utils.aio import get_http_client
+
+        timeout = deadline.timeout_for(None)
+        if timeout is not None and timeout <= 0:
+            self._cut_off(operation, url)
+            return None
+
+        start = time.perf_counter()
+        try:
+            response = await get_http_client().get(
+                url, headers=self.headers, timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout, **kwargs
+            )
+            response.raise_for_status()
+            return response.text
+        except httpx.HTTPError as e:
+            if isinstance(e, httpx.TimeoutException) and deadline.expired():
+                self._cut_off(operation, url)
+                return None
+            SCRAPER_ERRORS.inc(scraper=self.name, operation=operation, stage='fetch')
+            logger.warning("Error en request", extra={
+                'scraper': self.name, 'operation': operation, 'url': url, 'error': str(e)
+            })
             return None
+        finally:
+            SCRAPER_FETCH.observe(time.perf_counter() - start, scraper=self.name, operation=operation)
+
+    def _cut_off(self, operation: str, url: str):
+        """La petición se ha quedado sin presupuesto de tiempo para esta fuente"""
+        SCRAPER_ERRORS.inc(scraper=self.name, operation=operation, stage='deadline')
+        deadline.mark_cut_off(self.name)
+        logger.info("Sin tiempo para consultar la fuente", extra={
+            'scraper': self.name, 'operation': operation, 'url': url
+        })
+
+    def _parse_timer(self, operation: str):
+        """Context manager que mide el tiempo de parseo de una operación"""
+        return SCRAPER_PARSE.time(scraper=self.name, operation=operation)
+
+    def _parse_error(self, operation: str, error: Exception, **context):
+        """Registra un error de parseo"""
+        SCRAPER_ERRORS.inc(scraper=self.name, operation=operation, stage='parse')
+        logger.warning("Error de parseo", extra={
+            'scraper': self.name, 'operation': operation,
+            'error': f"{type(error).__name__}: {error}", **context
+        })
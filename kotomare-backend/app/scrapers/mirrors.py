@@ -0,0 +1,240 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.utils import deadline
+from app.utils.metrics import REGISTRY, SCRAPER_HEDGES
+
+# Ajustes del hedging (los sobrescribe `configure_mirrors` con la config de la app)
+HEDGING = {
+    'enabled': True,
+    'quantile': 0.9,        # se lanza la segunda petición al superar este percentil
+    'default_delay': 1.0,   # retraso mientras no hay muestras suficientes
+    'min_delay': 0.05,
+    'min_samples': 20,
+    'cooldown': 30,         # segundos sin usar un mirror tras fallos seguidos
+    'max_failures': 3,
+    'threads': 32,
+}
+
+_pools: Dict[str, 'MirrorPool'] = {}
+_pools_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+
+
+class MirrorStats:
+    __slots__ = ('ewma', 'failures', 'down_until', 'requests')
+
+    def __init__(self):
+        self.ewma: Optional[float] = None
+        self.failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+
+
+class MirrorPool:
+    """
+    Mirrors de una fuente con su latencia observada.
+
+    Se prefiere el mirror sano más rápido (media móvil exponencial de la
+    latencia); los que aún no tienen medidas van detrás, en el orden de la
+    config, y se miden cuando les toca el hedging. Un mirror que solo falla
+    no llega a tener medida, así que no pasa delante de los que responden.
+    Tras `max_failures` errores seguidos un mirror queda apartado `cooldown`
+    segundos.
+    """
+
+    def __init__(self, name: str, urls: List[str]):
+        self.name = name
+        self.urls = list(urls)
+        self._stats = {url: MirrorStats() for url in self.urls}
+        self._samples = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def ranked(self) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            healthy = [url for url in self.urls if self._stats[url].down_until <= now]
+            if not healthy:
+                # Todos apartados: se prueba antes el que vuelve primero
+                return sorted(self.urls, key=lambda url: self._stats[url].down_until)
+            return sorted(healthy, key=lambda url: (self._stats[url].ewma is None, self._stats[url].ewma or 0.0))
+
+    def hedge_delay(self) -> float:
+        """Percentil `quantile` de las latencias recientes (sin tantear hasta tener muestras)"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < HEDGING['min_samples']:
+            return HEDGING['default_delay']
+        index = min(len(samples) - 1, int(HEDGING['quantile'] * len(samples)))
+        return max(HEDGING['min_delay'], samples[index])
+
+    def record(self, url: str, elapsed: float, ok: bool):
+        with self._lock:
+            stats = self._stats[url]
+            stats.requests += 1
+            if ok:
+                stats.failures = 0
+                stats.ewma = elapsed if stats.ewma is None else 0.8 * stats.ewma + 0.2 * elapsed
+                self._samples.append(elapsed)
+            else:
+                stats.failures += 1
+                if stats.failures >= HEDGING['max_failures']:
+                    stats.down_until = time.monotonic() + HEDGING['cooldown']
+
+    def timed(self, fetch: Callable[[str], Optional[str]], url: str) -> Optional[str]:
+        start = time.perf_counter()
+        result = fetch(url)
+        # Cortar por el presupuesto de la petición no es culpa del mirror
+        if result is not None or not deadline.expired():
+            self.record(url, time.perf_counter() - start, result is not None)
+        return result
+
+    async def timed_async(self, fetch: Callable[[str], Awaitable[Optional[str]]], url: str) -> Optional[str]:
+        start = time.perf_counter()
+        result = await fetch(url)
+        if result is not None or not deadline.expired():
+            self.record(url, time.perf_counter() - start, result is not None)
+        return result
+
+    def stats(self) -> List[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'url': url,
+                    'latency_ms': round(stats.ewma * 1000, 1) if stats.ewma is not None else None,
+                    'requests': stats.requests,
+                    'healthy': stats.down_until <= now
+                }
+                for url, stats in self._stats.items()
+            ]
+
+
+def get_mirror_pool(scraper) -> Optional[MirrorPool]:
+    """Pool de mirrors de un scraper (None si solo tiene `base_url`)"""
+    if not scraper.mirrors:
+        return None
+
+    urls = [scraper.base_url, *(url for url in scraper.mirrors if url != scraper.base_url)]
+    with _pools_lock:
+        pool = _pools.get(scraper.name)
+        if pool is None or pool.urls != urls:
+            pool = _pools[scraper.name] = MirrorPool(scraper.name, urls)
+        return pool
+
+
+def hedged_fetch(pool: MirrorPool, fetch: Callable[[str], Optional[str]]) -> Optional[str]:
+    """
+    Pide con `fetch(base_url)` al mejor mirror y, si no ha contestado en el
+    retraso de hedging (o ha fallado), también al siguiente; se queda con
+    la primera respuesta válida. La petición perdedora no se puede cancelar
+    con requests: termina en segundo plano y su latencia se registra igual.
+    """
+    mirrors = pool.ranked()
+    if len(mirrors) == 1 or not HEDGING['enabled']:
+        return pool.timed(fetch, mirrors[0])
+
+    executor = _get_executor()
+    # Cada intento con su copia del contexto (presupuesto de la petición)
+    first = executor.submit(contextvars.copy_context().run, pool.timed, fetch, mirrors[0])
+    done, _ = wait([first], timeout=pool.hedge_delay())
+    if done and first.result() is not None:
+        return first.result()
+    if deadline.expired():
+        # Sin presupuesto no se lanza la segunda; la primera acaba sola (su timeout ya es 0)
+        return None
+
+    SCRAPER_HEDGES.inc(scraper=pool.name, outcome='failover' if done else 'hedged')
+    second = executor.submit(contextvars.copy_context().run, pool.timed, fetch, mirrors[1])
+    pending = {second} if done else {first, second}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            result = future.result()
+            if result is not None:
+                if future is second:
+                    SCRAPER_HEDGES.inc(scraper=pool.name, outcome='won')
+                return result
+    return None
+
+
+async def hedged_fetch_async(pool: MirrorPool, fetch: Callable[[str], Awaitable[Optional[str]]]) -> Optional[str]:
+    """Como `hedged_fetch` en el event loop: la petición perdedora se cancela"""
+    mirrors = pool.ranked()
+    if len(mirrors) == 1 or not HEDGING['enabled']:
+        return await pool.timed_async(fetch, mirrors[0])
+
+    first = asyncio.ensure_future(pool.timed_async(fetch, mirrors[0]))
+    done, _ = await asyncio.wait({first}, timeout=pool.hedge_delay())
+    if done and first.result() is not None:
+        return first.result()
+    if deadline.expired():
+        first.cancel()
+        return None
+
+    SCRAPER_HEDGES.inc(scraper=pool.name, outcome='failover' if done else 'hedged')
+    second = asyncio.ensure_future(pool.timed_async(fetch, mirrors[1]))
+    pending = {second} if done else {first, second}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.result() is not None:
+                    if task is second:
+                        SCRAPER_HEDGES.inc(scraper=pool.name, outcome='won')
+                    return task.result()
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def mirror_stats() -> Dict[str, List[Dict]]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.stats() for pool in pools}
+
+
+def configure_mirrors(app):
+    """Aplica SCRAPER_MIRRORS y los ajustes de hedging a los scrapers registrados"""
+    from app.scrapers import SCRAPERS
+
+    config = app.config
+    for name, scraper_class in SCRAPERS.items():
+        scraper_class.mirrors = tuple(config['SCRAPER_MIRRORS'].get(name, ()))
+
+    HEDGING.update({
+        'enabled': config['SCRAPER_HEDGE_ENABLED'],
+        'quantile': config['SCRAPER_HEDGE_QUANTILE'],
+        'default_delay': config['SCRAPER_HEDGE_DEFAULT_DELAY'],
+        'cooldown': config['SCRAPER_MIRROR_COOLDOWN'],
+        'threads': config['SCRAPER_HEDGE_THREADS'],
+    })
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Pool de hilos de las peticiones con hedging (se recrea tras un fork)"""
+    global _executor, _executor_pid
+    with _pools_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=HEDGING['threads'], thread_name_prefix='hedge')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _collect_mirror_latency():
+    for name, mirrors in mirror_stats().items():
+        for mirror in mirrors:
+            if mirror['latency_ms'] is not None:
+                yield ('kotomare_scraper_mirror_latency_seconds', 'gauge',
+                       'Latencia media (EWMA) por mirror de cada fuente',
+                       {'scraper': name, 'mirror': mirror['url']}, mirror['latency_ms'] / 1000)
+
+
+REGISTRY.add_collector(_collect_mirror_latency)
@@ -1,4 +1,5 @@
 from app.services.anime_service import AnimeService
 from app.services.auth_service import AuthService
+from app.services.job_service import JobService
 
-__all__ = ['AnimeService', 'AuthService']
+__all__ = ['AnimeService', 'AuthService', 'JobService']
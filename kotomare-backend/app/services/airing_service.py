@@ -0,0 +1,96 @@
+import logging
+import time
+from typing import Dict, List
+from app.models import Anime, EpisodeList
+from app.scrapers import get_scraper
+from app.services.anime_service import AnimeService
+
+logger = logging.getLogger(__name__)
+
+
+class AiringService:
+    """Mantiene al día los animes en emisión a partir del feed de últimos episodios"""
+
+    @staticmethod
+    def refresh_from_latest(source_name: str = 'animeflv') -> Dict:
+        """
+        Actualiza los episodios de los animes que aparecen en el feed.
+
+        Se pide una sola página (la portada de la fuente), se relacionan las
+        entradas con los animes por el id externo de la fuente y solo se
+        vuelve a pedir la ficha de los animes cuyo último episodio guardado
+        es anterior al publicado.
+        """
+        scraper = get_scraper(source_name)
+        if not scraper:
+            raise ValueError(f"Fuente desconocida: {source_name}")
+        if not scraper.supports_latest:
+            raise ValueError(f"La fuente {source_name} no tiene feed de últimos episodios")
+
+        stats = {'feed': 0, 'matched': 0, 'up_to_date': 0, 'updated': 0, 'behind': 0, 'failed': 0}
+
+        latest = scraper.get_latest_episodes()
+        stats['feed'] = len(latest)
+        if not latest:
+            return stats
+
+        # Último episodio publicado por id externo
+        latest_by_id = {}
+        for entry in latest:
+            external_id = entry['anime_id']
+            latest_by_id[external_id] = max(latest_by_id.get(external_id, 0), entry['episode'])
+
+        animes = AiringService._find_by_external_ids(source_name, list(latest_by_id))
+        stats['matched'] = len(animes)
+        if not animes:
+            return stats
+
+        stored = {
+            episode_list.anime_id: episode_list
+            for episode_list in EpisodeList.query.filter(
+                EpisodeList.anime_id.in_([anime.id for anime in animes]),
+                EpisodeList.source == source_name
+            )
+        }
+
+        for anime in animes:
+            published = latest_by_id[anime.get_source(source_name)['id']]
+            episode_list = stored.get(anime.id)
+
+            if episode_list and episode_list.last_episode >= published:
+                stats['up_to_date'] += 1
+                continue
+
+            episodes = AnimeService.fetch_episodes(anime, source_name)
+            if not episodes:
+                stats['failed'] += 1
+            elif max(ep['number'] for ep in episodes) >= published:
+                stats['updated'] += 1
+            else:
+                # La ficha aún no lista el episodio del feed: se reintenta en la próxima pasada
+                stats['behind'] += 1
+
+        return stats
+
+    @staticmethod
+    def _find_by_external_ids(source_name: str, external_ids: List[str]) -> List[Anime]:
+        """Busca los animes cuyo id en la fuente está en la lista (una consulta)"""
+        return Anime.query.filter(
+            Anime.sources[(source_name, 'id')].as_string().in_(external_ids)
+        ).all()
+
+    @staticmethod
+    def run_forever(app, source_name: str = 'animeflv', interval: int = None, log=None):
+        """Ejecuta `refresh_from_latest` periódicamente"""
+        interval = interval or app.config['AIRING_REFRESH_INTERVAL']
+        log = log or logger.info
+
+        while True:
+            with app.app_context():
+                try:
+                    stats = AiringService.refresh_from_latest(source_name)
+                    log(f"[{source_name}] feed actualizado: {stats}")
+                except Exception as e:
+                    log(f"Error actualizando emisiones de {source_name}: {e}")
+
+            time.sleep(interval)
@@ -1,7 +1,20 @@
-from typing import List, Dict, Optional
-from app.extensions import db
-from app.models import Anime
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Dict, Optional, Iterator, Tuple
+from flask import current_app
+from app.extensions import db, cache, rate_limiter
+from app.models import Anime, EpisodeList
 from app.scrapers import get_scraper, get_available_sources
+from app.services.job_service import JobService
+from app.utils import deadline
+from app.utils.aio import run_sync
+from app.utils.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Con al menos estos resultados en la DB local no se consultan las fuentes externas
+SEARCH_LOCAL_ENOUGH = 10
 
 
 class AnimeService:
@@ -18,13 +31,59 @@ class AnimeService:
         3. Guardar nuevos animes encontrados en la DB
         4. Retornar resultados combinados
         """
+        results = []
+        for chunk in AnimeService.search_stream(query, sources=sources):
+            if chunk['type'] != 'summary':
+                results.extend(chunk['results'])
+        return results
+
+    @staticmethod
+    def search_stream(query: str, sources: List[str] = None) -> Iterator[Dict]:
+        """
+        Variante incremental de `search`.
+
+        Emite un chunk con los resultados de la DB local, luego un chunk
+        por cada fuente externa a medida que termina y por último un
+        resumen:
+            {'type': 'db', 'results': [...]}
+            {'type': 'source', 'source': 'animeflv', 'results': [...]}
+            {'type': 'summary', 'count': int, 'sources': [...], 'cut_off': [...]}
+
+        `cut_off` son las fuentes que se saltaron o no terminaron por agotar
+        el presupuesto de tiempo de la petición (ver app/utils/deadline.py).
+        """
         if sources is None:
             sources = get_available_sources()
 
-        results = []
         found_slugs = set()
+        count = 0
 
         # 1. Buscar en la base de datos local
+        db_results = AnimeService._search_db(query, found_slugs)
+        count += len(db_results)
+        yield {'type': 'db', 'results': db_results}
+
+        # 2. Buscar en fuentes externas si no tenemos suficientes resultados
+        searched = []
+        if count < SEARCH_LOCAL_ENOUGH:
+            for source_name in sources:
+                scraper = get_scraper(source_name)
+                if not scraper:
+                    continue
+
+                source_results = AnimeService._search_source(
+                    scraper, query, found_slugs
+                )
+                searched.append(source_name)
+                count += len(source_results)
+                yield {'type': 'source', 'source': source_name, 'results': source_results}
+
+        yield {'type': 'summary', 'count': count, 'sources': searched, 'cut_off': deadline.cut_off_sources()}
+
+    @staticmethod
+    def _search_db(query: str, found_slugs: set) -> List[Dict]:
+        """Busca en la base de datos local y registra los slugs encontrados"""
+        results = []
         db_animes = Anime.query.filter(
             Anime.title.ilike(f'%{query}%')
         ).limit(20).all()
@@ -33,52 +92,147 @@ class AnimeService:
             results.append(anime.to_dict())
             found_slugs.add(anime.slug)
 
-        # 2. Buscar en fuentes externas si no tenemos suficientes resultados
-        if len(results) < 10:
-            for source_name in sources:
-                scraper = get_scraper(source_name)
-                if not scraper:
+        return results
+
+    @staticmethod
+    def _search_source(scraper, query: str, found_slugs: set) -> List[Dict]:
+        """Busca en una fuente externa y guarda los animes nuevos en la DB"""
+        external_results = AnimeService._cached_search(scraper.name, query)
+
+        if external_results is None:
+            if not AnimeService._may_scrape(scraper.name):
+                return []
+            try:
+                external_results = scraper.search(query)
+            except Exception as e:
+                logger.warning("Error buscando en fuente", extra={'source': scraper.name, 'error': str(e)})
+                return []
+            AnimeService._cache_search(scraper.name, query, external_results)
+
+        return AnimeService._merge_source_results(scraper.name, external_results, found_slugs)
+
+    @staticmethod
+    def _cached_search(source_name: str, query: str) -> Optional[List[Dict]]:
+        """Resultados de una fuente en la caché compartida (None si no están)"""
+        return cache.get(AnimeService._search_cache_key(source_name, query))
+
+    @staticmethod
+    def _may_scrape(source_name: str) -> bool:
+        """
+        Si se puede ir a una fuente: queda presupuesto de tiempo (si no, se
+        anota como cortada) y cupo 'expensive' del cliente. Necesita el
+        contexto de la petición, así que no se llama desde `run_sync`.
+        """
+        if deadline.expired():
+            deadline.mark_cut_off(source_name)
+            return False
+        return rate_limiter.allow_scrape()
+
+    @staticmethod
+    def _cache_search(source_name: str, query: str, external_results: List[Dict]):
+        if external_results:
+            cache.set(AnimeService._search_cache_key(source_name, query), external_results)
+
+    @staticmethod
+    def _merge_source_results(source_name: str, external_results: List[Dict], found_slugs: set) -> List[Dict]:
+        """Cruza los resultados de una fuente con la DB y crea los animes nuevos"""
+        results = []
+
+        try:
+            for item in external_results:
+                # Verificar si ya existe en la DB
+                slug = Anime.generate_slug(item['title'])
+
+                if slug in found_slugs:
+                    # Ya lo tenemos, actualizar la fuente si es necesario
+                    existing = Anime.query.filter_by(slug=slug).first()
+                    if existing and not existing.has_source(source_name):
+                        existing.add_source(source_name, item)
+                        db.session.commit()
                     continue
 
-                try:
-                    external_results = scraper.search(query)
-
-                    for item in external_results:
-                        # Verificar si ya existe en la DB
-                        slug = Anime.generate_slug(item['title'])
-
-                        if slug in found_slugs:
-                            # Ya lo tenemos, actualizar la fuente si es necesario
-                            existing = Anime.query.filter_by(slug=slug).first()
-                            if existing and not existing.has_source(source_name):
-                                existing.add_source(source_name, item)
-                                db.session.commit()
-                            continue
-
-                        # Verificar si existe en DB por slug
-                        existing = Anime.query.filter_by(slug=slug).first()
-                        if existing:
-                            if not existing.has_source(source_name):
-                                existing.add_source(source_name, item)
-                                db.session.commit()
-                            results.append(existing.to_dict())
-                            found_slugs.add(slug)
-                            continue
-
-                        # Crear nuevo anime
-                        anime = AnimeService._create_anime_from_source(
-                            item, source_name, slug
-                        )
-                        if anime:
-                            results.append(anime.to_dict())
-                            found_slugs.add(slug)
-
-                except Exception as e:
-                    print(f"Error buscando en {source_name}: {e}")
+                # Verificar si existe en DB por slug
+                existing = Anime.query.filter_by(slug=slug).first()
+                if existing:
+                    if not existing.has_source(source_name):
+                        existing.add_source(source_name, item)
+                        db.session.commit()
+                    results.append(existing.to_dict())
+                    found_slugs.add(slug)
                     continue
 
+                # Crear nuevo anime
+                anime = AnimeService._create_anime_from_source(
+                    item, source_name, slug
+                )
+                if anime:
+                    results.append(anime.to_dict())
+                    found_slugs.add(slug)
+
+        except Exception as e:
+            logger.warning("Error buscando en fuente", extra={'source': source_name, 'error': str(e)})
+
+        return results
+
+    @staticmethod
+    async def search_async(query: str, sources: List[str] = None) -> List[Dict]:
+        """
+        Variante asíncrona de `search` para el modo ASGI.
+
+        Las fuentes externas se consultan a la vez sin ocupar hilos; la DB
+        se usa desde el pool de hilos con `run_sync`.
+        """
+        if sources is None:
+            sources = get_available_sources()
+
+        found_slugs = set()
+        results = await run_sync(AnimeService._search_db, query, found_slugs)
+        if len(results) >= SEARCH_LOCAL_ENOUGH:
+            return results
+
+        scrapers = [scraper for scraper in map(get_scraper, sources) if scraper]
+        responses = await asyncio.gather(
+            *(AnimeService._search_source_async(scraper, query) for scraper in scrapers),
+            return_exceptions=True
+        )
+
+        for scraper, external_results in zip(scrapers, responses):
+            if isinstance(external_results, Exception):
+                logger.warning("Error buscando en fuente", extra={
+                    'source': scraper.name, 'error': str(external_results)
+                })
+                continue
+
+            results.extend(await run_sync(
+                AnimeService._merge_source_results, scraper.name, external_results, found_slugs
+            ))
+
         return results
 
+    @staticmethod
+    async def _search_source_async(scraper, query: str) -> List[Dict]:
+        """Resultados de una fuente (de la caché compartida o scrapeados)"""
+        key = AnimeService._search_cache_key(scraper.name, query)
+        external_results = await cache.get_async(key)
+
+        if external_results is None:
+            if not AnimeService._may_scrape(scraper.name):
+                return []
+            external_results = await scraper.search_async(query)
+            if external_results:
+                await cache.set_async(key, external_results)
+
+        return external_results
+
+    @staticmethod
+    def _search_cache_key(source_name: str, query: str) -> str:
+        return f"search:{source_name}:{AnimeService.normalize_query(query)}"
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Forma canónica de una búsqueda (minúsculas, espacios simples)"""
+        return ' '.join(query.lower().split())
+
     @staticmethod
     def _create_anime_from_source(data: Dict, source_name: str, slug: str) -> Optional[Anime]:
         """Crea un nuevo anime a partir de datos de una fuente externa"""
@@ -96,12 +250,106 @@ class AnimeService:
             db.session.add(anime)
             db.session.commit()
 
+            # Encolar el enriquecimiento (sinopsis, géneros, estado) en segundo plano
+            JobService.enqueue_enrichment(anime, source_name)
+
             return anime
         except Exception as e:
             db.session.rollback()
-            print(f"Error creando anime: {e}")
+            logger.error("Error creando anime", extra={'slug': slug, 'error': str(e)})
             return None
 
+    @staticmethod
+    def bulk_upsert_from_source(items: List[Dict], source_name: str) -> Dict[str, int]:
+        """
+        Inserta o actualiza en bloque animes obtenidos de una fuente.
+
+        Resuelve los existentes con una sola consulta IN por slug y hace un
+        único commit para todo el lote. Los animes creados se encolan para
+        enriquecer, igual que en `_create_anime_from_source`.
+
+        Returns:
+            {'created': int, 'updated': int, 'known': int}
+        """
+        by_slug = {}
+        for item in items:
+            slug = Anime.generate_slug(item.get('title', ''))
+            if slug and slug not in by_slug:
+                by_slug[slug] = item
+
+        stats = {'created': 0, 'updated': 0, 'known': 0}
+        if not by_slug:
+            return stats
+
+        created = []
+        try:
+            existing = Anime.query.filter(Anime.slug.in_(list(by_slug))).all()
+
+            for anime in existing:
+                item = by_slug.pop(anime.slug)
+                if anime.has_source(source_name):
+                    stats['known'] += 1
+                else:
+                    anime.add_source(source_name, item)
+                    stats['updated'] += 1
+
+            for slug, item in by_slug.items():
+                anime = Anime(
+                    title=item.get('title', ''),
+                    slug=slug,
+                    cover_image=item.get('cover_image'),
+                    type=item.get('type'),
+                    status=item.get('status'),
+                    genres=item.get('genres', [])
+                )
+                anime.add_source(source_name, item)
+                db.session.add(anime)
+                created.append(anime)
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        stats['created'] = len(created)
+        for anime in created:
+            JobService.enqueue_enrichment(anime, source_name)
+
+        return stats
+
+    @staticmethod
+    def get_many(keys: List, by: str = 'id', fields: List[str] = None) -> List[Optional[Dict]]:
+        """
+        Obtiene varios animes por id o slug con una sola consulta IN.
+
+        Solo se leen las columnas de `fields` y las que necesiten sus campos
+        calculados (por defecto, lo mismo que `to_summary_dict`: columnas de
+        listado y miniaturas). El resultado respeta el orden de `keys`, con
+        None en las posiciones que no existen.
+        """
+        fields = list(fields or Anime.SUMMARY_FIELDS + ('thumbnails',))
+        names = []
+        for field in fields:
+            for name in Anime.DERIVED_FIELDS.get(field, (field,)):
+                if name not in names:
+                    names.append(name)
+
+        key_column = getattr(Anime, by)
+        rows = db.session.query(key_column, *(getattr(Anime, name) for name in names)).filter(
+            key_column.in_(set(keys))
+        ).all()
+
+        found = {}
+        for row in rows:
+            values = dict(zip(names, row[1:]))
+            found[row[0]] = {
+                field: Anime.derive_field(field, values) if field in Anime.DERIVED_FIELDS
+                else Anime.serialize_field(field, values[field])
+                for field in fields
+            }
+
+        return [found.get(key) for key in keys]
+
     @staticmethod
     def get_anime_detail(slug: str, source: str = None) -> Optional[Dict]:
         """Obtiene el detalle completo de un anime, actualizando si es necesario"""
@@ -112,60 +360,261 @@ class AnimeService:
 
         # Si se especifica una fuente y tenemos datos de esa fuente
         if source and anime.has_source(source):
-            source_data = anime.get_source(source)
-            scraper = get_scraper(source)
-
-            if scraper and source_data.get('id'):
-                try:
-                    detail = scraper.get_anime_detail(source_data['id'])
-                    if detail:
-                        # Actualizar datos del anime
-                        if detail.get('synopsis') and not anime.synopsis:
-                            anime.synopsis = detail['synopsis']
-                        if detail.get('genres'):
-                            anime.genres = detail['genres']
-                        if detail.get('status'):
-                            anime.status = detail['status']
-
-                        anime.add_source(source, detail)
-                        db.session.commit()
-                except Exception as e:
-                    print(f"Error actualizando detalle: {e}")
+            try:
+                AnimeService.enrich_anime(anime, source)
+            except Exception as e:
+                db.session.rollback()
+                logger.warning("Error actualizando detalle", extra={'slug': slug, 'source': source, 'error': str(e)})
 
         return anime.to_dict()
 
     @staticmethod
-    def get_episodes(anime: Anime, source: str = 'animeflv') -> List[Dict]:
-        """Obtiene los episodios de un anime desde una fuente"""
-        if not anime.has_source(source):
-            return []
+    def enrich_anime(anime: Anime, source: str) -> bool:
+        """
+        Completa sinopsis, géneros y estado de un anime con el detalle de una fuente.
 
+        Retorna False si la fuente no respondió (para que el llamador pueda
+        reintentar). Las excepciones del scraper se propagan.
+        """
         source_data = anime.get_source(source)
         scraper = get_scraper(source)
 
-        if not scraper or not source_data.get('id'):
-            return []
+        if not scraper or not source_data or not source_data.get('id'):
+            return False
 
-        try:
-            return scraper.get_episodes(source_data['id'])
-        except Exception as e:
-            print(f"Error obteniendo episodios: {e}")
-            return []
+        detail = scraper.get_anime_detail(source_data['id'])
+        if not detail:
+            return False
+
+        # Actualizar datos del anime
+        if detail.get('synopsis') and not anime.synopsis:
+            anime.synopsis = detail['synopsis']
+        if detail.get('genres'):
+            anime.genres = detail['genres']
+        if detail.get('status'):
+            anime.status = detail['status']
+
+        anime.add_source(source, detail)
+        db.session.commit()
+        return True
+
+    @staticmethod
+    def get_episodes(slug: str, source: str = 'animeflv') -> Optional[Dict]:
+        """
+        Obtiene los episodios de un anime desde una fuente.
+
+        Usa la lista guardada en `episode_lists` mientras no haya caducado
+        (las series en emisión caducan antes) y si no la scrapea y la guarda.
+
+        Retorna None si el anime no existe o {'anime_id', 'episodes'}.
+        """
+        plan = AnimeService._plan_for_slug(AnimeService._episodes_plan, slug, source)
+        if plan is None:
+            return None
+
+        if plan['fetch'] and rate_limiter.allow_scrape():
+            try:
+                fetched = get_scraper(source).get_episodes(plan['source_id'])
+            except Exception as e:
+                logger.warning("Error obteniendo episodios", extra={
+                    'anime_id': plan['anime_id'], 'source': source, 'error': str(e)
+                })
+                fetched = None
+
+            # Si la fuente falla (el scraper devuelve [] o lanza), mejor la lista
+            # guardada (algo vieja) que ninguna
+            if fetched:
+                AnimeService._store_episodes(plan['anime_id'], source, fetched)
+                plan['episodes'] = fetched
+
+        return {'anime_id': plan['anime_id'], 'episodes': plan['episodes']}
+
+    @staticmethod
+    async def get_episodes_async(slug: str, source: str = 'animeflv') -> Optional[Dict]:
+        """Variante asíncrona de `get_episodes` para el modo ASGI"""
+        plan = await run_sync(AnimeService._plan_for_slug, AnimeService._episodes_plan, slug, source)
+        if plan is None:
+            return None
+
+        if plan['fetch'] and rate_limiter.allow_scrape():
+            try:
+                fetched = await get_scraper(source).get_episodes_async(plan['source_id'])
+            except Exception as e:
+                logger.warning("Error obteniendo episodios", extra={
+                    'anime_id': plan['anime_id'], 'source': source, 'error': str(e)
+                })
+                fetched = None
+
+            if fetched:
+                await run_sync(AnimeService._store_episodes, plan['anime_id'], source, fetched)
+                plan['episodes'] = fetched
+
+        return {'anime_id': plan['anime_id'], 'episodes': plan['episodes']}
 
     @staticmethod
-    def get_episode_videos(anime: Anime, episode_number: int, source: str = 'animeflv') -> List[Dict]:
-        """Obtiene los videos de un episodio"""
+    def _plan_for_slug(plan, slug: str, *args) -> Optional[Dict]:
+        """`plan(anime, *args)` para el anime de `slug` (None si no existe)"""
+        anime = Anime.query.filter_by(slug=slug).first()
+        return plan(anime, *args) if anime else None
+
+    @staticmethod
+    def _episodes_plan(anime: Anime, source: str) -> Dict:
+        """
+        Lo que `get_episodes` necesita de la DB, en datos planos:
+        {'anime_id', 'source_id', 'episodes' (la lista guardada, o vacía),
+        'fetch' (si hay que scrapearla, falta ver el cupo del cliente)}.
+        """
+        plan = {'anime_id': anime.id, 'source_id': None, 'episodes': [], 'fetch': False}
         if not anime.has_source(source):
-            return []
+            return plan
+
+        stored, fresh = AnimeService._lookup_episodes(anime, source)
+        plan['source_id'] = anime.get_source(source).get('id')
+        plan['episodes'] = stored or []
+        plan['fetch'] = not fresh and bool(plan['source_id']) and get_scraper(source) is not None
+        return plan
+
+    @staticmethod
+    def _lookup_episodes(anime: Anime, source: str) -> Tuple[Optional[List[Dict]], bool]:
+        """Lista guardada (None si no hay) y si sigue vigente; registra hit/miss/stale"""
+        stored = EpisodeList.query.filter_by(anime_id=anime.id, source=source).first()
+        if stored and not AnimeService._episodes_expired(anime, stored):
+            CACHE_REQUESTS.inc(cache='episode_lists', result='hit')
+            return stored.episodes or [], True
+
+        CACHE_REQUESTS.inc(cache='episode_lists', result='stale' if stored else 'miss')
+        return (stored.episodes or []) if stored else None, False
+
+    @staticmethod
+    def fetch_episodes(anime: Anime, source: str = 'animeflv') -> Optional[List[Dict]]:
+        """
+        Scrapea la lista de episodios y la guarda. Retorna None si falla.
 
+        Lo usan los refrescos en segundo plano (emisiones, avisos, precalentado),
+        así que la ficha se descarga siempre, sin pasar por la caché de páginas.
+        """
         source_data = anime.get_source(source)
         scraper = get_scraper(source)
 
-        if not scraper or not source_data.get('id'):
-            return []
+        if not scraper or not source_data or not source_data.get('id'):
+            return None
+
+        try:
+            episodes = scraper.get_episodes(source_data['id'], refresh=True)
+        except Exception as e:
+            logger.warning("Error obteniendo episodios", extra={'anime_id': anime.id, 'source': source, 'error': str(e)})
+            return None
+
+        if episodes:
+            AnimeService._store_episodes(anime.id, source, episodes)
+
+        return episodes
 
+    @staticmethod
+    def _store_episodes(anime_id: int, source: str, episodes: List[Dict]):
+        """Guarda (o reemplaza) la lista de episodios de una fuente"""
         try:
-            return scraper.get_video_sources(source_data['id'], episode_number)
+            stored = EpisodeList.query.filter_by(anime_id=anime_id, source=source).first()
+            if not stored:
+                stored = EpisodeList(anime_id=anime_id, source=source)
+                db.session.add(stored)
+
+            stored.set_episodes(episodes)
+            db.session.commit()
         except Exception as e:
-            print(f"Error obteniendo videos: {e}")
-            return []
+            db.session.rollback()
+            logger.error("Error guardando episodios", extra={'anime_id': anime_id, 'source': source, 'error': str(e)})
+
+    @staticmethod
+    def _episodes_expired(anime: Anime, stored: EpisodeList) -> bool:
+        """Indica si la lista guardada debe volver a scrapearse"""
+        return AnimeService.episodes_expire_in(anime, stored) <= 0
+
+    @staticmethod
+    def episodes_expire_in(anime: Anime, stored: EpisodeList) -> float:
+        """Segundos que le quedan a la lista guardada (negativo si ya caducó)"""
+        if anime.is_airing():
+            ttl = current_app.config['EPISODE_LIST_TTL_AIRING']
+        else:
+            ttl = current_app.config['EPISODE_LIST_TTL']
+
+        return (ttl - (datetime.utcnow() - stored.updated_at)).total_seconds()
+
+    @staticmethod
+    def get_episode_videos(slug: str, episode_number: int, source: str = 'animeflv') -> Optional[Dict]:
+        """
+        Obtiene los videos de un episodio (de la caché compartida o scrapeados).
+
+        Retorna None si el anime no existe o {'anime_id', 'source_id',
+        'episodes_count', 'videos'}.
+        """
+        plan = AnimeService._plan_for_slug(AnimeService._videos_plan, slug, episode_number, source)
+        if plan is None:
+            return None
+
+        if plan.pop('fetch') and rate_limiter.allow_scrape():
+            try:
+                plan['videos'] = get_scraper(source).get_video_sources(plan['source_id'], episode_number)
+            except Exception as e:
+                logger.warning("Error obteniendo videos", extra={
+                    'anime_id': plan['anime_id'], 'episode': episode_number, 'source': source, 'error': str(e)
+                })
+            AnimeService._cache_videos(source, plan['source_id'], episode_number, plan['videos'])
+
+        return plan
+
+    @staticmethod
+    async def get_episode_videos_async(slug: str, episode_number: int, source: str = 'animeflv') -> Optional[Dict]:
+        """Variante asíncrona de `get_episode_videos` para el modo ASGI"""
+        plan = await run_sync(AnimeService._plan_for_slug, AnimeService._videos_plan, slug, episode_number, source)
+        if plan is None:
+            return None
+
+        if plan.pop('fetch') and rate_limiter.allow_scrape():
+            try:
+                plan['videos'] = await get_scraper(source).get_video_sources_async(plan['source_id'], episode_number)
+            except Exception as e:
+                logger.warning("Error obteniendo videos", extra={
+                    'anime_id': plan['anime_id'], 'episode': episode_number, 'source': source, 'error': str(e)
+                })
+            if plan['videos']:
+                key = AnimeService.videos_cache_key(source, plan['source_id'], episode_number)
+                await cache.set_async(key, plan['videos'])
+
+        return plan
+
+    @staticmethod
+    def _videos_plan(anime: Anime, episode_number: int, source: str) -> Dict:
+        """
+        Lo que `get_episode_videos` necesita de la DB y de la caché, en datos
+        planos: {'anime_id', 'source_id', 'episodes_count', 'videos' (los de
+        la caché, o vacía), 'fetch' (si hay que scrapearlos, falta ver el
+        cupo del cliente)}.
+        """
+        source_data = anime.get_source(source) or {}
+        plan = {
+            'anime_id': anime.id,
+            'source_id': source_data.get('id'),
+            'episodes_count': source_data.get('episodes_count'),
+            'videos': [],
+            'fetch': False
+        }
+        if not plan['source_id'] or not get_scraper(source):
+            return plan
+
+        videos = cache.get(AnimeService.videos_cache_key(source, plan['source_id'], episode_number))
+        if videos is not None:
+            plan['videos'] = videos
+        else:
+            plan['fetch'] = True
+        return plan
+
+    @staticmethod
+    def _cache_videos(source: str, source_id: str, episode_number: int, videos: List[Dict]):
+        if videos:
+            cache.set(AnimeService.videos_cache_key(source, source_id, episode_number), videos)
+
+    @staticmethod
+    def videos_cache_key(source: str, source_id: str, episode_number: int) -> str:
+        """Clave de la caché compartida para los videos de un episodio"""
+        return f"videos:{source}:{source_id}:{episode_number}"
@@ -62,6 +62,10 @@ class AuthService:
         if not user.check_password(password):
             return None, "Credenciales inválidas"
 
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.session.commit()
+
         return user, None
 
     @staticmethod
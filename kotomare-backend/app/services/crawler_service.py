@@ -0,0 +1,114 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from flask import current_app
+from app.extensions import db
+from app.models import CrawlCheckpoint
+from app.scrapers import get_scraper
+from app.services.anime_service import AnimeService
+
+logger = logging.getLogger(__name__)
+
+
+def _fetch_page(source_name: str, page: int):
+    """Descarga y parsea una página del directorio (se ejecuta en un hilo)"""
+    return get_scraper(source_name).browse(page)
+
+
+class CrawlerService:
+    """Crawler del directorio paginado de las fuentes para poblar el catálogo"""
+
+    @staticmethod
+    def crawl(source_name: str, concurrency: int = None, max_pages: Optional[int] = None,
+              full: bool = False, restart: bool = False, log=None) -> Dict:
+        """
+        Recorre el directorio de una fuente e inserta todos los títulos.
+
+        - Se descargan hasta `concurrency` páginas en paralelo; el guardado
+          se hace en orden y en bloque, una transacción por página.
+        - El progreso se guarda en `crawl_checkpoints` tras cada lote, así
+          que una ejecución interrumpida continúa donde se quedó.
+        - En modo incremental (por defecto) se detiene en la primera página
+          que no aporta nada nuevo. Con `full=True` recorre hasta el final.
+        """
+        log = log or logger.info
+        scraper = get_scraper(source_name)
+        if not scraper:
+            raise ValueError(f"Fuente desconocida: {source_name}")
+        if not scraper.supports_browse:
+            raise ValueError(f"La fuente {source_name} no tiene directorio que recorrer")
+
+        concurrency = concurrency or current_app.config['CRAWLER_CONCURRENCY']
+        delay = current_app.config['CRAWLER_DELAY']
+
+        checkpoint = CrawlCheckpoint.query.filter_by(source=source_name).first()
+        if not checkpoint:
+            checkpoint = CrawlCheckpoint(source=source_name)
+            db.session.add(checkpoint)
+            checkpoint.restart()
+        elif restart or checkpoint.finished:
+            checkpoint.restart()
+        db.session.commit()
+
+        page = checkpoint.next_page
+        pages_done = 0
+        reason = None
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while reason is None:
+                batch_size = concurrency
+                if max_pages is not None:
+                    batch_size = min(batch_size, max_pages - pages_done)
+                    if batch_size <= 0:
+                        reason = 'max_pages'
+                        break
+
+                pages = list(range(page, page + batch_size))
+                futures = [executor.submit(_fetch_page, source_name, p) for p in pages]
+
+                for p, future in zip(pages, futures):
+                    try:
+                        items = future.result()
+                    except Exception as e:
+                        log(f"Error descargando página {p} de {source_name}: {e}")
+                        items = None
+
+                    if items is None:
+                        reason = 'error'
+                        break
+
+                    if not items:
+                        reason = 'end'
+                        break
+
+                    stats = AnimeService.bulk_upsert_from_source(items, source_name)
+
+                    checkpoint.next_page = p + 1
+                    checkpoint.pages_crawled += 1
+                    checkpoint.animes_created += stats['created']
+                    db.session.commit()
+
+                    pages_done += 1
+                    page = p + 1
+                    log(f"[{source_name}] página {p}: {stats['created']} nuevos, "
+                        f"{stats['updated']} actualizados, {stats['known']} conocidos")
+
+                    if not full and stats['created'] == 0 and stats['updated'] == 0:
+                        reason = 'caught_up'
+                        break
+
+                if reason is None and delay:
+                    time.sleep(delay)
+
+        # Solo se da por terminado si se llegó al final o a lo ya conocido
+        if reason in ('end', 'caught_up'):
+            checkpoint.finished = True
+            db.session.commit()
+
+        return {
+            'source': source_name,
+            'stopped': reason,
+            'pages': pages_done,
+            'checkpoint': checkpoint.to_dict()
+        }
@@ -0,0 +1,294 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from flask import current_app
+from sqlalchemy import func, update
+from app.extensions import db
+from app.models import Anime, Job
+from app.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+def _enrich_anime_handler(payload: Dict):
+    """Completa el detalle de un anime recién creado"""
+    from app.services.anime_service import AnimeService
+
+    anime = Anime.query.get(payload['anime_id'])
+    if not anime or not anime.has_source(payload['source']):
+        return
+
+    if not AnimeService.enrich_anime(anime, payload['source']):
+        raise RuntimeError(f"La fuente {payload['source']} no devolvió el detalle")
+
+
+# Registro de handlers por tipo de job
+JOB_HANDLERS: Dict[str, Callable[[Dict], None]] = {
+    'enrich_anime': _enrich_anime_handler,
+}
+
+
+JOB_LATENCY = REGISTRY.histogram(
+    'kotomare_job_latency_seconds', 'Tiempo desde que se encola un job hasta que termina', ('kind',),
+    (1, 5, 15, 30, 60, 300, 900, 3600, 4 * 3600))
+JOB_RESULTS = REGISTRY.counter(
+    'kotomare_job_results_total', 'Jobs ejecutados por resultado (done, retry, failed)', ('kind', 'result'))
+
+
+def _collect_queue_depth():
+    """Gauge de profundidad de la cola (se evalúa al exportar las métricas)"""
+    for status, count in db.session.query(Job.status, func.count(Job.id)).group_by(Job.status):
+        yield 'kotomare_job_queue_depth', 'gauge', 'Jobs en la cola por estado', {'status': status}, count
+
+
+REGISTRY.add_collector(_collect_queue_depth)
+
+
+class JobService:
+    """Cola de tareas en segundo plano persistida en la base de datos"""
+
+    @staticmethod
+    def enqueue(kind: str, key: str, payload: Dict = None, delay: int = 0) -> Optional[Job]:
+        """
+        Encola un job. Si ya existe uno con el mismo (kind, key) pendiente o
+        en ejecución no se duplica; si ya terminó, se vuelve a programar.
+        """
+        run_at = datetime.utcnow() + timedelta(seconds=delay)
+
+        try:
+            job = Job.query.filter_by(kind=kind, key=key).first()
+
+            if job:
+                if job.status in ('pending', 'running'):
+                    return job
+                job.status = 'pending'
+                job.attempts = 0
+                job.last_error = None
+                job.started_at = None
+                job.finished_at = None
+            else:
+                job = Job(
+                    kind=kind,
+                    key=key,
+                    max_attempts=current_app.config['JOB_MAX_ATTEMPTS']
+                )
+                db.session.add(job)
+
+            job.payload = payload or {}
+            job.run_at = run_at
+            job.created_at = datetime.utcnow()
+            db.session.commit()
+
+            return job
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Error encolando job", extra={'kind': kind, 'key': key, 'error': str(e)})
+            return None
+
+    @staticmethod
+    def enqueue_enrichment(anime: Anime, source: str) -> Optional[Job]:
+        """Encola el enriquecimiento de detalle de un anime desde una fuente"""
+        return JobService.enqueue(
+            'enrich_anime',
+            f'{source}:{anime.id}',
+            {'anime_id': anime.id, 'source': source}
+        )
+
+    @staticmethod
+    def claim_next() -> Optional[Job]:
+        """
+        Reclama el siguiente job listo para ejecutarse.
+
+        El cambio de estado se hace con un UPDATE condicional, de modo que
+        varios workers (hilos o procesos) nunca reclaman el mismo job. Los
+        jobs que llevan demasiado tiempo en `running` se consideran
+        abandonados y vuelven a estar disponibles si les quedan intentos;
+        si no (p. ej. un job que tumba al worker cada vez) se dan por fallidos.
+        """
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=current_app.config['JOB_STALE_TIMEOUT'])
+
+        JobService._fail_exhausted(stale_before, now)
+
+        candidates = Job.query.filter(
+            db.or_(
+                db.and_(Job.status == 'pending', Job.run_at <= now),
+                db.and_(Job.status == 'running', Job.started_at < stale_before,
+                        Job.attempts < Job.max_attempts)
+            )
+        ).order_by(Job.run_at).limit(10).all()
+
+        for candidate in candidates:
+            result = db.session.execute(
+                update(Job)
+                .where(Job.id == candidate.id, Job.status == candidate.status,
+                       Job.attempts == candidate.attempts)
+                .values(status='running', started_at=now, attempts=Job.attempts + 1)
+            )
+            db.session.commit()
+
+            if result.rowcount == 1:
+                db.session.refresh(candidate)
+                return candidate
+
+        return None
+
+    @staticmethod
+    def _fail_exhausted(stale_before: datetime, now: datetime):
+        """Da por fallidos los jobs abandonados en `running` que ya no tienen intentos"""
+        exhausted = db.session.query(Job.id, Job.kind, Job.key).filter(
+            Job.status == 'running', Job.started_at < stale_before, Job.attempts >= Job.max_attempts
+        ).all()
+
+        for job_id, kind, key in exhausted:
+            # Condicional como el reclamo: si otro worker ya lo marcó, no se cuenta dos veces
+            result = db.session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == 'running')
+                .values(status='failed', finished_at=now, last_error='Abandonado en ejecución sin intentos restantes')
+            )
+            db.session.commit()
+
+            if result.rowcount == 1:
+                JOB_RESULTS.inc(kind=kind, result='failed')
+                logger.warning("Job abandonado sin intentos restantes", extra={'kind': kind, 'key': key})
+
+    @staticmethod
+    def run_job(job: Job) -> bool:
+        """Ejecuta un job reclamado y registra el resultado"""
+        handler = JOB_HANDLERS.get(job.kind)
+
+        try:
+            if not handler:
+                raise LookupError(f"No hay handler para el tipo de job '{job.kind}'")
+            handler(job.payload or {})
+        except Exception as e:
+            db.session.rollback()
+            JobService._mark_failed(job, str(e))
+            return False
+
+        job.status = 'done'
+        job.finished_at = datetime.utcnow()
+        job.last_error = None
+        db.session.commit()
+
+        JOB_LATENCY.observe((job.finished_at - job.created_at).total_seconds(), kind=job.kind)
+        JOB_RESULTS.inc(kind=job.kind, result='done')
+        return True
+
+    @staticmethod
+    def _mark_failed(job: Job, error: str):
+        """Reprograma el job con backoff exponencial o lo da por fallido"""
+        job.last_error = error
+
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = datetime.utcnow()
+            JOB_RESULTS.inc(kind=job.kind, result='failed')
+        else:
+            JOB_RESULTS.inc(kind=job.kind, result='retry')
+            job.status = 'pending'
+            job.run_at = datetime.utcnow() + timedelta(seconds=JobService.retry_delay(job.attempts))
+
+        db.session.commit()
+        logger.warning("Error ejecutando job", extra={
+            'kind': job.kind, 'key': job.key, 'attempt': job.attempts, 'status': job.status, 'error': error
+        })
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        """Backoff exponencial con jitter: base * 2^(n-1), acotado"""
+        base = current_app.config['JOB_RETRY_BASE_DELAY']
+        max_delay = current_app.config['JOB_RETRY_MAX_DELAY']
+        delay = min(max_delay, base * (2 ** max(attempts - 1, 0)))
+        return delay * random.uniform(0.8, 1.2)
+
+    @staticmethod
+    def get_stats() -> Dict:
+        """Profundidad de la cola por estado y latencia de los jobs recientes"""
+        now = datetime.utcnow()
+
+        depth = {status: 0 for status in Job.VALID_STATUSES}
+        for status, count in db.session.query(Job.status, func.count(Job.id)).group_by(Job.status):
+            depth[status] = count
+
+        oldest = db.session.query(func.min(Job.run_at)).filter(
+            Job.status == 'pending', Job.run_at <= now
+        ).scalar()
+
+        recent = db.session.query(Job.created_at, Job.started_at, Job.finished_at).filter(
+            Job.status == 'done', Job.finished_at.isnot(None)
+        ).order_by(Job.finished_at.desc()).limit(200).all()
+
+        wait_times = sorted((started - created).total_seconds() for created, started, _ in recent)
+        run_times = sorted((finished - started).total_seconds() for _, started, finished in recent)
+
+        return {
+            'depth': depth,
+            'oldest_pending_age': (now - oldest).total_seconds() if oldest else 0,
+            'latency': {
+                'sample_size': len(recent),
+                'wait_p50': _percentile(wait_times, 50),
+                'wait_p95': _percentile(wait_times, 95),
+                'run_p50': _percentile(run_times, 50),
+                'run_p95': _percentile(run_times, 95)
+            }
+        }
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Percentil de una lista ya ordenada (0 si está vacía)"""
+    if not values:
+        return 0
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class JobWorkerPool:
+    """Pool de hilos que consumen la cola de jobs dentro del contexto de la app"""
+
+    def __init__(self, app, concurrency: int = None, poll_interval: float = None):
+        self.app = app
+        self.concurrency = concurrency or app.config['JOB_WORKER_CONCURRENCY']
+        self.poll_interval = poll_interval or app.config['JOB_POLL_INTERVAL']
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def run_forever(self):
+        """Arranca los workers y bloquea hasta Ctrl+C"""
+        self.start()
+        try:
+            while not self._stop.is_set():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _work(self):
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    job = JobService.claim_next()
+                    if job:
+                        JobService.run_job(job)
+                        continue
+                except Exception as e:
+                    db.session.rollback()
+                    logger.exception("Error en worker de jobs")
+
+            self._stop.wait(self.poll_interval)
@@ -0,0 +1,331 @@
+import json
+import logging
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Dict, IO, Iterator, List, Optional, Tuple
+from flask import current_app
+from sqlalchemy import delete, insert
+from app.extensions import db
+from app.models import Anime, EpisodeNotification, Favorite, User, Watchlist
+from app.scrapers import get_available_sources
+from app.utils.helpers import normalize_title
+
+logger = logging.getLogger(__name__)
+
+# Versión del formato NDJSON de exportación (la primera línea la indica)
+EXPORT_VERSION = 1
+
+# Estados de la lista de MyAnimeList (texto o código numérico) -> Watchlist.status
+MAL_STATUSES = {
+    'watching': 'watching', '1': 'watching',
+    'completed': 'completed', '2': 'completed',
+    'on-hold': 'on_hold', '3': 'on_hold',
+    'dropped': 'dropped', '4': 'dropped',
+    'plan to watch': 'plan_to_watch', '6': 'plan_to_watch',
+}
+
+# Campos de la watchlist que viajan en la exportación y se aceptan al importar
+WATCHLIST_FIELDS = ('status', 'last_episode', 'preferred_source', 'notes', 'started_at', 'completed_at')
+
+# Títulos sin encontrar que se listan en el resumen final de una importación
+MAX_REPORTED_UNMATCHED = 100
+
+
+def _parse_date(value) -> Optional[datetime]:
+    """Fecha ISO o 'AAAA-MM-DD' (MAL usa '0000-00-00' para "sin fecha")"""
+    if not value or str(value).startswith('0000'):
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def _parse_episode(value) -> int:
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+class LibraryService:
+    """Exportación e importación de la biblioteca de un usuario (watchlist y favoritos)"""
+
+    # ==================== EXPORTACIÓN ====================
+
+    @staticmethod
+    def export_lines(user: User) -> Iterator[str]:
+        """
+        Biblioteca del usuario en NDJSON: una cabecera y después una línea
+        por entrada de la watchlist y por favorito.
+
+        Las filas se leen por bloques de LIBRARY_EXPORT_BATCH_SIZE (paginando
+        por id, solo las columnas que se exportan), así que la memoria no
+        depende del tamaño de la biblioteca.
+        """
+        batch_size = current_app.config['LIBRARY_EXPORT_BATCH_SIZE']
+
+        yield json.dumps({
+            'kind': 'library',
+            'version': EXPORT_VERSION,
+            'username': user.username,
+            'exported_at': datetime.utcnow().isoformat()
+        }) + '\n'
+
+        watchlist = db.session.query(
+            Watchlist.id, Watchlist.anime_id, Anime.slug, Anime.title,
+            *(getattr(Watchlist, field) for field in WATCHLIST_FIELDS),
+            Watchlist.created_at, Watchlist.updated_at
+        ).join(Anime, Anime.id == Watchlist.anime_id).filter(Watchlist.user_id == user.id)
+
+        for row in LibraryService._in_chunks(watchlist, Watchlist.id, batch_size):
+            yield LibraryService._export_line('watchlist', row)
+
+        favorites = db.session.query(
+            Favorite.id, Favorite.anime_id, Anime.slug, Anime.title, Favorite.added_at
+        ).join(Anime, Anime.id == Favorite.anime_id).filter(Favorite.user_id == user.id)
+
+        for row in LibraryService._in_chunks(favorites, Favorite.id, batch_size):
+            yield LibraryService._export_line('favorite', row)
+
+    @staticmethod
+    def _in_chunks(query, id_column, batch_size: int) -> Iterator:
+        """Recorre una consulta por bloques de `batch_size` filas ordenadas por `id_column`"""
+        last_id = 0
+        while True:
+            rows = query.filter(id_column > last_id).order_by(id_column).limit(batch_size).all()
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    @staticmethod
+    def _export_line(kind: str, row) -> str:
+        data = row._asdict()
+        del data['id']
+        for key, value in data.items():
+            if isinstance(value, datetime):
+                data[key] = value.isoformat()
+        return json.dumps({'kind': kind, **data}, ensure_ascii=False) + '\n'
+
+    # ==================== IMPORTACIÓN ====================
+
+    @staticmethod
+    def read_entries(stream: IO[bytes], fmt: str) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        """
+        Lee las entradas de un export de MyAnimeList (XML, `fmt='mal'`) o de
+        uno propio (NDJSON). Retorna (entradas, error).
+
+        Cada entrada: {'kind': 'watchlist' | 'favorite', 'title', 'slug',
+        más los campos de WATCHLIST_FIELDS que traiga}.
+        """
+        limit = current_app.config['LIBRARY_IMPORT_MAX_ENTRIES']
+        parser = LibraryService._parse_mal if fmt == 'mal' else LibraryService._parse_ndjson
+
+        entries = []
+        try:
+            for entry in parser(stream):
+                if len(entries) >= limit:
+                    return None, f'Se aceptan como máximo {limit} entradas por importación'
+                entries.append(entry)
+        except ValueError as e:
+            return None, str(e)
+
+        return entries, None
+
+    @staticmethod
+    def _parse_mal(stream: IO[bytes]) -> Iterator[Dict]:
+        """Elementos <anime> del XML de MAL, liberando cada uno tras leerlo"""
+        try:
+            for _, element in ET.iterparse(stream, events=('end',)):
+                if element.tag != 'anime':
+                    continue
+                status = (element.findtext('my_status') or '').strip().lower()
+                yield {
+                    'kind': 'watchlist',
+                    'title': (element.findtext('series_title') or '').strip(),
+                    'slug': None,
+                    'status': MAL_STATUSES.get(status, 'plan_to_watch'),
+                    'last_episode': _parse_episode(element.findtext('my_watched_episodes')),
+                    'notes': (element.findtext('my_comments') or '').strip() or None,
+                    'started_at': _parse_date(element.findtext('my_start_date')),
+                    'completed_at': _parse_date(element.findtext('my_finish_date')),
+                }
+                element.clear()
+        except ET.ParseError as e:
+            raise ValueError(f'XML inválido: {e}')
+
+    @staticmethod
+    def _parse_ndjson(stream: IO[bytes]) -> Iterator[Dict]:
+        """
+        Líneas de `export_lines` (se ignoran la cabecera y las líneas vacías).
+
+        `preferred_source` y `notes` tienen que ser texto (o null); una
+        fuente que este nodo no tiene se descarta en vez de guardarla.
+        """
+        sources = set(get_available_sources())
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                raise ValueError(f'Línea {number}: JSON inválido')
+            if not isinstance(data, dict):
+                raise ValueError(f'Línea {number}: se esperaba un objeto')
+
+            kind = data.get('kind', 'watchlist')
+            if kind not in ('watchlist', 'favorite'):
+                continue
+
+            slug = data.get('slug')
+            entry = {
+                'kind': kind,
+                'title': str(data.get('title') or '').strip(),
+                'slug': slug if isinstance(slug, str) else None
+            }
+            if kind == 'watchlist':
+                status = data.get('status')
+                preferred_source, notes = data.get('preferred_source'), data.get('notes')
+                for field, value in (('preferred_source', preferred_source), ('notes', notes)):
+                    if value is not None and not isinstance(value, str):
+                        raise ValueError(f'Línea {number}: {field} debe ser texto')
+                entry.update({
+                    'status': status if status in Watchlist.VALID_STATUSES else 'plan_to_watch',
+                    'last_episode': _parse_episode(data.get('last_episode')),
+                    'preferred_source': preferred_source if preferred_source in sources else None,
+                    'notes': notes,
+                    'started_at': _parse_date(data.get('started_at')),
+                    'completed_at': _parse_date(data.get('completed_at')),
+                })
+            yield entry
+
+    @staticmethod
+    def import_entries(user_id: int, entries: List[Dict], overwrite: bool = False) -> Iterator[Dict]:
+        """
+        Importa las entradas en la biblioteca del usuario y va emitiendo el
+        progreso (un dict por lote de LIBRARY_IMPORT_BATCH_SIZE; el último
+        es el resumen).
+
+        Los animes se buscan todos de una vez: por slug, por título exacto y
+        por `normalize_title`. Cada lote se inserta en su propia transacción
+        con un INSERT múltiple. Las entradas que ya están en la biblioteca
+        se dejan como están salvo con `overwrite`.
+
+        Si un lote falla se deshace solo ese lote, se emite {'stage': 'error'}
+        con lo importado hasta entonces y la importación se detiene.
+        """
+        batch_size = current_app.config['LIBRARY_IMPORT_BATCH_SIZE']
+        total = len(entries)
+        counts = {'created': 0, 'updated': 0, 'skipped': 0, 'unmatched': 0}
+        unmatched = []
+
+        yield {'stage': 'matching', 'total': total}
+        anime_ids = LibraryService.match_animes(entries)
+
+        seen = set()
+        for start in range(0, total, batch_size):
+            batch = []
+            for entry, anime_id in zip(entries[start:start + batch_size], anime_ids[start:start + batch_size]):
+                if anime_id is None:
+                    counts['unmatched'] += 1
+                    if len(unmatched) < MAX_REPORTED_UNMATCHED:
+                        unmatched.append(entry['title'] or entry['slug'])
+                elif (entry['kind'], anime_id) in seen:
+                    counts['skipped'] += 1  # repetida en el propio archivo
+                else:
+                    seen.add((entry['kind'], anime_id))
+                    batch.append((entry, anime_id))
+
+            batch_counts = dict(counts)
+            try:
+                LibraryService._import_batch(user_id, batch, overwrite, batch_counts)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.exception("Error importando un lote de la biblioteca", extra={'user_id': user_id})
+                yield {
+                    'stage': 'error', 'error': 'No se pudo importar un lote; lo anterior sí se guardó',
+                    'processed': start, 'total': total, **counts
+                }
+                return
+            counts = batch_counts
+
+            yield {'stage': 'importing', 'processed': min(start + batch_size, total), 'total': total, **counts}
+
+        yield {'stage': 'done', 'total': total, **counts, 'unmatched_titles': unmatched}
+
+    @staticmethod
+    def match_animes(entries: List[Dict]) -> List[Optional[int]]:
+        """Id del anime de cada entrada (None si no se encuentra), con consultas en bloque"""
+        by_slug = {}
+        slugs = list({entry['slug'] for entry in entries if entry.get('slug')})
+        for start in range(0, len(slugs), 500):
+            by_slug.update(
+                db.session.query(Anime.slug, Anime.id).filter(Anime.slug.in_(slugs[start:start + 500]))
+            )
+
+        pending = [entry for entry in entries if by_slug.get(entry.get('slug')) is None and entry['title']]
+        by_title, by_normalized = {}, {}
+        if pending:
+            # Un recorrido de (id, título) por importación; ante varios con el
+            # mismo título normalizado gana el más antiguo (normalmente la 1ª temporada)
+            for anime_id, title in db.session.query(Anime.id, Anime.title).order_by(Anime.id):
+                by_title.setdefault(title.casefold(), anime_id)
+                by_normalized.setdefault(normalize_title(title), anime_id)
+
+        matches = []
+        for entry in entries:
+            anime_id = by_slug.get(entry.get('slug'))
+            if anime_id is None and entry['title']:
+                anime_id = by_title.get(entry['title'].casefold()) or by_normalized.get(normalize_title(entry['title']))
+            matches.append(anime_id)
+        return matches
+
+    @staticmethod
+    def _import_batch(user_id: int, batch: List[Tuple[Dict, int]], overwrite: bool, counts: Dict):
+        """Inserta (o actualiza con `overwrite`) un lote en la sesión actual, sin commit"""
+        watchlist = {anime_id: entry for entry, anime_id in batch if entry['kind'] == 'watchlist'}
+        favorites = {anime_id for entry, anime_id in batch if entry['kind'] == 'favorite'}
+
+        if watchlist:
+            existing = {
+                row.anime_id: row for row in Watchlist.query.filter(
+                    Watchlist.user_id == user_id, Watchlist.anime_id.in_(watchlist)
+                )
+            }
+            new_rows = []
+            for anime_id, entry in watchlist.items():
+                values = {field: entry[field] for field in WATCHLIST_FIELDS if field in entry}
+                row = existing.get(anime_id)
+                if row is None:
+                    new_rows.append({'user_id': user_id, 'anime_id': anime_id, **values})
+                elif overwrite:
+                    for field, value in values.items():
+                        setattr(row, field, value)
+                    counts['updated'] += 1
+                else:
+                    counts['skipped'] += 1
+
+            if new_rows:
+                db.session.execute(insert(Watchlist), new_rows)
+                counts['created'] += len(new_rows)
+
+            if overwrite and existing:
+                # El progreso ha cambiado: los avisos se recalculan en el próximo compute-notifications
+                db.session.execute(delete(EpisodeNotification).where(
+                    EpisodeNotification.user_id == user_id,
+                    EpisodeNotification.anime_id.in_(existing)
+                ))
+
+        if favorites:
+            existing = {
+                anime_id for (anime_id,) in db.session.query(Favorite.anime_id).filter(
+                    Favorite.user_id == user_id, Favorite.anime_id.in_(favorites)
+                )
+            }
+            new_rows = [{'user_id': user_id, 'anime_id': anime_id} for anime_id in favorites - existing]
+            if new_rows:
+                db.session.execute(insert(Favorite), new_rows)
+            counts['created'] += len(new_rows)
+            counts['skipped'] += len(existing)
@@ -0,0 +1,130 @@
+import logging
+from datetime import datetime
+from typing import Dict, List
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.orm import joinedload
+from app.extensions import db
+from app.models import Anime, EpisodeList, EpisodeNotification, Watchlist
+from app.services.anime_service import AnimeService
+
+# Estados de la watchlist que reciben avisos de episodios nuevos
+NOTIFY_STATUSES = ['watching', 'on_hold']
+DEFAULT_SOURCE = 'animeflv'
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationService:
+    """Calcula en batch los episodios nuevos de las watchlists de todos los usuarios"""
+
+    @staticmethod
+    def compute_all(log=None) -> Dict:
+        """
+        Recalcula la tabla `episode_notifications`.
+
+        1. Refresca una sola vez cada anime distinto referenciado por alguna
+           watchlist (solo los que están en emisión o no tienen lista).
+        2. Calcula los episodios sin ver de todos los usuarios con un único
+           INSERT ... SELECT sobre watchlist + episode_lists.
+        """
+        refreshed = NotificationService._refresh_watched_animes(log)
+
+        source = func.coalesce(Watchlist.preferred_source, DEFAULT_SOURCE)
+        last_seen = func.coalesce(Watchlist.last_episode, 0)
+        now = datetime.utcnow()
+
+        unseen = select(
+            Watchlist.user_id,
+            Watchlist.anime_id,
+            EpisodeList.source,
+            last_seen,
+            EpisodeList.last_episode,
+            EpisodeList.last_episode - last_seen,
+            literal(now)
+        ).join(
+            EpisodeList,
+            db.and_(EpisodeList.anime_id == Watchlist.anime_id, EpisodeList.source == source)
+        ).where(
+            Watchlist.status.in_(NOTIFY_STATUSES),
+            EpisodeList.last_episode > last_seen
+        )
+
+        try:
+            db.session.execute(delete(EpisodeNotification))
+            result = db.session.execute(
+                insert(EpisodeNotification).from_select(
+                    ['user_id', 'anime_id', 'source', 'last_seen_episode',
+                     'latest_episode', 'unseen_count', 'computed_at'],
+                    unseen
+                )
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return {'refreshed': refreshed, 'notifications': result.rowcount}
+
+    @staticmethod
+    def _refresh_watched_animes(log=None) -> int:
+        """Refresca la lista de episodios de cada anime distinto en las watchlists"""
+        log = log or logger.warning
+        pairs = db.session.query(
+            Watchlist.anime_id,
+            func.coalesce(Watchlist.preferred_source, DEFAULT_SOURCE)
+        ).filter(
+            Watchlist.status.in_(NOTIFY_STATUSES)
+        ).distinct().all()
+
+        if not pairs:
+            return 0
+
+        anime_ids = {anime_id for anime_id, _ in pairs}
+        animes = {anime.id: anime for anime in Anime.query.filter(Anime.id.in_(anime_ids))}
+        stored = {
+            (episode_list.anime_id, episode_list.source)
+            for episode_list in EpisodeList.query.filter(EpisodeList.anime_id.in_(anime_ids))
+        }
+
+        refreshed = 0
+        for anime_id, source in pairs:
+            anime = animes.get(anime_id)
+            if not anime or not anime.has_source(source):
+                continue
+
+            # Los finalizados con lista guardada ya no cambian
+            if not anime.is_airing() and (anime_id, source) in stored:
+                continue
+
+            if AnimeService.fetch_episodes(anime, source):
+                refreshed += 1
+            else:
+                log(f"No se pudieron refrescar los episodios de {anime.slug} ({source})")
+
+        return refreshed
+
+    @staticmethod
+    def get_for_user(user_id: int) -> List[EpisodeNotification]:
+        """Avisos materializados de un usuario (lectura barata)"""
+        return EpisodeNotification.query.filter_by(user_id=user_id).options(
+            joinedload(EpisodeNotification.anime).options(Anime.summary_load())
+        ).order_by(
+            EpisodeNotification.unseen_count.desc()
+        ).all()
+
+    @staticmethod
+    def sync_entry(entry: Watchlist):
+        """Ajusta el aviso de una entrada tras actualizar su progreso (sin commit)"""
+        notification = EpisodeNotification.query.filter_by(
+            user_id=entry.user_id, anime_id=entry.anime_id
+        ).first()
+
+        if not notification:
+            return
+
+        last_seen = entry.last_episode or 0
+        if entry.status not in NOTIFY_STATUSES or last_seen >= notification.latest_episode:
+            db.session.delete(notification)
+        else:
+            notification.last_seen_episode = last_seen
+            notification.unseen_count = notification.latest_episode - last_seen
@@ -0,0 +1,147 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from flask import current_app
+from app.extensions import cache
+from app.models import Anime
+from app.scrapers import get_scraper
+from app.services.anime_service import AnimeService
+from app.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_RESULTS = REGISTRY.counter(
+    'kotomare_prefetch_total',
+    'Prefetch de videos por resultado (queued, cached, budget, busy, done, empty, failed)', ('result',))
+
+
+class PrefetchBudget:
+    """
+    Token bucket: como mucho `per_minute` resoluciones por minuto, con
+    ráfagas de hasta `per_minute` tokens acumulados.
+    """
+
+    def __init__(self, per_minute: int):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class PrefetchService:
+    """
+    Resuelve en segundo plano los videos de los próximos episodios para que
+    estén en la caché compartida cuando el usuario pulse "siguiente".
+
+    Corre en un pool de hilos propio (PREFETCH_WORKERS) sin tocar la base
+    de datos: solo scraper + caché. El gasto está acotado por un presupuesto
+    de resoluciones por minuto y por un máximo de tareas pendientes; lo que
+    no cabe se descarta, nunca se hace esperar a la petición.
+    """
+
+    _lock = threading.Lock()
+    _executor: Optional[ThreadPoolExecutor] = None
+    _budget: Optional[PrefetchBudget] = None
+    _pid: Optional[int] = None
+    _inflight = set()
+
+    @staticmethod
+    def schedule_for_anime(anime: Anime, episode_number: int, source: str = None) -> int:
+        """Encola los episodios siguientes a `episode_number` de un anime"""
+        source = source or 'animeflv'
+        source_data = anime.get_source(source) or {}
+        return PrefetchService.schedule(
+            source, source_data.get('id'), episode_number, source_data.get('episodes_count')
+        )
+
+    @staticmethod
+    def schedule(source: str, source_id: Optional[str], episode_number: int,
+                 episodes_count: Optional[int] = None) -> int:
+        """
+        Encola los videos de los episodios N+1..N+PREFETCH_DEPTH.
+
+        Se llama desde la petición (necesita la config de la app). Retorna
+        cuántos episodios se han encolado.
+        """
+        config = current_app.config
+        if not config['PREFETCH_ENABLED'] or not source_id or not episode_number:
+            return 0
+        if not get_scraper(source):
+            return 0
+
+        queued = 0
+        for number in range(episode_number + 1, episode_number + 1 + config['PREFETCH_DEPTH']):
+            if episodes_count and number > episodes_count:
+                break
+            if PrefetchService._submit(source, source_id, number, config):
+                queued += 1
+        return queued
+
+    @staticmethod
+    def _submit(source: str, source_id: str, episode_number: int, config) -> bool:
+        key = AnimeService.videos_cache_key(source, source_id, episode_number)
+
+        # `expires_in` no cuenta como acierto/fallo de la caché de videos
+        if cache.expires_in(key) is not None:
+            PREFETCH_RESULTS.inc(result='cached')
+            return False
+
+        executor, budget = PrefetchService._get_pool(config)
+        with PrefetchService._lock:
+            if key in PrefetchService._inflight:
+                return False
+            if len(PrefetchService._inflight) >= config['PREFETCH_MAX_PENDING']:
+                PREFETCH_RESULTS.inc(result='busy')
+                return False
+            if not budget.try_acquire():
+                PREFETCH_RESULTS.inc(result='budget')
+                return False
+            PrefetchService._inflight.add(key)
+
+        executor.submit(PrefetchService._resolve, key, source, source_id, episode_number)
+        PREFETCH_RESULTS.inc(result='queued')
+        return True
+
+    @staticmethod
+    def _resolve(key: str, source: str, source_id: str, episode_number: int):
+        """Tarea del pool: scrapea los videos y los deja en la caché"""
+        try:
+            videos = get_scraper(source).get_video_sources(source_id, episode_number)
+            if videos:
+                cache.set(key, videos)
+            PREFETCH_RESULTS.inc(result='done' if videos else 'empty')
+        except Exception as e:
+            PREFETCH_RESULTS.inc(result='failed')
+            logger.info("Error en el prefetch de videos", extra={
+                'source': source, 'source_id': source_id, 'episode': episode_number, 'error': str(e)
+            })
+        finally:
+            with PrefetchService._lock:
+                PrefetchService._inflight.discard(key)
+
+    @staticmethod
+    def _get_pool(config):
+        """Pool y presupuesto del proceso (se recrean tras un fork)"""
+        with PrefetchService._lock:
+            if PrefetchService._executor is None or PrefetchService._pid != os.getpid():
+                PrefetchService._executor = ThreadPoolExecutor(
+                    max_workers=config['PREFETCH_WORKERS'], thread_name_prefix='prefetch'
+                )
+                PrefetchService._budget = PrefetchBudget(config['PREFETCH_BUDGET_PER_MINUTE'])
+                PrefetchService._inflight = set()
+                PrefetchService._pid = os.getpid()
+            return PrefetchService._executor, PrefetchService._budget
@@ -0,0 +1,197 @@
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, List, Set
+from flask import current_app
+from app.extensions import db
+from app.models import Anime, AnimeSimilarity
+from app.utils.helpers import slugify
+
+logger = logging.getLogger(__name__)
+
+# Peso de cada rasgo en el vector de un anime. Mandan los géneros; tipo y
+# estado solo desempatan entre animes con géneros parecidos.
+FEATURE_WEIGHTS = {'genre': 1.0, 'type': 0.5, 'status': 0.25}
+
+# Las puntuaciones se guardan redondeadas a 4 decimales: por debajo de esto
+# una puntuación nueva se considera empate con la guardada
+SCORE_EPSILON = 5e-5
+
+
+def anime_features(genres, anime_type, status) -> Dict[str, float]:
+    """Rasgos de un anime con su peso ('genre:accion' -> 1.0). Sin géneros no tiene ninguno"""
+    features = {
+        f'genre:{key}': FEATURE_WEIGHTS['genre']
+        for key in (slugify(str(genre)) for genre in genres or []) if key
+    }
+    if not features:
+        return {}
+    if anime_type and slugify(anime_type):
+        features[f'type:{slugify(anime_type)}'] = FEATURE_WEIGHTS['type']
+    if status and slugify(status):
+        features[f'status:{slugify(status)}'] = FEATURE_WEIGHTS['status']
+    return features
+
+
+def features_signature(features: Dict[str, float]) -> str:
+    """Hash de los rasgos: si no cambia, la fila del anime tampoco"""
+    return hashlib.sha1('|'.join(f'{key}={weight}' for key, weight in sorted(features.items())).encode()).hexdigest()
+
+
+class SimilarityService:
+    """Animes parecidos por géneros, tipo y estado, precalculados en batch"""
+
+    @staticmethod
+    def compute(top_n: int = None, full: bool = False, log=None) -> Dict:
+        """
+        Recalcula la tabla `anime_similarities`.
+
+        Cada anime es un vector de rasgos (géneros, tipo y estado con sus
+        pesos) normalizado, y el parecido entre dos es el coseno, así que
+        las similitudes de un bloque de filas contra todo el catálogo son
+        un solo producto de matrices.
+
+        Solo se recalculan las filas de animes nuevos o cuyos rasgos han
+        cambiado (firma distinta), más las de animes cuya lista guardada
+        queda desfasada: incluye uno que cambió o se borró, o uno de los
+        que cambiaron puntúa ahora por encima de su último puesto. Con
+        `full` (o tras cambiar SIMILAR_TOP_N) se recalcula todo.
+        """
+        import numpy as np
+
+        log = log or logger.info
+        top_n = top_n or current_app.config['SIMILAR_TOP_N']
+        batch_size = current_app.config['SIMILAR_BATCH_SIZE']
+
+        rows = db.session.query(Anime.id, Anime.genres, Anime.type, Anime.status).order_by(Anime.id).all()
+        ids = [row.id for row in rows]
+        features = [anime_features(row.genres, row.type, row.status) for row in rows]
+        signatures = [features_signature(row_features) for row_features in features]
+        matrix = SimilarityService._encode(features, np)
+
+        stored = {entry.anime_id: entry for entry in AnimeSimilarity.query}
+        position = {anime_id: i for i, anime_id in enumerate(ids)}
+        # Filas huérfanas (el anime se borró sin pasar por el ORM)
+        removed = [anime_id for anime_id in stored if anime_id not in position]
+
+        changed = [
+            i for i, anime_id in enumerate(ids)
+            if full or anime_id not in stored or stored[anime_id].signature != signatures[i]
+        ]
+        targets = set(changed)
+        if not full:
+            targets |= SimilarityService._stale_rows(matrix, ids, stored, changed, top_n, batch_size, np)
+        targets = sorted(targets)
+
+        now = datetime.utcnow()
+        try:
+            if removed:
+                AnimeSimilarity.query.filter(
+                    AnimeSimilarity.anime_id.in_(removed)
+                ).delete(synchronize_session=False)
+
+            for start in range(0, len(targets), batch_size):
+                chunk = targets[start:start + batch_size]
+                for i, similar in zip(chunk, SimilarityService._top_similar(matrix, chunk, top_n, np)):
+                    entry = stored.get(ids[i]) or AnimeSimilarity(anime_id=ids[i])
+                    entry.signature = signatures[i]
+                    entry.similar = [[ids[j], score] for j, score in similar]
+                    entry.computed_at = now
+                    db.session.add(entry)
+                db.session.commit()
+                log(f'{min(start + batch_size, len(targets))}/{len(targets)} animes recalculados')
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return {'animes': len(ids), 'changed': len(changed), 'recomputed': len(targets), 'removed': len(removed)}
+
+    @staticmethod
+    def get_similar(anime: Anime, limit: int) -> List[Dict]:
+        """Animes parecidos ya calculados, con su puntuación (vacío si aún no hay)"""
+        entry = db.session.get(AnimeSimilarity, anime.id)
+        if entry is None:
+            return []
+
+        pairs = (entry.similar or [])[:limit]
+        animes = {
+            similar.id: similar
+            for similar in Anime.query.options(Anime.summary_load()).filter(
+                Anime.id.in_([anime_id for anime_id, _ in pairs])
+            )
+        }
+        return [
+            {**animes[anime_id].to_summary_dict(), 'score': score}
+            for anime_id, score in pairs if anime_id in animes
+        ]
+
+    @staticmethod
+    def _encode(features: List[Dict[str, float]], np):
+        """Matriz (animes x rasgos) con las filas normalizadas; los animes sin rasgos quedan a cero"""
+        vocabulary = {}
+        for row_features in features:
+            for key in row_features:
+                vocabulary.setdefault(key, len(vocabulary))
+
+        matrix = np.zeros((len(features), max(1, len(vocabulary))), dtype=np.float32)
+        for i, row_features in enumerate(features):
+            for key, weight in row_features.items():
+                matrix[i, vocabulary[key]] = weight
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms
+
+    @staticmethod
+    def _top_similar(matrix, chunk: List[int], top_n: int, np) -> List[List]:
+        """Los `top_n` más parecidos (posición, puntuación) de cada fila de `chunk`"""
+        k = min(top_n, len(matrix) - 1)
+        if k <= 0:
+            return [[] for _ in chunk]
+
+        scores = matrix[chunk] @ matrix.T
+        scores[np.arange(len(chunk)), chunk] = 0  # él mismo no cuenta
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+
+        return [
+            [(int(j), round(float(score), 4)) for j, score in zip(row, row_scores) if score > 0]
+            for row, row_scores in zip(best, best_scores)
+        ]
+
+    @staticmethod
+    def _stale_rows(matrix, ids: List[int], stored: Dict[int, AnimeSimilarity], changed: List[int],
+                    top_n: int, batch_size: int, np) -> Set[int]:
+        """Filas sin cambios cuya lista guardada deja de ser correcta por animes que cambiaron o se borraron"""
+        existing = set(ids)
+        changed_ids = {ids[i] for i in changed}
+        changed_set = set(changed)
+        unchanged = [i for i in range(len(ids)) if i not in changed_set]
+
+        stale = set()
+        candidates, thresholds = [], []
+        for i in unchanged:
+            similar = stored[ids[i]].similar or []
+            if any(anime_id in changed_ids or anime_id not in existing for anime_id, _ in similar):
+                stale.add(i)
+                continue
+            candidates.append(i)
+            # Con la lista llena, para entrar hay que superar al último; si no, basta con puntuar
+            thresholds.append(similar[-1][1] if len(similar) >= top_n else 0.0)
+
+        if not changed or not candidates:
+            return stale
+
+        changed_matrix = matrix[changed]
+        thresholds = np.asarray(thresholds, dtype=np.float32)
+        for start in range(0, len(candidates), batch_size):
+            chunk = candidates[start:start + batch_size]
+            best = (matrix[chunk] @ changed_matrix.T).max(axis=1)
+            entering = best > thresholds[start:start + batch_size] + SCORE_EPSILON
+            stale.update(i for i, enters in zip(chunk, entering) if enters)
+        return stale
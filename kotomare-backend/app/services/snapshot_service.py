@@ -0,0 +1,230 @@
+import gzip
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List
+from flask import current_app
+from sqlalchemy import func, text
+from app.extensions import db
+from app.models import Anime, EpisodeList
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 'kotomare-catalog'
+SNAPSHOT_VERSION = 1
+
+# Tablas del snapshot, en orden de carga, con las columnas que se vuelcan.
+# Los ids de las listas de episodios no se guardan: nadie los referencia.
+SNAPSHOT_TABLES = {
+    'animes': (Anime, ('id', 'title', 'slug', 'synopsis', 'cover_image', 'banner_image', 'status', 'type',
+                       'genres', 'sources', 'created_at', 'updated_at')),
+    'episode_lists': (EpisodeList, ('anime_id', 'source', 'episodes', 'episodes_count', 'last_episode',
+                                    'updated_at')),
+}
+
+DATETIME_COLUMNS = {'created_at', 'updated_at'}
+
+
+class SnapshotService:
+    """
+    Snapshot del catálogo (animes con sus fuentes y listas de episodios)
+    para arrancar nodos nuevos sin tener que volver a scrapearlo.
+
+    El archivo es NDJSON comprimido con gzip: una cabecera con el formato,
+    la versión y las columnas de cada tabla; por tabla, una línea de inicio
+    y una fila por línea como array (sin repetir nombres de columna); y un
+    cierre con el número de filas para detectar archivos truncados.
+    """
+
+    @staticmethod
+    def export(path: str, log=None) -> Dict[str, int]:
+        """Vuelca el catálogo a `path` (se escribe aparte y se renombra al terminar)"""
+        log = log or logger.info
+        batch_size = current_app.config['SNAPSHOT_BATCH_SIZE']
+        counts = {}
+
+        tmp_path = f'{path}.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=current_app.config['SNAPSHOT_GZIP_LEVEL']) as f:
+            f.write(json.dumps({
+                'format': SNAPSHOT_FORMAT,
+                'version': SNAPSHOT_VERSION,
+                'created_at': datetime.utcnow().isoformat(),
+                'tables': {name: list(columns) for name, (_, columns) in SNAPSHOT_TABLES.items()}
+            }) + '\n')
+
+            for name, (model, columns) in SNAPSHOT_TABLES.items():
+                f.write(json.dumps({'table': name}) + '\n')
+                count = 0
+                query = db.session.query(*(getattr(model, column) for column in columns)).order_by(model.id)
+                for row in query.yield_per(batch_size):
+                    f.write(json.dumps(
+                        [value.isoformat() if isinstance(value, datetime) else value for value in row],
+                        ensure_ascii=False, separators=(',', ':')
+                    ) + '\n')
+                    count += 1
+                counts[name] = count
+                log(f'{name}: {count} filas')
+
+            f.write(json.dumps({'end': True, 'counts': counts}) + '\n')
+
+        os.replace(tmp_path, path)
+        return counts
+
+    @staticmethod
+    def load(path: str, log=None) -> Dict[str, int]:
+        """
+        Carga un snapshot con INSERT múltiples por lotes de SNAPSHOT_BATCH_SIZE.
+
+        Con la tabla de animes vacía (nodo nuevo) se conservan los ids del
+        snapshot. Si ya hay catálogo se fusiona: los animes cuyo slug ya
+        existe se dejan como están, los nuevos reciben id local, y de las
+        listas de episodios solo se añaden las que faltan.
+        """
+        log = log or logger.info
+        batch_size = current_app.config['SNAPSHOT_BATCH_SIZE']
+
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            try:
+                header = SnapshotService._read_header(next(f, None))
+                loader = _SnapshotLoader(header['tables'], batch_size, log)
+                table = None
+                for line in f:
+                    if line.startswith('['):
+                        if table is None:
+                            raise ValueError('Fila fuera de una tabla')
+                        loader.add(table, json.loads(line))
+                        continue
+
+                    marker = json.loads(line)
+                    loader.flush()
+                    if marker.get('end'):
+                        loader.check_counts(marker['counts'])
+                        break
+                    table = marker['table']
+                    if table not in SNAPSHOT_TABLES:
+                        raise ValueError(f'Tabla desconocida en el snapshot: {table}')
+                else:
+                    raise ValueError('Snapshot incompleto (falta el cierre)')
+
+                loader.finish()
+                db.session.commit()
+            except (EOFError, OSError) as e:
+                # gzip truncado o que no es gzip
+                db.session.rollback()
+                raise ValueError(f'No se pudo leer el snapshot: {e}')
+            except Exception:
+                db.session.rollback()
+                raise
+
+        return loader.loaded
+
+    @staticmethod
+    def _read_header(line) -> Dict:
+        header = json.loads(line) if line else {}
+        if header.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError('El archivo no es un snapshot del catálogo')
+        if header.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Versión de snapshot no soportada: {header.get('version')} (se espera {SNAPSHOT_VERSION})")
+        return header
+
+
+class _SnapshotLoader:
+    """Acumula las filas de una carga y las inserta por lotes"""
+
+    def __init__(self, tables: Dict[str, List[str]], batch_size: int, log):
+        self.tables = tables
+        self.batch_size = batch_size
+        self.log = log
+        self.loaded = {name: 0 for name in SNAPSHOT_TABLES}
+        self.read = {name: 0 for name in SNAPSHOT_TABLES}
+        self.batch: List[Dict] = []
+        self.table = None
+
+        self.keep_ids = db.session.query(func.count(Anime.id)).scalar() == 0
+        # Solo al fusionar: slug -> id local, e id del snapshot -> id local
+        self.local_ids: Dict[str, int] = {} if self.keep_ids else dict(db.session.query(Anime.slug, Anime.id))
+        self.anime_ids: Dict[int, int] = {}
+        self.existing_lists = set() if self.keep_ids else {
+            tuple(row) for row in db.session.query(EpisodeList.anime_id, EpisodeList.source)
+        }
+
+    def add(self, table: str, values: List):
+        row = {
+            column: _parse_value(column, value)
+            for column, value in zip(self.tables[table], values)
+            if column in SNAPSHOT_TABLES[table][1]
+        }
+        self.table = table
+        self.read[table] += 1
+        self.batch.append(row)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        rows, self.batch = self.batch, []
+        if self.table == 'animes':
+            rows = self._prepare_animes(rows)
+        else:
+            rows = self._prepare_episode_lists(rows)
+
+        if rows:
+            model = SNAPSHOT_TABLES[self.table][0]
+            db.session.execute(model.__table__.insert(), rows)
+            self.loaded[self.table] += len(rows)
+        self.log(f'{self.table}: {self.loaded[self.table]} filas cargadas')
+
+    def check_counts(self, counts: Dict[str, int]):
+        for name, count in counts.items():
+            if self.read.get(name) != count:
+                raise ValueError(f'Snapshot corrupto: {name} tiene {self.read.get(name)} filas de {count}')
+
+    def finish(self):
+        """Con ids explícitos en PostgreSQL la secuencia no avanza sola"""
+        if self.keep_ids and self.loaded['animes'] and db.engine.dialect.name == 'postgresql':
+            db.session.execute(text(
+                "SELECT setval(pg_get_serial_sequence('animes', 'id'), (SELECT MAX(id) FROM animes))"
+            ))
+
+    def _prepare_animes(self, rows: List[Dict]) -> List[Dict]:
+        if self.keep_ids:
+            return rows
+
+        new_rows, snapshot_ids = [], {}
+        for row in rows:
+            snapshot_id = row.pop('id')
+            local_id = self.local_ids.get(row['slug'])
+            if local_id is not None:
+                self.anime_ids[snapshot_id] = local_id
+            elif row['slug'] not in snapshot_ids:
+                snapshot_ids[row['slug']] = snapshot_id
+                new_rows.append(row)
+
+        if new_rows:
+            # Se insertan aquí para conocer sus ids locales (por slug) antes de las listas de episodios
+            db.session.execute(Anime.__table__.insert(), new_rows)
+            self.loaded['animes'] += len(new_rows)
+            for slug, anime_id in db.session.query(Anime.slug, Anime.id).filter(Anime.slug.in_(snapshot_ids)):
+                self.local_ids[slug] = anime_id
+                self.anime_ids[snapshot_ids[slug]] = anime_id
+        return []
+
+    def _prepare_episode_lists(self, rows: List[Dict]) -> List[Dict]:
+        if self.keep_ids:
+            return rows
+        new_rows = []
+        for row in rows:
+            anime_id = self.anime_ids.get(row['anime_id'])
+            if anime_id is None or (anime_id, row['source']) in self.existing_lists:
+                continue
+            self.existing_lists.add((anime_id, row['source']))
+            new_rows.append({**row, 'anime_id': anime_id})
+        return new_rows
+
+
+def _parse_value(column: str, value):
+    if column in DATETIME_COLUMNS and value is not None:
+        return datetime.fromisoformat(value)
+    return value
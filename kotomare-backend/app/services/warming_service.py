@@ -0,0 +1,118 @@
+import logging
+import time
+from typing import Dict
+from flask import current_app
+from app.extensions import cache, popularity
+from app.models import Anime, EpisodeList
+from app.scrapers import get_scraper, get_available_sources
+from app.services.anime_service import AnimeService
+from app.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+WARM_RESULTS = REGISTRY.counter(
+    'kotomare_cache_warm_total', 'Entradas populares revisadas por el calentado (fresh, refreshed, failed)',
+    ('kind', 'result'))
+
+
+class WarmingService:
+    """
+    Calienta la caché con lo más pedido según el `PopularityTracker`.
+
+    En cada pasada toma el top-K de listas de episodios, episodios y
+    búsquedas y vuelve a pedir a la fuente las entradas que no están en la
+    caché o que caducan antes de la siguiente pasada (WARMING_INTERVAL), de
+    modo que los usuarios no pagan los fallos en frío de lo popular.
+    """
+
+    @staticmethod
+    def warm(top_k: int = None, horizon: float = None) -> Dict[str, Dict[str, int]]:
+        """
+        Una pasada de calentado: renueva lo que caduca en menos de `horizon`
+        segundos. Retorna {tipo: {resultado: n}}.
+        """
+        top_k = top_k or current_app.config['WARMING_TOP_K']
+        horizon = horizon or current_app.config['WARMING_INTERVAL']
+
+        # Este proceso no sirve peticiones: parte del snapshot de los workers
+        popularity.load()
+
+        stats = {}
+        for kind, warm_one in (
+            ('episodes', WarmingService._warm_episodes),
+            ('videos', WarmingService._warm_videos),
+            ('search', WarmingService._warm_search),
+        ):
+            counts = stats.setdefault(kind, {'fresh': 0, 'refreshed': 0, 'failed': 0})
+            for key, _ in popularity.top(kind, top_k):
+                try:
+                    result = warm_one(key, horizon)
+                except Exception as e:
+                    logger.warning("Error calentando la caché", extra={'kind': kind, 'key': key, 'error': str(e)})
+                    result = 'failed'
+                counts[result] += 1
+                WARM_RESULTS.inc(kind=kind, result=result)
+
+        return stats
+
+    @staticmethod
+    def _warm_episodes(key: str, horizon: float) -> str:
+        source, slug = key.split(':', 1)
+        anime = Anime.query.filter_by(slug=slug).first()
+        if not anime or not anime.has_source(source):
+            return 'failed'
+
+        stored = EpisodeList.query.filter_by(anime_id=anime.id, source=source).first()
+        if stored and AnimeService.episodes_expire_in(anime, stored) > horizon:
+            return 'fresh'
+
+        return 'refreshed' if AnimeService.fetch_episodes(anime, source) else 'failed'
+
+    @staticmethod
+    def _warm_videos(key: str, horizon: float) -> str:
+        source, slug, episode = key.split(':', 2)
+        anime = Anime.query.filter_by(slug=slug).first()
+        source_id = (anime.get_source(source) or {}).get('id') if anime else None
+        scraper = get_scraper(source)
+        if not source_id or not scraper:
+            return 'failed'
+
+        cache_key = AnimeService.videos_cache_key(source, source_id, int(episode))
+        if (cache.expires_in(cache_key) or 0) > horizon:
+            return 'fresh'
+
+        videos = scraper.get_video_sources(source_id, int(episode))
+        if not videos:
+            return 'failed'
+        cache.set(cache_key, videos)
+        return 'refreshed'
+
+    @staticmethod
+    def _warm_search(query: str, horizon: float) -> str:
+        result = 'fresh'
+        for source in get_available_sources():
+            cache_key = AnimeService._search_cache_key(source, query)
+            if (cache.expires_in(cache_key) or 0) > horizon:
+                continue
+
+            results = get_scraper(source).search(query)
+            if not results:
+                return 'failed'
+            cache.set(cache_key, results)
+            result = 'refreshed'
+        return result
+
+    @staticmethod
+    def run_forever(app, interval: int = None, top_k: int = None, log=None):
+        """Ejecuta `warm` periódicamente"""
+        interval = interval or app.config['WARMING_INTERVAL']
+        log = log or logger.info
+
+        while True:
+            with app.app_context():
+                try:
+                    log(f"Caché calentada: {WarmingService.warm(top_k, horizon=interval)}")
+                except Exception as e:
+                    log(f"Error calentando la caché: {e}")
+
+            time.sleep(interval)
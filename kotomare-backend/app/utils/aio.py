@@ -0,0 +1,86 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+from flask import current_app, g
+
+# Vistas asíncronas por endpoint de Flask ('anime.search' -> coroutine function)
+ASYNC_VIEWS: Dict[str, Callable] = {}
+
+_http_client = None
+
+
+def async_view(endpoint: str):
+    """
+    Registra la variante asíncrona de un endpoint existente.
+
+    Solo se usa en el modo ASGI (app/asgi.py); con WSGI se sigue sirviendo
+    la vista síncrona registrada en el blueprint.
+    """
+    def decorator(func):
+        ASYNC_VIEWS[endpoint] = func
+        return func
+    return decorator
+
+
+def get_executor(app) -> ThreadPoolExecutor:
+    """Pool de hilos compartido para el código síncrono (SQLAlchemy, vistas WSGI)"""
+    executor = app.extensions.get('sync_executor')
+    if executor is None:
+        executor = ThreadPoolExecutor(
+            max_workers=app.config['ASGI_THREADS'], thread_name_prefix='asgi-sync'
+        )
+        app.extensions['sync_executor'] = executor
+    return executor
+
+
+async def run_sync(func: Callable, *args, **kwargs):
+    """
+    Ejecuta código síncrono en el pool de hilos sin bloquear el event loop.
+
+    Cada llamada abre su propio app context (y por tanto su propia sesión
+    de SQLAlchemy), así que debe devolver datos planos y no objetos ORM.
+    """
+    app = current_app._get_current_object()
+    # Las consultas del hilo se suman a las métricas de la petición que espera
+    request_g = g._get_current_object() if 'db_queries' in g else None
+
+    def call():
+        with app.app_context():
+            if request_g is None:
+                return func(*args, **kwargs)
+
+            g.db_queries, g.db_time = 0, 0.0
+            try:
+                return func(*args, **kwargs)
+            finally:
+                request_g.db_queries += g.db_queries
+                request_g.db_time += g.db_time
+
+    return await asyncio.get_running_loop().run_in_executor(get_executor(app), call)
+
+
+def get_http_client():
+    """Cliente HTTP no bloqueante compartido por todos los scrapers del proceso"""
+    import httpx
+
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        config = current_app.config
+        _http_client = httpx.AsyncClient(
+            timeout=config['ASGI_HTTP_TIMEOUT'],
+            limits=httpx.Limits(
+                max_connections=config['ASGI_HTTP_MAX_CONNECTIONS'],
+                max_keepalive_connections=config['ASGI_HTTP_MAX_CONNECTIONS']
+            ),
+            follow_redirects=True
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Cierra el cliente HTTP (al apagar el servidor ASGI)"""
+    global _http_client
+    client, _http_client = _http_client, None
+    if client is not None:
+        await client.aclose()
+
@@ -0,0 +1,93 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional; sin él solo se ofrece gzip
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/plain', 'text/html'}
+
+
+class _Compressor:
+    """Interfaz común de gzip y brotli para comprimir por trozos"""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=level)
+        else:
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        """Comprime y vacía el buffer para que el cliente reciba ya este trozo"""
+        if self.encoding == 'br':
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def compress_bytes(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return zlib.compress(data, level, wbits=16 + zlib.MAX_WBITS)
+
+
+def _compress_stream(chunks, compressor: _Compressor):
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield compressor.compress(chunk)
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def init_compression(app):
+    """
+    Comprime las respuestas de los blueprints de COMPRESS_BLUEPRINTS.
+
+    La codificación se negocia con Accept-Encoding (br si está instalado
+    brotli, si no gzip). Las respuestas normales solo se comprimen a partir
+    de COMPRESS_MIN_SIZE bytes; las que van en streaming se comprimen trozo
+    a trozo sin acumularlas, así que siguen llegando de forma incremental.
+    """
+    blueprints = set(app.config['COMPRESS_BLUEPRINTS'])
+    min_size = app.config['COMPRESS_MIN_SIZE']
+    levels = {'gzip': app.config['COMPRESS_GZIP_LEVEL'], 'br': app.config['COMPRESS_BROTLI_QUALITY']}
+    offered = ['br', 'gzip'] if brotli else ['gzip']
+
+    @app.after_request
+    def _compress_response(response):
+        if request.blueprint not in blueprints:
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES or response.direct_passthrough:
+            return response
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return response
+        if 'Content-Encoding' in response.headers:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(offered)
+        if not encoding:
+            return response
+
+        if response.is_streamed:
+            response.response = _compress_stream(response.response, _Compressor(encoding, levels[encoding]))
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(compress_bytes(data, encoding, levels[encoding]))
+
+        response.headers['Content-Encoding'] = encoding
+        return response
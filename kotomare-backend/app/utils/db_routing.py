@@ -0,0 +1,59 @@
+from functools import wraps
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = 'replica'
+
+
+class RoutingSession(Session):
+    """
+    Sesión que reparte las consultas entre la base principal y la réplica.
+
+    Van a la réplica (bind 'replica' de SQLALCHEMY_BINDS) solo los SELECT
+    de los endpoints marcados con `@read_only`. Todo lo demás va a la
+    principal: las rutas que leen para luego escribir (search, episodios,
+    jobs, crawler, comandos) nunca parten de una fila desfasada de la
+    réplica. En cuanto la sesión escribe algo (flush o DML) el resto de la
+    petición lee también de la principal para ver sus propias escrituras.
+
+    Sin réplica configurada se comporta igual que la sesión normal.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if isinstance(clause, UpdateBase):
+                self.info['use_primary'] = True
+            elif self._reads_from_replica(mapper, clause):
+                return self._db.engines[REPLICA_BIND]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, mapper, clause) -> bool:
+        if self._flushing or self.info.get('use_primary') or not self.info.get('read_only'):
+            return False
+        if not getattr(clause, 'is_select', False):
+            return False
+        return REPLICA_BIND in self._db.engines
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _stick_to_primary(session, flush_context):
+    """Tras escribir, lo que quede de la petición lee de la principal"""
+    session.info['use_primary'] = True
+
+
+def read_only(view):
+    """Marca un endpoint como de solo lectura: sus consultas van a la réplica"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        from app.extensions import db
+        db.session.info['read_only'] = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def use_primary():
+    """Fuerza la base principal para el resto de la sesión actual (p. ej. un `@read_only` que acaba escribiendo)"""
+    from app.extensions import db
+    db.session.info['use_primary'] = True
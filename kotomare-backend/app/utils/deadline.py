@@ -0,0 +1,93 @@
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+
+class RequestDeadline:
+    """Instante límite de una petición y fuentes que se quedaron sin tiempo"""
+
+    def __init__(self, seconds: float):
+        self.at = time.monotonic() + seconds
+        self.cut_off: List[str] = []
+
+    def remaining(self) -> float:
+        return self.at - time.monotonic()
+
+
+# Se fija en cada petición (before_request). Las tareas de asyncio heredan
+# el contexto; los hilos no, así que quien reparta trabajo a un pool debe
+# copiarlo (`contextvars.copy_context().run`).
+_current: ContextVar[Optional[RequestDeadline]] = ContextVar('request_deadline', default=None)
+
+
+def start_deadline(seconds: Optional[float]) -> Optional[RequestDeadline]:
+    """Fija el presupuesto de la petición en curso (None = sin límite)"""
+    deadline = RequestDeadline(seconds) if seconds else None
+    _current.set(deadline)
+    return deadline
+
+
+def use_deadline(deadline: Optional[RequestDeadline]):
+    """Reinstala un presupuesto capturado antes (generadores de respuestas en streaming)"""
+    _current.set(deadline)
+
+
+def current_deadline() -> Optional[RequestDeadline]:
+    return _current.get()
+
+
+def remaining() -> Optional[float]:
+    """Segundos que le quedan a la petición (None si no tiene límite)"""
+    deadline = _current.get()
+    return deadline.remaining() if deadline else None
+
+
+def expired() -> bool:
+    deadline = _current.get()
+    return deadline is not None and deadline.remaining() <= 0
+
+
+def timeout_for(default: Optional[float]) -> Optional[float]:
+    """
+    Timeout de una llamada: el por defecto recortado a lo que queda de
+    presupuesto. Si ya no queda retorna 0 y la llamada no debe hacerse.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    left = max(0.0, left)
+    return left if default is None else min(default, left)
+
+
+def mark_cut_off(source: str):
+    """Anota que una fuente no se consultó (o no terminó) por falta de tiempo"""
+    deadline = _current.get()
+    if deadline is not None and source not in deadline.cut_off:
+        deadline.cut_off.append(source)
+
+
+def cut_off_sources() -> List[str]:
+    deadline = _current.get()
+    return list(deadline.cut_off) if deadline else []
+
+
+def init_deadlines(app):
+    """
+    Da a cada petición un presupuesto de tiempo según su endpoint
+    (REQUEST_DEADLINES, o REQUEST_DEADLINE_DEFAULT). Las llamadas a las
+    fuentes derivan su timeout de lo que queda y se saltan si ya no queda.
+
+    Las respuestas en streaming que siguen scrapeando tras salir de la
+    vista deben capturar `current_deadline()` y reinstalarlo con
+    `use_deadline` dentro del generador.
+    """
+    from flask import request
+
+    @app.before_request
+    def _start_request_deadline():
+        seconds = app.config['REQUEST_DEADLINES'].get(request.endpoint, app.config['REQUEST_DEADLINE_DEFAULT'])
+        start_deadline(seconds)
+
+    @app.teardown_request
+    def _clear_request_deadline(exc=None):
+        _current.set(None)
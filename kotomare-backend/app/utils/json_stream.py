@@ -0,0 +1,64 @@
+from typing import Callable, Optional, Sequence, Union
+from flask import Response, current_app, jsonify, stream_with_context
+from sqlalchemy.orm import Query
+from app.extensions import db
+
+
+def list_response(payload: dict, key: str, items: Union[Sequence, Query], serialize: Optional[Callable] = None,
+                  count_key: Optional[str] = 'count'):
+    """
+    Respuesta JSON `{**payload, key: [...], count_key: n}`.
+
+    Si la lista tiene más de STREAM_MIN_ITEMS elementos se serializa en
+    streaming por lotes (cada elemento se convierte a dict justo antes de
+    escribirse), así que el pico de memoria no depende del tamaño de la
+    lista. Las pequeñas se devuelven con `jsonify` como siempre.
+
+    `items` puede ser una lista o una consulta. Con una consulta solo se
+    cargan las filas necesarias para decidir y, si hay que hacer streaming,
+    se recorre con `yield_per` dentro del generador (en una sesión nueva:
+    la de la petición se cierra al volver de la vista).
+    """
+    threshold = current_app.config['STREAM_MIN_ITEMS']
+    batch_size = current_app.config['STREAM_BATCH_SIZE']
+
+    if isinstance(items, Query):
+        query = items
+        head = query.limit(threshold + 1).all()
+    else:
+        query = None
+        head = items
+
+    if len(head) <= threshold:
+        data = [serialize(item) for item in head] if serialize else list(head)
+        body = {**payload, key: data}
+        if count_key:
+            body[count_key] = len(data)
+        return jsonify(body)
+
+    json_dumps = current_app.json.dumps
+
+    def dumps(obj):
+        return json_dumps(obj, separators=(',', ':'))
+
+    def generate():
+        rows = query.with_session(db.session()).yield_per(batch_size) if query is not None else head
+
+        yield '{' + ''.join(f'{dumps(k)}:{dumps(v)},' for k, v in payload.items()) + f'{dumps(key)}:['
+
+        count = 0
+        batch = []
+        for item in rows:
+            batch.append(dumps(serialize(item) if serialize else item))
+            if len(batch) >= batch_size:
+                yield (',' if count else '') + ','.join(batch)
+                count += len(batch)
+                batch = []
+
+        if batch:
+            yield (',' if count else '') + ','.join(batch)
+            count += len(batch)
+
+        yield ']' + (f',{dumps(count_key)}:{count}' if count_key else '') + '}\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
@@ -0,0 +1,60 @@
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+
+# Atributos estándar de LogRecord: todo lo demás viene de `extra=` y se exporta
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def _extra_fields(record) -> dict:
+    """Campos que el registro trae de `extra=`"""
+    return {key: value for key, value in vars(record).items() if key not in _RESERVED and not key.startswith('_')}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatea cada registro como una línea JSON con los campos de `extra`"""
+
+    def format(self, record):
+        data = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+
+        data.update(_extra_fields(record))
+
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato legible para desarrollo; los campos de `extra` van al final como clave=valor"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    def formatMessage(self, record):
+        line = super().formatMessage(record)
+        extra = _extra_fields(record)
+        if extra:
+            line += ' ' + ' '.join(f'{key}={value}' for key, value in extra.items())
+        return line
+
+
+def configure_logging(app):
+    """Configura el logger raíz de la app según LOG_LEVEL y LOG_FORMAT"""
+    handler = logging.StreamHandler(sys.stdout)
+
+    if app.config['LOG_FORMAT'] == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(TextFormatter())
+
+    logger = logging.getLogger('app')
+    logger.handlers = [handler]
+    logger.setLevel(app.config['LOG_LEVEL'])
+    logger.propagate = False
@@ -0,0 +1,248 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Counter:
+    """Contador monótono con etiquetas"""
+
+    type = 'counter'
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        return self._values.get(key, 0)
+
+    def samples(self) -> Iterable[Tuple[str, Dict, float]]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    """Histograma acumulativo (buckets + suma + cuenta) con etiquetas"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [cuentas por bucket (+Inf al final), suma, cuenta]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Mide la duración del bloque en segundos"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get(self, **labels) -> Tuple[float, int]:
+        """Retorna (suma, cuenta) para unas etiquetas"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        state = self._values.get(key)
+        return (state[1], state[2]) if state else (0.0, 0)
+
+    def samples(self) -> Iterable[Tuple[str, Dict, float]]:
+        with self._lock:
+            items = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+        for key, bucket_counts, total, count in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), bucket_counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield f'{self.name}_bucket', {**labels, 'le': le}, cumulative
+            yield f'{self.name}_sum', labels, total
+            yield f'{self.name}_count', labels, count
+
+
+class Registry:
+    """
+    Conjunto de métricas en memoria exportables en formato Prometheus.
+
+    Registrar un valor cuesta un acceso a diccionario y unas sumas bajo un
+    lock por métrica, así que se puede instrumentar el camino caliente.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict, float]]]] = []
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Callable):
+        """
+        Añade un colector evaluado en cada exportación. Debe devolver tuplas
+        (nombre, tipo, ayuda, etiquetas, valor); útil para gauges calculados
+        bajo demanda (p. ej. profundidad de la cola de jobs).
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Serializa todas las métricas en formato de texto de Prometheus"""
+        lines = []
+
+        for metric in self._metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+        for collector in self._collectors:
+            described = set()
+            for name, metric_type, help, labels, value in collector():
+                if name not in described:
+                    lines.append(f'# HELP {name} {help}')
+                    lines.append(f'# TYPE {name} {metric_type}')
+                    described.add(name)
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: Dict) -> str:
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+
+# HTTP
+HTTP_REQUESTS = REGISTRY.counter(
+    'kotomare_http_requests_total', 'Peticiones HTTP atendidas', ('endpoint', 'method', 'status'))
+HTTP_LATENCY = REGISTRY.histogram(
+    'kotomare_http_request_duration_seconds', 'Latencia por ruta', ('endpoint', 'method'))
+
+# Base de datos
+DB_QUERIES_PER_REQUEST = REGISTRY.histogram(
+    'kotomare_db_queries_per_request', 'Consultas SQL por petición', ('endpoint',), COUNT_BUCKETS)
+DB_TIME_PER_REQUEST = REGISTRY.histogram(
+    'kotomare_db_time_per_request_seconds', 'Tiempo en SQL por petición', ('endpoint',))
+
+# Scrapers
+SCRAPER_FETCH = REGISTRY.histogram(
+    'kotomare_scraper_fetch_seconds', 'Tiempo de red por operación de scraper', ('scraper', 'operation'))
+SCRAPER_PARSE = REGISTRY.histogram(
+    'kotomare_scraper_parse_seconds', 'Tiempo de parseo por operación de scraper', ('scraper', 'operation'))
+SCRAPER_ERRORS = REGISTRY.counter(
+    'kotomare_scraper_errors_total', 'Errores de red o parseo en scrapers', ('scraper', 'operation', 'stage'))
+SCRAPER_HEDGES = REGISTRY.counter(
+    'kotomare_scraper_hedges_total',
+    'Segundas peticiones a otro mirror (hedged: la primera tardaba, failover: falló, won: ganó la segunda)',
+    ('scraper', 'outcome'))
+
+# Caches
+CACHE_REQUESTS = REGISTRY.counter(
+    'kotomare_cache_requests_total', 'Consultas a caches por resultado (hit, miss, stale)', ('cache', 'result'))
+
+
+def init_metrics(app):
+    """Instrumenta las peticiones de Flask y las consultas de SQLAlchemy"""
+    from flask import g, request
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.db_queries = 0
+        g.db_time = 0.0
+
+    @app.after_request
+    def _record_request_metrics(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+
+        endpoint = request.endpoint or 'unknown'
+        method = request.method
+        status = response.status_code
+        request_g = g._get_current_object()
+
+        # Se registra al cerrar la respuesta para incluir el cuerpo de las que van en streaming
+        def record():
+            HTTP_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint, method=method)
+            HTTP_REQUESTS.inc(endpoint=endpoint, method=method, status=status)
+            DB_QUERIES_PER_REQUEST.observe(request_g.get('db_queries', 0), endpoint=endpoint)
+            DB_TIME_PER_REQUEST.observe(request_g.get('db_time', 0.0), endpoint=endpoint)
+
+        response.call_on_close(record)
+        return response
+
+    if not getattr(Engine, '_kotomare_metrics', False):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        Engine._kotomare_metrics = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    from flask import g, has_app_context
+
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    # Solo se acumula por petición; fuera de Flask (CLI, workers) se ignora
+    if has_app_context() and 'db_queries' in g:
+        g.db_queries += 1
+        g.db_time += elapsed
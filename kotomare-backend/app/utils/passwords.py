@@ -0,0 +1,114 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from werkzeug.security import check_password_hash, generate_password_hash
+from app.utils.metrics import REGISTRY
+
+PASSWORD_HASHING = REGISTRY.histogram(
+    'kotomare_password_hash_seconds', 'Tiempo de hash/verificación de contraseñas (incluida la espera)',
+    ('operation',))
+PASSWORD_HASH_REJECTED = REGISTRY.counter(
+    'kotomare_password_hash_rejected_total', 'Operaciones de hash rechazadas por tener el pool lleno', ())
+
+
+class PasswordHashingBusy(Exception):
+    """El pool de hashing tiene demasiadas operaciones pendientes"""
+
+
+class PasswordHasher:
+    """
+    Hash de contraseñas fuera del hilo de la petición.
+
+    El trabajo (PBKDF2/scrypt, CPU pura) se hace en un pool de procesos
+    propio (PASSWORD_HASH_WORKERS), así una ráfaga de logins no retiene el
+    GIL del worker y el resto de endpoints siguen respondiendo. Como mucho
+    PASSWORD_HASH_MAX_PENDING operaciones a la vez entre todos los hilos;
+    si no hay hueco en PASSWORD_HASH_QUEUE_TIMEOUT segundos se lanza
+    `PasswordHashingBusy` (503).
+
+    El algoritmo y el coste salen de PASSWORD_HASH_METHOD con el formato de
+    werkzeug ('scrypt:32768:8:1', 'pbkdf2:sha256:600000'...). Los hashes
+    guardados con otros parámetros se rehacen en el siguiente login.
+
+    Con PASSWORD_HASH_WORKERS = 0 se calcula en el propio hilo.
+    """
+
+    def __init__(self, app=None):
+        self.method = 'scrypt:32768:8:1'
+        self.workers = 0
+        self.queue_timeout = 5.0
+        self._prefix: Optional[str] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from flask import jsonify
+
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self.workers = app.config['PASSWORD_HASH_WORKERS']
+        self.queue_timeout = app.config['PASSWORD_HASH_QUEUE_TIMEOUT']
+        self._prefix = None
+        self._slots = threading.BoundedSemaphore(app.config['PASSWORD_HASH_MAX_PENDING'])
+        app.extensions['password_hasher'] = self
+
+        @app.errorhandler(PasswordHashingBusy)
+        def _hashing_busy(e):
+            response = jsonify({'error': 'Servidor ocupado, inténtalo de nuevo en unos segundos'})
+            response.status_code = 503
+            response.headers['Retry-After'] = '1'
+            return response
+
+    def hash(self, password: str) -> str:
+        return self._run('hash', generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._run('verify', check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Si el hash se generó con otro algoritmo o coste que el configurado"""
+        return password_hash.split('$', 1)[0] != self._method_prefix()
+
+    def _method_prefix(self) -> str:
+        """
+        Prefijo que werkzeug escribe para `method`, con los parámetros por
+        defecto ya resueltos ('pbkdf2' -> 'pbkdf2:sha256:1000000'). Se saca
+        de un hash de prueba la primera vez.
+        """
+        if self._prefix is None:
+            self._prefix = self.hash('').split('$', 1)[0]
+        return self._prefix
+
+    def _run(self, operation: str, func, *args):
+        with PASSWORD_HASHING.time(operation=operation):
+            if not self.workers:
+                return func(*args)
+
+            if not self._slots.acquire(timeout=self.queue_timeout):
+                PASSWORD_HASH_REJECTED.inc()
+                raise PasswordHashingBusy()
+            try:
+                return self._get_executor().submit(func, *args).result()
+            finally:
+                self._slots.release()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Pool de procesos (spawn: no hereda hilos ni conexiones del worker; se recrea tras un fork)"""
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,153 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tipos de elemento que se cuentan y formato de sus claves
+KINDS = (
+    'episodes',  # '<fuente>:<slug>'            lista de episodios
+    'videos',    # '<fuente>:<slug>:<episodio>'  servidores de un episodio
+    'search',    # '<búsqueda normalizada>'
+)
+
+SNAPSHOT_KEY = 'popularity:snapshot'
+
+
+def _decay(score: float, updated: float, now: float, half_life: float) -> float:
+    return score * 0.5 ** ((now - updated) / half_life)
+
+
+class PopularityTracker:
+    """
+    Contadores con decaimiento exponencial (vida media POPULARITY_HALF_LIFE)
+    de lo que más se pide: listas de episodios, episodios y búsquedas.
+
+    Cada proceso cuenta en memoria y un hilo propio (arranca con el primer
+    `record` del proceso) suma lo nuevo, cada POPULARITY_SNAPSHOT_INTERVAL
+    segundos, al snapshot común guardado en la caché compartida
+    (`popularity:snapshot`) y se queda con el resultado; las peticiones
+    nunca esperan a la caché. El
+    merge no es atómico: si dos workers escriben a la vez se pierde una
+    fracción de los incrementos, que para un ranking aproximado da igual.
+
+    Por tipo se guardan como mucho POPULARITY_CAPACITY claves en el
+    snapshot (el doble en memoria entre recortes); al pasarse se descartan
+    las de menor puntuación.
+    """
+
+    def __init__(self, app=None):
+        self.half_life = 3600.0
+        self.capacity = 1000
+        self.snapshot_interval = 60.0
+        self.cache = None
+        self._scores = {kind: {} for kind in KINDS}   # clave -> [puntuación, actualizada]
+        self._pending = {kind: {} for kind in KINDS}  # incrementos aún no volcados al snapshot
+        self._timer_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from app.extensions import cache
+
+        self.half_life = float(app.config['POPULARITY_HALF_LIFE'])
+        self.capacity = app.config['POPULARITY_CAPACITY']
+        self.snapshot_interval = app.config['POPULARITY_SNAPSHOT_INTERVAL']
+        self.cache = cache
+        app.extensions['popularity'] = self
+
+    def record(self, kind: str, key: str, weight: float = 1.0):
+        """Suma `weight` a una clave (se llama en cada petición)"""
+        now = time.time()
+        with self._lock:
+            self._add(self._scores[kind], key, weight, now)
+            self._add(self._pending[kind], key, weight, now)
+            # Margen de `capacity` claves para que las nuevas puedan subir antes del recorte
+            if len(self._scores[kind]) > self.capacity * 2:
+                self._scores[kind] = self._trim(self._scores[kind], now)
+            if self._timer_pid != os.getpid():
+                self._start_timer()
+
+    def top(self, kind: str, k: int) -> List[Tuple[str, float]]:
+        """Las `k` claves más populares con su puntuación actual"""
+        now = time.time()
+        with self._lock:
+            scored = [
+                (key, _decay(score, updated, now, self.half_life))
+                for key, (score, updated) in self._scores[kind].items()
+            ]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:k]
+
+    def snapshot(self):
+        """Vuelca los incrementos pendientes al snapshot compartido y lo adopta"""
+        with self._lock:
+            pending, self._pending = self._pending, {kind: {} for kind in KINDS}
+
+        if self.cache is None:
+            return
+
+        now = time.time()
+        shared = self.cache.get(SNAPSHOT_KEY) or {}
+        merged = {}
+        for kind in KINDS:
+            scores = {key: list(value) for key, value in (shared.get(kind) or {}).items()}
+            for key, (score, updated) in pending[kind].items():
+                self._add(scores, key, _decay(score, updated, now, self.half_life), now)
+            merged[kind] = self._trim(scores, now)
+
+        self.cache.set(SNAPSHOT_KEY, merged, ttl=self.half_life * 24)
+
+        with self._lock:
+            # Lo contado mientras se escribía sigue en _pending y se suma ya
+            for kind in KINDS:
+                scores = merged[kind]
+                for key, (score, updated) in self._pending[kind].items():
+                    self._add(scores, key, _decay(score, updated, now, self.half_life), now)
+                self._scores[kind] = scores
+
+    def load(self):
+        """Adopta el snapshot compartido sin volcar nada (procesos que solo leen)"""
+        if self.cache is None:
+            return
+        shared = self.cache.get(SNAPSHOT_KEY) or {}
+        with self._lock:
+            for kind in KINDS:
+                self._scores[kind] = {key: list(value) for key, value in (shared.get(kind) or {}).items()}
+
+    def _start_timer(self):
+        """Hilo de snapshots del proceso (se vuelve a crear tras un fork)"""
+        self._timer_pid = os.getpid()
+        threading.Thread(target=self._snapshot_loop, name='popularity-snapshot', daemon=True).start()
+
+    def _snapshot_loop(self):
+        while True:
+            time.sleep(self.snapshot_interval)
+            try:
+                self.snapshot()
+            except Exception:
+                logger.exception("Error volcando el snapshot de popularidad")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {kind: len(scores) for kind, scores in self._scores.items()}
+
+    def _add(self, scores: Dict, key: str, weight: float, now: float):
+        entry = scores.get(key)
+        if entry is None:
+            scores[key] = [weight, now]
+        else:
+            entry[0] = _decay(entry[0], entry[1], now, self.half_life) + weight
+            entry[1] = now
+
+    def _trim(self, scores: Dict, now: float) -> Dict:
+        """Se queda con las `capacity` claves de mayor puntuación actual"""
+        if len(scores) <= self.capacity:
+            return scores
+        ranked = sorted(
+            scores.items(), key=lambda item: _decay(item[1][0], item[1][1], now, self.half_life), reverse=True
+        )
+        return dict(ranked[:self.capacity])
@@ -0,0 +1,153 @@
+import cProfile
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """
+    Profiler por muestreo de un único hilo.
+
+    Un hilo auxiliar toma la pila del hilo objetivo cada `interval` segundos
+    y acumula las pilas en formato colapsado ("a;b;c" -> muestras), que es
+    lo que consumen flamegraph.pl, speedscope o inferno.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                frame = frame.f_back
+
+            self.stacks[';'.join(reversed(stack))] += 1
+
+
+class CProfileProfiler:
+    """Envuelve cProfile con la misma interfaz que SamplingProfiler"""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self) -> cProfile.Profile:
+        self.profile.disable()
+        return self.profile
+
+
+def init_profiling(app):
+    """
+    Registra el profiling bajo demanda de peticiones.
+
+    Se activa con la cabecera `X-Profile: <PROFILING_TOKEN>` o muestreando
+    1 de cada PROFILING_SAMPLE_RATE peticiones. Si no hay token ni muestreo
+    configurados no se registra ningún hook, así que no cuesta nada.
+    """
+    token = app.config['PROFILING_TOKEN']
+    sample_rate = app.config['PROFILING_SAMPLE_RATE']
+
+    if not token and not sample_rate:
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def _start_profiling():
+        requested = token and hmac.compare_digest(request.headers.get('X-Profile', ''), token)
+        sampled = sample_rate and random.randrange(sample_rate) == 0
+        if not requested and not sampled:
+            return
+
+        if app.config['PROFILING_MODE'] == 'cprofile':
+            profiler = CProfileProfiler()
+        else:
+            profiler = SamplingProfiler(threading.get_ident(), app.config['PROFILING_INTERVAL'])
+
+        g.profiler = profiler
+        g.profile_start = time.perf_counter()
+        g.profile_started_at = datetime.utcnow().isoformat()
+        profiler.start()
+
+    @app.after_request
+    def _finish_profiling(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+
+        start = g.pop('profile_start')
+        metadata = {
+            'endpoint': request.endpoint or 'unknown',
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'status': response.status_code,
+            'started_at': g.pop('profile_started_at')
+        }
+        output_dir = app.config['PROFILING_DIR']
+
+        # Se cierra al terminar de enviar la respuesta (incluye streaming)
+        def finish():
+            metadata['duration_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            try:
+                path = _write_profile(output_dir, profiler.stop(), metadata)
+                logger.info("Perfil de petición guardado", extra={**metadata, 'file': path})
+            except Exception:
+                logger.exception("Error guardando perfil de petición")
+
+        response.call_on_close(finish)
+        return response
+
+
+def _write_profile(output_dir: str, result, metadata: dict) -> str:
+    """Escribe el perfil (.folded o .prof) y un .json con la ruta y los tiempos"""
+    os.makedirs(output_dir, exist_ok=True)
+
+    endpoint = re.sub(r'[^a-zA-Z0-9_.-]', '_', metadata['endpoint'])
+    timestamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+    base = os.path.join(output_dir, f"{timestamp}_{endpoint}_{int(metadata['duration_ms'])}ms")
+
+    if isinstance(result, cProfile.Profile):
+        path = f'{base}.prof'
+        result.dump_stats(path)
+    else:
+        path = f'{base}.folded'
+        with open(path, 'w') as f:
+            for stack, count in result.most_common():
+                f.write(f'{stack} {count}\n')
+        metadata['samples'] = sum(result.values())
+
+    with open(f'{base}.json', 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    return path
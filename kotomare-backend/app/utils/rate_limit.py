@@ -0,0 +1,173 @@
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from app.utils.metrics import REGISTRY
+
+RATE_LIMITED = REGISTRY.counter(
+    'kotomare_rate_limited_total', 'Peticiones por encima de su presupuesto (cheap: 429, expensive: sin scrapear)',
+    ('budget',))
+
+
+class SlidingWindowLimiter:
+    """
+    Límite de `limit` eventos por `window` segundos y clave con ventana
+    deslizante aproximada: se interpolan el contador de la ventana fija
+    anterior y el de la actual. Memoria constante por clave (3 números).
+
+    Es por proceso: con varios workers el límite efectivo es `limit` por
+    worker al que llegue el cliente.
+    """
+
+    def __init__(self, limit: int, window: float, max_keys: int = 100_000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._counters: Dict[str, list] = {}  # clave -> [índice de ventana, actual, anterior]
+        self._lock = threading.Lock()
+
+    def hit(self, key: str) -> Tuple[bool, float]:
+        """
+        Cuenta un evento si cabe en el presupuesto. Retorna (permitido,
+        segundos hasta que vuelva a caber uno si no lo está).
+        """
+        now = time.time()
+        index, offset = divmod(now, self.window)
+        index = int(index)
+
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                if len(self._counters) >= self.max_keys:
+                    self._prune(index)
+                counter = self._counters[key] = [index, 0, 0]
+            elif counter[0] != index:
+                counter[2] = counter[1] if counter[0] == index - 1 else 0
+                counter[1] = 0
+                counter[0] = index
+
+            weight = 1 - offset / self.window
+            used = counter[2] * weight + counter[1]
+            if used + 1 > self.limit:
+                return False, self._retry_after(counter, offset)
+
+            counter[1] += 1
+            return True, 0.0
+
+    def _retry_after(self, counter, offset: float) -> float:
+        """Segundos hasta que, con el decaimiento de la ventana anterior, vuelva a caber un evento"""
+        current, previous = counter[1], counter[2]
+        if previous and current + 1 <= self.limit:
+            # Cabe en esta misma ventana: previous * (1 - t / window) + current + 1 <= limit
+            t = self.window * (1 - (self.limit - current - 1) / previous)
+            return max(0.0, t - offset)
+
+        # La actual está llena: en la siguiente pasa a ser la anterior y entra
+        # con peso 1, así que hay que esperar también a que decaiga:
+        # current * (1 - t / window) + 1 <= limit
+        t = self.window * max(0.0, 1 - (self.limit - 1) / current) if current else 0.0
+        return self.window - offset + t
+
+    def _prune(self, index: int):
+        for key in [key for key, counter in self._counters.items() if counter[0] < index - 1]:
+            del self._counters[key]
+
+
+class RateLimiter:
+    """
+    Presupuestos por cliente (identidad del JWT o IP) para la API:
+
+    - cheap: toda petición a los blueprints de RATE_LIMIT_BLUEPRINTS. Por
+      encima se responde 429 con Retry-After.
+    - expensive: cada vez que `AnimeService` iría a una fuente externa
+      (fallo de caché). Por encima no se scrapea: se sirve lo que haya en
+      la DB local o en la caché y la respuesta lleva la cabecera
+      `X-RateLimit-Degraded: 1`.
+
+    Fuera de una petición (crawler, calentado, prefetch) no se limita.
+    """
+
+    def __init__(self, app=None):
+        self.cheap: Optional[SlidingWindowLimiter] = None
+        self.expensive: Optional[SlidingWindowLimiter] = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from flask import g, jsonify, request
+
+        app.extensions['rate_limiter'] = self
+        if not app.config['RATE_LIMIT_ENABLED']:
+            return
+
+        window = app.config['RATE_LIMIT_WINDOW']
+        self.cheap = SlidingWindowLimiter(app.config['RATE_LIMIT_CHEAP'], window)
+        self.expensive = SlidingWindowLimiter(app.config['RATE_LIMIT_EXPENSIVE'], window)
+        blueprints = set(app.config['RATE_LIMIT_BLUEPRINTS'])
+        trusted_proxies = app.config['RATE_LIMIT_TRUSTED_PROXIES']
+
+        @app.before_request
+        def _check_rate_limit():
+            if request.blueprint not in blueprints:
+                return None
+
+            g.rate_limit_key = _client_key(request, trusted_proxies)
+            allowed, retry_after = self.cheap.hit(g.rate_limit_key)
+            if allowed:
+                return None
+
+            RATE_LIMITED.inc(budget='cheap')
+            response = jsonify({'error': 'Demasiadas peticiones, inténtalo más tarde'})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+            return response
+
+        @app.after_request
+        def _mark_degraded(response):
+            if g.get('rate_limit_degraded'):
+                response.headers['X-RateLimit-Degraded'] = '1'
+            return response
+
+    def allow_scrape(self) -> bool:
+        """
+        Consume presupuesto 'expensive' del cliente de la petición en curso.
+        Si no queda, la petición pasa a servirse solo con datos locales.
+        """
+        from flask import g, has_request_context
+
+        if self.expensive is None or not has_request_context() or 'rate_limit_key' not in g:
+            return True
+        if g.get('rate_limit_degraded'):
+            return False
+
+        allowed, _ = self.expensive.hit(g.rate_limit_key)
+        if not allowed:
+            RATE_LIMITED.inc(budget='expensive')
+            g.rate_limit_degraded = True
+        return allowed
+
+
+def _client_key(request, trusted_proxies: int) -> str:
+    """
+    Identidad del JWT si viene uno válido; si no, la IP del cliente.
+
+    Detrás de `trusted_proxies` proxies la IP es la que añadió el más
+    externo de ellos a X-Forwarded-For (contando desde la derecha); lo que
+    haya más a la izquierda lo pone el propio cliente y no vale como clave.
+    """
+    from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        identity = None
+    if identity:
+        return f'user:{identity}'
+
+    address = request.remote_addr
+    if trusted_proxies:
+        forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+        if len(forwarded) >= trusted_proxies:
+            address = forwarded[-trusted_proxies]
+    return f'ip:{address}'
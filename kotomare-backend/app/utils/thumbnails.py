@@ -0,0 +1,306 @@
+import hashlib
+import io
+import ipaddress
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+from app.utils.metrics import REGISTRY
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow es opcional; sin él se sirve la portada original (también cacheada)
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_REQUESTS = REGISTRY.counter(
+    'kotomare_thumbnail_requests_total', 'Portadas servidas por el proxy por resultado (hit, generated, fallback)',
+    ('result',))
+
+# Tipos de imagen aceptados del origen, por sus primeros bytes
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF8', 'image/gif'),
+    (b'RIFF', 'image/webp'),  # RIFF....WEBP
+)
+
+FAILURE_TTL = 300  # segundos sin reintentar una portada que no se pudo descargar o reducir
+
+
+def _sniff(data: bytes) -> Optional[str]:
+    for signature, mimetype in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            if mimetype == 'image/webp' and data[8:12] != b'WEBP':
+                return None
+            return mimetype
+    return None
+
+
+def _allowed_source(url: str, allowed_hosts: Sequence[str]) -> bool:
+    """
+    Si se puede descargar la portada de `url`: http(s) al puerto por defecto,
+    host en `allowed_hosts` (o un subdominio) si la lista no está vacía, y
+    que resuelva solo a direcciones públicas. Así el proxy no sirve para
+    pedir nada de la red interna (localhost, 10.x, 169.254.169.254...).
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return False
+    host = (parts.hostname or '').lower()
+    if parts.scheme not in ('http', 'https') or not host or port not in (None, 80, 443):
+        return False
+    if allowed_hosts and not any(host == allowed or host.endswith(f'.{allowed}') for allowed in allowed_hosts):
+        return False
+
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port or parts.scheme, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError):
+        return False
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%', 1)[0])
+        if not ip.is_global or ip.is_multicast:
+            return False
+    return bool(addresses)
+
+
+class ThumbnailStore:
+    """
+    Proxy de portadas con miniaturas en disco.
+
+    Cada portada se descarga una sola vez (se guarda la original) y de ella
+    se generan en JPEG los anchos de THUMBNAIL_WIDTHS según se piden. Los
+    ficheros viven en THUMBNAIL_CACHE_DIR, compartido por los workers del
+    host; cuando el total pasa de THUMBNAIL_CACHE_MAX_BYTES se borran los
+    usados hace más tiempo (LRU aproximado por la fecha de modificación,
+    que se renueva como mucho una vez cada `touch_interval` segundos).
+
+    Las URLs llevan `?v=<hash de cover_image>`: si cambia la portada cambia
+    la URL, así que se pueden servir como inmutables.
+    """
+
+    def __init__(self, app=None, touch_interval: float = 3600, evict_every: int = 100):
+        self.directory = None
+        self.widths: Tuple[int, ...] = ()
+        self.max_bytes = 512 * 1024 * 1024
+        self.base_url = ''
+        self.quality = 82
+        self.fetch_timeout = 10.0
+        self.max_source_bytes = 5 * 1024 * 1024
+        self.allowed_hosts: Tuple[str, ...] = ()
+        self.max_age = 365 * 24 * 3600
+        self.touch_interval = touch_interval
+        self.evict_every = evict_every
+        self._writes = 0
+        self._locks = [threading.Lock() for _ in range(64)]  # una descarga a la vez por portada
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.directory = config['THUMBNAIL_CACHE_DIR'] or os.path.join(app.instance_path, 'thumbnails')
+        self.widths = tuple(config['THUMBNAIL_WIDTHS'])
+        self.max_bytes = config['THUMBNAIL_CACHE_MAX_BYTES']
+        self.base_url = config['THUMBNAIL_BASE_URL'].rstrip('/')
+        self.quality = config['THUMBNAIL_QUALITY']
+        self.fetch_timeout = config['THUMBNAIL_FETCH_TIMEOUT']
+        self.max_source_bytes = config['THUMBNAIL_MAX_SOURCE_BYTES']
+        self.allowed_hosts = tuple(config['THUMBNAIL_ALLOWED_HOSTS'])
+        self.max_age = config['THUMBNAIL_MAX_AGE']
+        app.extensions['thumbnails'] = self
+
+    @staticmethod
+    def version(cover_image: str) -> str:
+        return hashlib.sha1(cover_image.encode()).hexdigest()[:10]
+
+    def urls(self, anime_id: Optional[int], cover_image: Optional[str]) -> Dict[str, str]:
+        """URLs del proxy por ancho ({'160': '/api/images/cover/1/160?v=...'}); vacío sin portada"""
+        if not cover_image or anime_id is None:
+            return {}
+        version = self.version(cover_image)
+        return {str(width): f'{self.base_url}/api/images/cover/{anime_id}/{width}?v={version}' for width in self.widths}
+
+    def get(self, cover_image: str, width: int) -> Optional[Tuple[str, str]]:
+        """
+        Ruta en disco y mimetype de la miniatura de `cover_image` a `width`
+        píxeles de ancho, generándola si falta. None si la portada no se pudo
+        descargar o reducir (el llamante redirige a la original); el fallo se
+        recuerda FAILURE_TTL segundos para no reintentarlo en cada petición.
+        """
+        from app.extensions import cache
+
+        key = hashlib.sha1(cover_image.encode()).hexdigest()
+        path = self._path(key, width)
+        if self._hit(path):
+            THUMBNAIL_REQUESTS.inc(result='hit')
+            return path, self._mimetype(path)
+
+        with self._locks[int(key[:8], 16) % len(self._locks)]:
+            if self._hit(path):
+                THUMBNAIL_REQUESTS.inc(result='hit')
+                return path, self._mimetype(path)
+
+            failure_key = f'thumb:failed:{key}'
+            if cache.get(failure_key):
+                THUMBNAIL_REQUESTS.inc(result='fallback')
+                return None
+
+            # Sin Pillow la miniatura es la original, que `_original` ya deja en `path`
+            data = self._original(key, cover_image)
+            if data is not None and Image is not None:
+                data = self._resize(data, width)
+            if data is None:
+                cache.set(failure_key, True, ttl=FAILURE_TTL)
+                THUMBNAIL_REQUESTS.inc(result='fallback')
+                return None
+
+            if Image is not None:
+                self._write(path, data)
+
+        THUMBNAIL_REQUESTS.inc(result='generated')
+        return path, self._mimetype(path)
+
+    def stats(self) -> Dict:
+        files, size = 0, 0
+        for _, file_size, _ in self._scan():
+            files += 1
+            size += file_size
+        return {
+            'files': files, 'bytes': size, 'max_bytes': self.max_bytes, 'path': self.directory,
+            'widths': list(self.widths), 'resize': Image is not None
+        }
+
+    def evict(self) -> int:
+        """Si el total se pasa de `max_bytes`, borra los ficheros menos usados (hasta el 90%)"""
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return 0
+
+        target = total - int(self.max_bytes * 0.9)
+        freed = removed = 0
+        for _, size, path in entries:
+            if freed >= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            freed += size
+            removed += 1
+        return removed
+
+    def _path(self, key: str, width: Optional[int]) -> str:
+        """Miniatura '<key>-<ancho>.jpg' u original '<key>' (sin Pillow la miniatura es la original)"""
+        name = f'{key}-{width}.jpg' if width and Image is not None else key
+        return os.path.join(self.directory, key[:2], name)
+
+    def _hit(self, path: str) -> bool:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return False
+        if time.time() - mtime > self.touch_interval:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return True
+
+    def _mimetype(self, path: str) -> str:
+        if path.endswith('.jpg'):
+            return 'image/jpeg'
+        with open(path, 'rb') as f:
+            return _sniff(f.read(12)) or 'application/octet-stream'
+
+    def _original(self, key: str, cover_image: str) -> Optional[bytes]:
+        """Portada original: del disco o, la primera vez, descargada y guardada"""
+        path = self._path(key, None)
+        if self._hit(path):
+            with open(path, 'rb') as f:
+                return f.read()
+
+        data = self._fetch(cover_image)
+        if data is None or _sniff(data) is None:
+            return None
+
+        self._write(path, data)
+        return data
+
+    def _fetch(self, url: str) -> Optional[bytes]:
+        import requests
+        from app.scrapers.base import BaseScraper
+
+        if not _allowed_source(url, self.allowed_hosts):
+            logger.warning("Portada de un origen no permitido", extra={'url': url})
+            return None
+        try:
+            # Sin seguir redirecciones: la URL de la portada viene de la fuente, su destino no se controla
+            with requests.get(url, headers=BaseScraper.headers, timeout=self.fetch_timeout, stream=True,
+                              allow_redirects=False) as response:
+                if response.status_code != 200:
+                    return None
+                chunks, size = [], 0
+                for chunk in response.iter_content(64 * 1024):
+                    size += len(chunk)
+                    if size > self.max_source_bytes:
+                        return None
+                    chunks.append(chunk)
+                return b''.join(chunks)
+        except requests.RequestException as e:
+            logger.warning("Error descargando portada", extra={'url': url, 'error': str(e)})
+            return None
+
+    def _resize(self, original: bytes, width: int) -> Optional[bytes]:
+        """JPEG de `width` de ancho como mucho (no se amplía), manteniendo la proporción"""
+        try:
+            with Image.open(io.BytesIO(original)) as image:
+                image.draft('RGB', (width, width * 3))  # JPEG: decodifica ya reducida
+                if image.mode in ('RGBA', 'LA', 'P'):
+                    rgba = image.convert('RGBA')
+                    image = Image.new('RGB', rgba.size, (255, 255, 255))
+                    image.paste(rgba, mask=rgba.getchannel('A'))
+                elif image.mode != 'RGB':
+                    image = image.convert('RGB')
+                image.thumbnail((width, width * 3))
+
+                output = io.BytesIO()
+                image.save(output, 'JPEG', quality=self.quality, optimize=True, progressive=True)
+                return output.getvalue()
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.warning("Portada no válida", extra={'error': str(e)})
+            return None
+
+    def _write(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        # El tamaño total no se mira en cada escritura, solo cada `evict_every`
+        self._writes += 1
+        if self._writes % self.evict_every == 0:
+            self.evict()
+
+    def _scan(self):
+        """(mtime, tamaño, ruta) de cada fichero de la caché"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        for bucket in os.scandir(self.directory):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, entry.path
@@ -0,0 +1,287 @@
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from werkzeug.serving import make_server
+
+from benchmarks.stub_server import StubAnimeFLVServer
+
+QUERIES = [
+    'naruto', 'one piece', 'bleach', 'shingeki no kyojin', 'kimetsu no yaiba', 'jujutsu kaisen',
+    'spy x family', 'chainsaw man', 'boku no hero', 'dragon ball', 'frieren', 'hunter x hunter',
+    'fullmetal alchemist', 'death note', 'steins gate', 'vinland saga', 'mob psycho', 'haikyuu',
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def create_benchmark_app(db_path: str):
+    """Crea la app con la configuración de testing sobre un SQLite en disco"""
+    from app import create_app
+    from app.config import TestingConfig, config
+
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        LOG_LEVEL = 'ERROR'
+
+    config['benchmark'] = BenchmarkConfig
+    return create_app('benchmark')
+
+
+class Client(threading.Thread):
+    """Usuario simulado que recorre búsqueda, episodios, videos y watchlist"""
+
+    def __init__(self, index, base_url, deadline, stats, lock):
+        super().__init__(name=f'client-{index}', daemon=True)
+        self.index = index
+        self.base_url = base_url
+        self.deadline = deadline
+        self.stats = stats
+        self.lock = lock
+        self.session = requests.Session()
+        self.random = random.Random(index)
+
+    def call(self, op, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, f'{self.base_url}{path}', timeout=60, **kwargs)
+            ok = response.status_code < 500
+        except requests.RequestException:
+            response, ok = None, False
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            self.stats[op]['latencies'].append(elapsed)
+            if not ok:
+                self.stats[op]['errors'] += 1
+        return response
+
+    def run(self):
+        email = f'bench{self.index}@example.com'
+        response = self.call('register', 'POST', '/api/auth/register',
+                             json={'username': f'bench{self.index}', 'email': email, 'password': 'secret123'})
+        if response is None or response.status_code != 201:
+            return
+        self.session.headers['Authorization'] = f"Bearer {response.json()['access_token']}"
+
+        while time.time() < self.deadline:
+            query = self.random.choice(QUERIES)
+            response = self.call('search', 'GET', '/api/anime/search', params={'q': query})
+            if response is None or response.status_code != 200:
+                continue
+
+            results = response.json().get('results') or []
+            if not results:
+                continue
+            anime = self.random.choice(results[:5])
+
+            response = self.call('episodes', 'GET', f"/api/anime/{anime['slug']}/episodes")
+            episodes = response.json().get('episodes') if response is not None and response.ok else []
+            if not episodes:
+                continue
+            episode = self.random.choice(episodes[:24])['number']
+
+            self.call('videos', 'GET', f"/api/anime/{anime['slug']}/episode/{episode}")
+            self.call('watchlist_add', 'POST', f"/api/user/watchlist/{anime['id']}", json={'status': 'watching'})
+            self.call('watchlist_update', 'PUT', f"/api/user/watchlist/{anime['id']}", json={'last_episode': episode})
+            self.call('watchlist_get', 'GET', '/api/user/watchlist')
+
+
+def db_queries_by_endpoint():
+    """Consultas SQL medias por petición, leídas del registro de métricas"""
+    from app.utils.metrics import DB_QUERIES_PER_REQUEST
+
+    result = {}
+    for name, labels, value in DB_QUERIES_PER_REQUEST.samples():
+        if name.endswith('_sum'):
+            result.setdefault(labels['endpoint'], {})['queries'] = value
+        elif name.endswith('_count'):
+            result.setdefault(labels['endpoint'], {})['requests'] = value
+    return {
+        endpoint: round(data['queries'] / data['requests'], 2)
+        for endpoint, data in result.items() if data.get('requests')
+    }
+
+
+def serve_asgi(app):
+    """Sirve la app con uvicorn (modo ASGI) en un hilo y retorna (url, parada)"""
+    import asyncio
+    import socket
+    import uvicorn
+    from app.asgi import AsgiApp
+
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    server = uvicorn.Server(uvicorn.Config(AsgiApp(app), log_level='error', lifespan='on'))
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve(sockets=[sock])),
+                              name='app-server', daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+        thread.join()
+
+    return f'http://127.0.0.1:{sock.getsockname()[1]}', stop
+
+
+def serve_wsgi(app):
+    """Sirve la app con el servidor WSGI de werkzeug (un hilo por petición)"""
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='app-server', daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}', server.shutdown
+
+
+def run(args):
+    from app.utils.metrics import SCRAPER_HEDGES
+
+    stubs = [
+        StubAnimeFLVServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           slow_rate=args.slow_rate).start()
+        for _ in range(1 + args.mirrors)
+    ]
+
+    from app.scrapers.animeflv import AnimeFLVScraper
+    AnimeFLVScraper.base_url = stubs[0].base_url
+
+    tmpdir = tempfile.mkdtemp(prefix='kotomare-bench-')
+    app = create_benchmark_app(os.path.join(tmpdir, 'bench.db'))
+    # Después de crear la app, que aplica SCRAPER_MIRRORS de la config
+    AnimeFLVScraper.mirrors = tuple(stub.base_url for stub in stubs[1:])
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    base_url, stop_server = serve_asgi(app) if args.server == 'asgi' else serve_wsgi(app)
+
+    stats = defaultdict(lambda: {'latencies': [], 'errors': 0})
+    lock = threading.Lock()
+    started = time.time()
+    clients = [Client(i, base_url, started + args.duration, stats, lock) for i in range(args.clients)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.time() - started
+
+    stop_server()
+    upstream = defaultdict(int)
+    for stub in stubs:
+        stub.shutdown()
+        for kind, count in stub.requests.items():
+            upstream[kind] += count
+
+    total = sum(len(s['latencies']) for s in stats.values())
+    report = {
+        'config': {
+            'server': args.server, 'clients': args.clients, 'duration': args.duration, 'latency': args.latency,
+            'jitter': args.jitter, 'error_rate': args.error_rate, 'slow_rate': args.slow_rate,
+            'mirrors': args.mirrors
+        },
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 2),
+        'operations': {
+            op: {
+                'count': len(s['latencies']),
+                'errors': s['errors'],
+                'p50_ms': round(percentile(s['latencies'], 50) * 1000, 2),
+                'p95_ms': round(percentile(s['latencies'], 95) * 1000, 2),
+                'p99_ms': round(percentile(s['latencies'], 99) * 1000, 2)
+            }
+            for op, s in sorted(stats.items())
+        },
+        'db_queries_per_request': db_queries_by_endpoint(),
+        'upstream_requests': dict(upstream),
+        'hedges': {
+            labels['outcome']: value for _, labels, value in SCRAPER_HEDGES.samples()
+        }
+    }
+    return report
+
+
+def print_report(report, baseline=None):
+    print(f"\n{report['requests']} peticiones, {report['throughput_rps']} req/s "
+          f"({report['config']['server']}, {report['config']['clients']} clientes, "
+          f"{report['config']['duration']}s)")
+    if baseline:
+        print(f"  baseline: {baseline['throughput_rps']} req/s "
+              f"({_delta(report['throughput_rps'], baseline['throughput_rps'])})")
+
+    print(f"\n{'operación':<18}{'n':>7}{'err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for op, data in report['operations'].items():
+        line = f"{op:<18}{data['count']:>7}{data['errors']:>6}{data['p50_ms']:>10}{data['p95_ms']:>10}{data['p99_ms']:>10}"
+        base = (baseline or {}).get('operations', {}).get(op)
+        if base:
+            line += f"   p95 {_delta(data['p95_ms'], base['p95_ms'])}"
+        print(line)
+
+    print('\nconsultas SQL por petición:')
+    for endpoint, queries in sorted(report['db_queries_per_request'].items()):
+        line = f'  {endpoint:<32}{queries:>8}'
+        base = (baseline or {}).get('db_queries_per_request', {}).get(endpoint)
+        if base is not None:
+            line += f'   ({_delta(queries, base)})'
+        print(line)
+
+    print(f"\npeticiones al upstream: {report['upstream_requests']}")
+    if report.get('hedges'):
+        print(f"segundas peticiones a mirrors: {report['hedges']}")
+
+
+def _delta(current, previous):
+    if not previous:
+        return 'n/a'
+    return f'{(current - previous) / previous * 100:+.1f}%'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Prueba de carga end-to-end contra un AnimeFLV local',
+        epilog='Ejemplo: python -m benchmarks.load_test --clients 32 --duration 60 '
+               '--output run.json --compare baseline.json'
+    )
+    parser.add_argument('--clients', type=int, default=16, help='Clientes concurrentes')
+    parser.add_argument('--duration', type=float, default=30, help='Duración en segundos')
+    parser.add_argument('--latency', type=float, default=0.08, help='Latencia media del upstream (s)')
+    parser.add_argument('--jitter', type=float, default=0.5, help='Desviación relativa de la latencia')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fracción de respuestas 503 del upstream')
+    parser.add_argument('--slow-rate', type=float, default=0.0,
+                        help='Fracción de respuestas 10 veces más lentas del upstream')
+    parser.add_argument('--mirrors', type=int, default=0, help='Mirrors adicionales del upstream (hedging)')
+    parser.add_argument('--server', choices=['wsgi', 'asgi'], default='wsgi',
+                        help='Servir la app con WSGI (hilos) o ASGI (asgi.py, uvicorn)')
+    parser.add_argument('--output', help='Guardar el informe en JSON')
+    parser.add_argument('--compare', help='Informe JSON previo con el que comparar')
+    args = parser.parse_args()
+
+    report = run(args)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nInforme guardado en {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from benchmarks.load_test import percentile, serve_wsgi
+
+PASSWORD = 'secret123'
+
+
+def create_login_app(db_path: str, method: str, workers: int):
+    """App de testing sobre SQLite en disco con el hashing de contraseñas indicado"""
+    from app import create_app
+    from app.config import TestingConfig, config
+
+    class LoginBenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        LOG_LEVEL = 'ERROR'
+        PASSWORD_HASH_METHOD = method
+        PASSWORD_HASH_WORKERS = workers
+
+    config['login-benchmark'] = LoginBenchmarkConfig
+    return create_app('login-benchmark')
+
+
+def populate(users: int, legacy_method: str = None):
+    """Crea `users` usuarios; con `legacy_method` sus hashes usan ese método (se rehacen al entrar)"""
+    from werkzeug.security import generate_password_hash
+    from app.extensions import db
+    from app.models import User
+
+    legacy_hash = generate_password_hash(PASSWORD, legacy_method) if legacy_method else None
+    for i in range(users):
+        user = User(username=f'bench{i}', email=f'bench{i}@example.com')
+        if legacy_hash:
+            user.password_hash = legacy_hash
+        else:
+            user.set_password(PASSWORD)
+        db.session.add(user)
+    db.session.commit()
+
+
+def login_client(index, base_url, users, until, latencies, statuses, lock):
+    session = requests.Session()
+    i = index
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        response = session.post(f'{base_url}/api/auth/login',
+                                json={'email': f'bench{i % users}@example.com', 'password': PASSWORD})
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        i += 1
+
+
+def health_probe(base_url, until, latencies, interval=0.05):
+    """Lo que nota el resto de endpoints del worker durante la ráfaga de logins"""
+    session = requests.Session()
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        session.get(f'{base_url}/api/health')
+        latencies.append(time.perf_counter() - start)
+        time.sleep(interval)
+
+
+def run(args, workers: int):
+    from app.extensions import db, password_hasher
+    from app.models import User
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    app = create_login_app(db_path, args.method, workers)
+    with app.app_context():
+        db.create_all()
+        populate(args.users, args.legacy)
+
+    base_url, stop = serve_wsgi(app)
+    # Arranca el pool (spawn) antes de medir
+    with app.app_context():
+        password_hasher.hash('warmup')
+
+    latencies, statuses, health = [], {}, []
+    lock = threading.Lock()
+    until = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=login_client, args=(i, base_url, args.users, until, latencies, statuses, lock),
+                         daemon=True)
+        for i in range(args.clients)
+    ]
+    threads.append(threading.Thread(target=health_probe, args=(base_url, until, health), daemon=True))
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        rehashed = sum(1 for user in User.query.all() if not user.password_needs_rehash())
+
+    stop()
+    password_hasher.shutdown()
+    os.remove(db_path)
+
+    return {
+        'workers': workers,
+        'logins': len(latencies),
+        'throughput': len(latencies) / elapsed,
+        'login_p50': percentile(latencies, 50),
+        'login_p95': percentile(latencies, 95),
+        'health_p50': percentile(health, 50),
+        'health_p95': percentile(health, 95),
+        'statuses': statuses,
+        'current_hashes': rehashed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Logins concurrentes: hashing en el hilo de la petición vs pool de procesos'
+    )
+    parser.add_argument('--clients', type=int, default=8, help='Clientes haciendo login a la vez')
+    parser.add_argument('--duration', type=float, default=10, help='Duración de cada ronda en segundos')
+    parser.add_argument('--users', type=int, default=20, help='Usuarios registrados')
+    parser.add_argument('--method', default='scrypt:32768:8:1', help='PASSWORD_HASH_METHOD')
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 2],
+                        help='Valores de PASSWORD_HASH_WORKERS a comparar (0 = en el hilo)')
+    parser.add_argument('--legacy', metavar='METHOD',
+                        help='Guardar los hashes iniciales con otro método para medir el rehash')
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    print(f'{args.clients} clientes, {args.duration:.0f}s por ronda, {args.method}, '
+          f'{os.cpu_count()} CPU')
+    print(f'{"workers":>8} {"logins/s":>9} {"login p50":>10} {"login p95":>10} '
+          f'{"health p50":>11} {"health p95":>11}  estados')
+    for workers in args.workers:
+        report = run(args, workers)
+        print(f'{report["workers"]:>8} {report["throughput"]:>9.1f} '
+              f'{report["login_p50"] * 1000:>8.0f}ms {report["login_p95"] * 1000:>8.0f}ms '
+              f'{report["health_p50"] * 1000:>9.1f}ms {report["health_p95"] * 1000:>9.1f}ms  '
+              f'{report["statuses"]}')
+        if args.legacy:
+            print(f'{"":>8} hashes con el método actual: {report["current_hashes"]}/{args.users}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Plantillas con el mismo marcado que usa AnimeFLV (lo que parsea AnimeFLVScraper)
+LIST_ITEM = '''
+<li>
+  <article class="Anime alt B">
+    <a href="/anime/{id}">
+      <div class="Image fa-play-circle-o"><figure><img src="/uploads/animes/covers/{num}.jpg" alt="{title}"></figure></div>
+      <span class="Type tv">Anime</span>
+      <h3 class="Title">{title}</h3>
+    </a>
+    <div class="Description"><p><span class="Vts fa-star">4.{rating}</span></p></div>
+  </article>
+</li>'''
+
+LIST_PAGE = '''<!DOCTYPE html>
+<html lang="es"><head><title>Browse - AnimeFLV</title></head>
+<body><div class="Container"><main class="Main">
+<ul class="ListAnimes AX Rows A03 C02 D02">{items}</ul>
+</main></div></body></html>'''
+
+DETAIL_PAGE = '''<!DOCTYPE html>
+<html lang="es"><head><title>{title} - AnimeFLV</title></head>
+<body>
+<div class="Ficha fchlt"><div class="Container">
+  <h1 class="Title">{title}</h1>
+  <div><span class="TxtAlt">{title} Alt, {title} JP</span></div>
+  <nav class="Nvgnrs"><span>Tipo: Anime</span><span class="fa-tv">{status}</span>
+    <a href="/browse?genre[]=accion">Acción</a><a href="/browse?genre[]=aventura">Aventura</a></nav>
+  <span id="votes_prmd">4.5</span><span id="votes_nmbr">1234</span>
+</div></div>
+<div class="Container"><aside><div class="Image"><figure><img src="/uploads/animes/covers/{num}.jpg"></figure></div></aside>
+<main><section><div class="Description"><p>Sinopsis de {title}. {filler}</p></div></section></main></div>
+<script>
+var anime_info = ["{num}","{title}","{id}"];
+var episodes = [{episodes}];
+</script>
+</body></html>'''
+
+EPISODE_PAGE = '''<!DOCTYPE html>
+<html lang="es"><head><title>{id} Episodio {episode}</title></head>
+<body><div class="CpCnA"><h1 class="Title">{id} Episodio {episode}</h1></div>
+<script>
+var anime_id = {num};
+var episode_number = {episode};
+var videos = {videos};
+</script>
+</body></html>'''
+
+HOME_PAGE = '''<!DOCTYPE html>
+<html lang="es"><head><title>AnimeFLV</title></head>
+<body><ul class="ListEpisodios AX Rows A06 C04 D03">{items}</ul></body></html>'''
+
+HOME_ITEM = '''<li><a href="/ver/{id}-{episode}" class="fa-play"><span class="Image"><img src="/uploads/animes/thumbs/{num}.jpg"></span>
+<span class="Capi">Episodio {episode}</span><strong class="Title">{title}</strong></a></li>'''
+
+SERVERS = ['Okru', 'YourUpload', 'Streamwish', 'Mega', 'Netu']
+
+
+def _number(text: str) -> int:
+    """Número estable derivado de un texto (para que las páginas sean reproducibles)"""
+    return int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+
+
+def _title(anime_id: str) -> str:
+    return ' '.join(part.capitalize() for part in anime_id.split('-'))
+
+
+class StubAnimeFLVHandler(BaseHTTPRequestHandler):
+    """Sirve páginas con el marcado de AnimeFLV generadas de forma determinista"""
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            latency = max(0.0, random.gauss(server.latency, server.latency * server.jitter))
+            if random.random() < server.slow_rate:
+                latency *= 10
+            time.sleep(latency)
+
+        if server.error_rate and random.random() < server.error_rate:
+            self._send(503, 'Service Unavailable')
+            return
+
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        server.count(url.path)
+
+        if url.path == '/':
+            body = self._home()
+        elif url.path == '/browse':
+            body = self._browse(params)
+        elif url.path.startswith('/anime/'):
+            body = self._detail(url.path[len('/anime/'):])
+        elif url.path.startswith('/ver/'):
+            body = self._episode(url.path[len('/ver/'):])
+        else:
+            body = None
+
+        if body is None:
+            self._send(404, 'Not Found')
+        else:
+            self._send(200, body)
+
+    def _browse(self, params):
+        query = params.get('q', [''])[0].strip().lower()
+        page = int(params.get('page', ['1'])[0])
+
+        if query:
+            slug = re.sub(r'[^a-z0-9]+', '-', query).strip('-')
+            count = 2 + _number(query) % self.server.results_per_query
+            ids = [slug] + [f'{slug}-{i}' for i in range(2, count + 1)]
+        else:
+            if page > self.server.catalog_pages:
+                ids = []
+            else:
+                ids = [f'catalog-anime-{page}-{i}' for i in range(24)]
+
+        items = ''.join(
+            LIST_ITEM.format(id=anime_id, num=_number(anime_id) % 5000, title=_title(anime_id),
+                             rating=_number(anime_id) % 10)
+            for anime_id in ids
+        )
+        return LIST_PAGE.format(items=items)
+
+    def _detail(self, anime_id):
+        num = _number(anime_id) % 5000
+        episode_count = self.server.episodes_for(anime_id)
+        episodes = ','.join(f'[{ep},{num * 10000 + ep}]' for ep in range(episode_count, 0, -1))
+        status = 'En emision' if num % 3 == 0 else 'Finalizado'
+        return DETAIL_PAGE.format(
+            id=anime_id, num=num, title=_title(anime_id), status=status,
+            episodes=episodes, filler='Lorem ipsum dolor sit amet. ' * 20
+        )
+
+    def _episode(self, path):
+        match = re.match(r'(.+)-(\d+)$', path)
+        if not match:
+            return None
+
+        anime_id, episode = match.group(1), int(match.group(2))
+        videos = {'SUB': [
+            {'server': name.lower(), 'title': name, 'ads': i % 2, 'allow_mobile': True,
+             'code': f'https://{name.lower()}.example/embed/{anime_id}-{episode}'}
+            for i, name in enumerate(SERVERS)
+        ]}
+        return EPISODE_PAGE.format(id=anime_id, num=_number(anime_id) % 5000, episode=episode,
+                                   videos=json.dumps(videos))
+
+    def _home(self):
+        items = ''.join(
+            HOME_ITEM.format(id=anime_id, num=_number(anime_id) % 5000, title=_title(anime_id),
+                             episode=self.server.episodes_for(anime_id))
+            for anime_id in self.server.airing_ids
+        )
+        return HOME_PAGE.format(items=items)
+
+    def _send(self, status, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubAnimeFLVServer(ThreadingHTTPServer):
+    """
+    Servidor local que imita a AnimeFLV para pruebas de carga.
+
+    Args:
+        latency: Latencia media por respuesta en segundos
+        jitter: Desviación de la latencia relativa a la media
+        error_rate: Fracción de respuestas que devuelven 503
+        slow_rate: Fracción de respuestas 10 veces más lentas (cola larga)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.05, jitter=0.3, error_rate=0.0, slow_rate=0.0,
+                 results_per_query=12, catalog_pages=50, max_episodes=1200):
+        super().__init__((host, port), StubAnimeFLVHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.results_per_query = results_per_query
+        self.catalog_pages = catalog_pages
+        self.max_episodes = max_episodes
+        self.airing_ids = []
+        self.requests = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def episodes_for(self, anime_id: str) -> int:
+        return 1 + _number(anime_id) % self.max_episodes
+
+    def count(self, path: str):
+        kind = path.strip('/').split('/')[0] or 'home'
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, name='stub-animeflv', daemon=True)
+        thread.start()
+        return self
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Servidor local que imita a AnimeFLV')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubAnimeFLVServer(port=args.port, latency=args.latency, error_rate=args.error_rate)
+    print(f'Stub de AnimeFLV en {server.base_url}')
+    server.serve_forever()
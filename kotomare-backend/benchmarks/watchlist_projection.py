@@ -0,0 +1,146 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.load_test import create_benchmark_app
+
+SYNOPSIS = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 30
+
+
+def populate(entries: int):
+    """Crea `entries` animes con sinopsis y fuentes realistas y un usuario que los sigue todos"""
+    from app.extensions import db
+    from app.models import Anime, User, Watchlist
+
+    user = User(username='bench', email='bench@example.com')
+    user.set_password('secret123')
+    db.session.add(user)
+    db.session.flush()
+
+    rng = random.Random(0)
+    for i in range(entries):
+        anime = Anime(
+            title=f'Anime de prueba {i}', slug=f'anime-de-prueba-{i}', synopsis=SYNOPSIS,
+            cover_image=f'https://example.com/covers/{i}.jpg', type='Anime', status='Finalizado',
+            genres=['Acción', 'Aventura', 'Fantasía']
+        )
+        anime.add_source('animeflv', {
+            'id': f'anime-de-prueba-{i}', 'url': f'https://example.com/anime/{i}',
+            'title': anime.title, 'synopsis': SYNOPSIS, 'other_titles': [f'Alt {i}', f'JP {i}'],
+            'genres': anime.genres, 'rating': '4.5', 'votes': 1234, 'episodes_count': 24,
+        })
+        db.session.add(anime)
+        db.session.flush()
+        db.session.add(Watchlist(user_id=user.id, anime_id=anime.id, status='watching',
+                                 last_episode=rng.randint(0, 24)))
+
+    db.session.commit()
+    return user.id
+
+
+def full_rows(user_id):
+    """Lo que hacía GET /api/user/watchlist: filas completas y un SELECT por anime"""
+    from app.models import Watchlist
+
+    return [
+        {**entry.to_dict(), 'anime': entry.anime.to_dict(include_sources=False)}
+        for entry in Watchlist.query.filter_by(user_id=user_id).all()
+    ]
+
+
+def full_joined_rows(user_id):
+    """Filas completas con JOIN (sin N+1), para separar el efecto de las columnas"""
+    from sqlalchemy.orm import joinedload
+    from app.models import Watchlist
+
+    return [
+        {**entry.to_dict(), 'anime': entry.anime.to_dict(include_sources=False)}
+        for entry in Watchlist.query.filter_by(user_id=user_id).options(joinedload(Watchlist.anime)).all()
+    ]
+
+
+def summary_rows(user_id):
+    """GET /api/user/watchlist actual: JOIN con solo las columnas de listado"""
+    from sqlalchemy.orm import joinedload
+    from app.models import Anime, Watchlist
+
+    return [
+        entry.to_dict()
+        for entry in Watchlist.query.filter_by(user_id=user_id).options(
+            joinedload(Watchlist.anime).options(Anime.summary_load())
+        ).all()
+    ]
+
+
+def projection_rows(user_id):
+    """Proyección pura de columnas (sin objetos ORM)"""
+    from app.extensions import db
+    from app.models import Anime, Watchlist
+
+    rows = db.session.query(
+        Watchlist.anime_id, Watchlist.status, Watchlist.last_episode, *Anime.summary_columns()
+    ).join(Anime, Anime.id == Watchlist.anime_id).filter(Watchlist.user_id == user_id)
+
+    return [
+        {'anime_id': anime_id, 'status': status, 'last_episode': last_episode,
+         'anime': Anime.summary_from_row(anime)}
+        for anime_id, status, last_episode, *anime in rows
+    ]
+
+
+def measure(app, func, user_id, repeats):
+    """Mejor tiempo de `repeats` ejecuciones y pico de memoria de una ejecución"""
+    from app.extensions import db
+
+    best = float('inf')
+    for _ in range(repeats):
+        with app.app_context():
+            start = time.perf_counter()
+            func(user_id)
+            best = min(best, time.perf_counter() - start)
+            db.session.remove()
+
+    with app.app_context():
+        tracemalloc.start()
+        func(user_id)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Listado de watchlist: filas completas vs proyecciones')
+    parser.add_argument('--entries', type=int, default=2000, help='Entradas en la watchlist')
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_benchmark_app(os.path.join(tempfile.mkdtemp(prefix='kotomare-bench-'), 'bench.db'))
+    with app.app_context():
+        user_id = populate(args.entries)
+
+    print(f"Watchlist de {args.entries} entradas\n")
+    print(f"{'variante':<14}{'ms':>10}{'pico MB':>10}")
+    baseline = None
+    variants = (
+        ('completa', full_rows), ('completa+join', full_joined_rows),
+        ('summary', summary_rows), ('proyección', projection_rows)
+    )
+    for name, func in variants:
+        elapsed, peak = measure(app, func, user_id, args.repeats)
+        line = f'{name:<14}{elapsed * 1000:>10.1f}{peak / 1024 / 1024:>10.2f}'
+        if baseline:
+            line += f'   ({elapsed / baseline[0]:.2f}x tiempo, {peak / baseline[1]:.2f}x memoria)'
+        else:
+            baseline = (elapsed, peak)
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
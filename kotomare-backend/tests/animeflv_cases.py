@@ -0,0 +1,36 @@
+import os
+from app.scrapers.animeflv import AnimeFLVScraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'animeflv')
+GOLDEN_DIR = os.path.join(FIXTURES_DIR, 'golden')
+PERF_BASELINE = os.path.join(FIXTURES_DIR, 'perf_baseline.json')
+
+# (nombre, método del scraper, argumentos, página HTML capturada)
+CASES = [
+    ('search_naruto', 'search', ('naruto',), 'search_naruto.html'),
+    ('browse_page1', 'browse', (1,), 'browse_page1.html'),
+    ('detail_naruto', 'get_anime_detail', ('naruto',), 'anime_naruto.html'),
+    ('detail_one_piece', 'get_anime_detail', ('one-piece-tv',), 'anime_one_piece.html'),
+    ('episodes_naruto', 'get_episodes', ('naruto',), 'anime_naruto.html'),
+    ('episodes_one_piece', 'get_episodes', ('one-piece-tv',), 'anime_one_piece.html'),
+    ('videos_naruto_100', 'get_video_sources', ('naruto', 100), 'ver_naruto_100.html'),
+    ('latest_episodes', 'get_latest_episodes', (), 'home.html'),
+]
+
+CASE_IDS = [case[0] for case in CASES]
+
+
+def load_fixture(filename: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, filename), encoding='utf-8') as f:
+        return f.read()
+
+
+def make_scraper(html: str) -> AnimeFLVScraper:
+    """Scraper que responde cualquier petición con el HTML dado (sin red)"""
+    scraper = AnimeFLVScraper()
+    scraper._make_request = lambda url, **kwargs: html
+    return scraper
+
+
+def run_case(method: str, args: tuple, html: str):
+    return getattr(make_scraper(html), method)(*args)
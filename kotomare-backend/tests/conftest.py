@@ -0,0 +1,23 @@
+import pytest
+from app import create_app
+from app.config import TestingConfig, config
+from app.extensions import db
+
+
+@pytest.fixture
+def make_app(monkeypatch):
+    """Crea la app de testing con la configuración cambiada (`make_app(JOB_MAX_ATTEMPTS=2)`)"""
+    def factory(**overrides):
+        monkeypatch.setitem(config, 'testing', type('TestConfig', (TestingConfig,), overrides))
+        return create_app('testing')
+    return factory
+
+
+@pytest.fixture
+def app(make_app):
+    """App de testing (SQLite en memoria) con el app context abierto"""
+    app = make_app()
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
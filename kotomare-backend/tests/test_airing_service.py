@@ -0,0 +1,76 @@
+import pytest
+from app.extensions import cache, db
+from app.models import Anime, EpisodeList
+from app.scrapers import get_scraper
+from app.services.airing_service import AiringService
+
+
+def episodes(last: int):
+    return [{'number': n, 'id': f'ep-{n}', 'url': f'/ver/ep-{n}'} for n in range(1, last + 1)]
+
+
+@pytest.fixture
+def airing_anime(app):
+    """Anime en emisión con 2 episodios guardados; el feed publica el 3"""
+    anime = Anime(title='Serie', slug='serie', status='emision')
+    anime.add_source('animeflv', {'id': 'serie'})
+    db.session.add(anime)
+    db.session.flush()
+
+    stored = EpisodeList(anime_id=anime.id, source='animeflv')
+    stored.set_episodes(episodes(2))
+    db.session.add(stored)
+    db.session.commit()
+    return anime
+
+
+@pytest.fixture
+def source(monkeypatch):
+    """Fuente de mentira: feed con el episodio 3 y la ficha que se configure"""
+    scraper_class = type(get_scraper('animeflv'))
+    state = {'episodes': [], 'refresh': []}
+
+    def get_episodes(self, anime_id, refresh=False):
+        state['refresh'].append(refresh)
+        return state['episodes']
+
+    monkeypatch.setattr(scraper_class, 'get_latest_episodes', lambda self: [{'anime_id': 'serie', 'episode': 3}])
+    monkeypatch.setattr(scraper_class, 'get_episodes', get_episodes)
+    return state
+
+
+def test_refresh_fetches_the_page_bypassing_the_cache(airing_anime, source):
+    source['episodes'] = episodes(3)
+
+    stats = AiringService.refresh_from_latest()
+
+    assert stats['updated'] == 1
+    assert source['refresh'] == [True]
+    assert EpisodeList.query.one().last_episode == 3
+
+
+def test_refresh_behind_the_feed_is_not_counted_as_updated(airing_anime, source):
+    source['episodes'] = episodes(2)
+
+    stats = AiringService.refresh_from_latest()
+
+    assert stats['updated'] == 0
+    assert stats['behind'] == 1
+
+
+def test_failed_refresh(airing_anime, source):
+    stats = AiringService.refresh_from_latest()
+
+    assert stats['failed'] == 1
+    assert EpisodeList.query.one().last_episode == 2
+
+
+def test_make_request_refresh_skips_the_cached_page(app, monkeypatch):
+    scraper = get_scraper('animeflv')
+    url = f'{scraper.base_url}/anime/serie'
+    cache.set(f'page:{url}', 'vieja')
+    monkeypatch.setattr(type(scraper), '_fetch', lambda self, url, operation, **kwargs: 'nueva')
+
+    assert scraper._make_request(url, cache=True) == 'vieja'
+    assert scraper._make_request(url, cache=True, refresh=True) == 'nueva'
+    assert scraper._make_request(url, cache=True) == 'nueva'
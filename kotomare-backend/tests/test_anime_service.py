@@ -0,0 +1,51 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app.extensions import db
+from app.models import Anime, EpisodeList
+from app.scrapers import get_scraper
+from app.services.anime_service import AnimeService
+
+STORED = [{'number': 1, 'id': 'ep-1', 'url': '/ver/ep-1'}, {'number': 2, 'id': 'ep-2', 'url': '/ver/ep-2'}]
+
+
+@pytest.fixture
+def stale_anime(app):
+    """Anime finalizado con una lista de episodios guardada ya caducada"""
+    anime = Anime(title='Serie', slug='serie', status='finalizado')
+    anime.add_source('animeflv', {'id': 'serie'})
+    db.session.add(anime)
+    db.session.flush()
+
+    stored = EpisodeList(anime_id=anime.id, source='animeflv')
+    stored.set_episodes(STORED)
+    stored.updated_at = datetime.utcnow() - timedelta(days=30)
+    db.session.add(stored)
+    db.session.commit()
+    return anime
+
+
+@pytest.fixture
+def failing_scraper(monkeypatch):
+    """El scraper devuelve [] como cuando la fuente no responde"""
+    scraper_class = type(get_scraper('animeflv'))
+
+    async def get_episodes_async(self, anime_id):
+        return []
+
+    monkeypatch.setattr(scraper_class, 'get_episodes', lambda self, anime_id: [])
+    monkeypatch.setattr(scraper_class, 'get_episodes_async', get_episodes_async)
+
+
+def test_failed_scrape_keeps_stored_episodes(stale_anime, failing_scraper):
+    result = AnimeService.get_episodes('serie')
+
+    assert result['episodes'] == STORED
+    assert EpisodeList.query.one().episodes == STORED
+
+
+def test_failed_async_scrape_keeps_stored_episodes(stale_anime, failing_scraper):
+    result = asyncio.run(AnimeService.get_episodes_async('serie'))
+
+    assert result['episodes'] == STORED
+    assert EpisodeList.query.one().episodes == STORED
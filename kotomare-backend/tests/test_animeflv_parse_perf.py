@@ -0,0 +1,87 @@
+import json
+import os
+import time
+import tracemalloc
+import pytest
+from tests.animeflv_cases import CASES, CASE_IDS, PERF_BASELINE, load_fixture, run_case
+
+# No entran en la ejecución por defecto (pytest.ini): `pytest -m perf`.
+# UPDATE_PERF_BASELINE=1 reescribe la línea base con las mediciones de esta máquina
+UPDATE_BASELINE = os.getenv('UPDATE_PERF_BASELINE') == '1'
+# Factor máximo permitido sobre la línea base antes de fallar
+TOLERANCE = float(os.getenv('PARSE_PERF_TOLERANCE', 2.0))
+
+ITERATIONS = 20
+REPEATS = 5
+
+_measurements = {}
+
+
+def measure(method: str, args: tuple, html: str) -> dict:
+    """Tiempo por página (mejor de REPEATS) y memoria pico de un parseo"""
+    run_case(method, args, html)  # calentamiento
+
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            run_case(method, args, html)
+        best = min(best, (time.perf_counter() - start) / ITERATIONS)
+
+    tracemalloc.start()
+    run_case(method, args, html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'ms_per_page': round(best * 1000, 3), 'peak_kb': round(peak / 1024, 1)}
+
+
+def load_baseline() -> dict:
+    if not os.path.exists(PERF_BASELINE):
+        return {}
+    with open(PERF_BASELINE) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope='module', autouse=True)
+def write_baseline():
+    yield
+    if UPDATE_BASELINE and _measurements:
+        baseline = load_baseline()
+        baseline.update(_measurements)
+        with open(PERF_BASELINE, 'w') as f:
+            json.dump(dict(sorted(baseline.items())), f, indent=2)
+            f.write('\n')
+
+
+@pytest.mark.perf
+@pytest.mark.parametrize('name, method, args, fixture', CASES, ids=CASE_IDS)
+def test_parse_time_and_memory_within_baseline(name, method, args, fixture):
+    result = measure(method, args, load_fixture(fixture))
+    _measurements[name] = result
+
+    if UPDATE_BASELINE:
+        return
+
+    expected = load_baseline().get(name)
+    if not expected:
+        pytest.skip(f'Sin línea base para {name}; ejecutar con UPDATE_PERF_BASELINE=1 pytest -m perf')
+
+    assert result['ms_per_page'] <= expected['ms_per_page'] * TOLERANCE, (
+        f"{name}: {result['ms_per_page']} ms/página, línea base {expected['ms_per_page']} ms "
+        f"(tolerancia x{TOLERANCE})"
+    )
+    assert result['peak_kb'] <= expected['peak_kb'] * TOLERANCE, (
+        f"{name}: pico de {result['peak_kb']} KB, línea base {expected['peak_kb']} KB "
+        f"(tolerancia x{TOLERANCE})"
+    )
+
+
+if __name__ == '__main__':
+    baseline = load_baseline()
+    print(f"{'caso':<22}{'ms/página':>12}{'base':>10}{'pico KB':>10}{'base':>10}")
+    for name, method, args, fixture in CASES:
+        result = measure(method, args, load_fixture(fixture))
+        expected = baseline.get(name, {})
+        print(f"{name:<22}{result['ms_per_page']:>12}{expected.get('ms_per_page', '-'):>10}"
+              f"{result['peak_kb']:>10}{expected.get('peak_kb', '-'):>10}")
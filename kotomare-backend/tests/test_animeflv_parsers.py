@@ -0,0 +1,48 @@
+import json
+import os
+import pytest
+from tests.animeflv_cases import CASES, CASE_IDS, GOLDEN_DIR, load_fixture, run_case
+
+# UPDATE_GOLDEN=1 regenera los JSON esperados a partir de la salida actual
+UPDATE_GOLDEN = os.getenv('UPDATE_GOLDEN') == '1'
+
+
+@pytest.mark.parametrize('name, method, args, fixture', CASES, ids=CASE_IDS)
+def test_parser_matches_golden(name, method, args, fixture):
+    result = run_case(method, args, load_fixture(fixture))
+    golden_path = os.path.join(GOLDEN_DIR, f'{name}.json')
+
+    if UPDATE_GOLDEN:
+        with open(golden_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+
+    with open(golden_path, encoding='utf-8') as f:
+        expected = json.load(f)
+
+    assert result == expected
+
+
+def test_search_extracts_every_listed_anime():
+    results = run_case('search', ('naruto',), load_fixture('search_naruto.html'))
+
+    assert [r['id'] for r in results][:2] == ['naruto', 'naruto-shippuden-hd']
+    assert all(r['cover_image'].startswith('https://') for r in results)
+
+
+def test_episode_count_matches_episode_list():
+    html = load_fixture('anime_one_piece.html')
+    detail = run_case('get_anime_detail', ('one-piece-tv',), html)
+    episodes = run_case('get_episodes', ('one-piece-tv',), html)
+
+    assert detail['episodes_count'] == len(episodes) == 1110
+    assert [ep['number'] for ep in episodes] == list(range(1, 1111))
+
+
+def test_empty_or_unrelated_page_yields_nothing():
+    html = '<html><body><p>Mantenimiento</p></body></html>'
+
+    assert run_case('search', ('naruto',), html) == []
+    assert run_case('get_episodes', ('naruto',), html) == []
+    assert run_case('get_video_sources', ('naruto', 1), html) == []
+    assert run_case('get_latest_episodes', (), html) == []
@@ -0,0 +1,98 @@
+import asyncio
+import io
+import json
+import httpx
+import pytest
+from app.asgi import AsgiApp, _ReceiveStream, _read_body
+from app.extensions import db
+from app.models import Anime, Watchlist
+
+LINES = [
+    {'kind': 'library', 'version': 1},
+    {'kind': 'watchlist', 'slug': 'naruto', 'status': 'watching', 'last_episode': 100},
+    {'kind': 'favorite', 'title': 'One Piece'},
+]
+
+
+def receive_from(chunks, received=None):
+    """Canal ASGI que entrega `chunks` como mensajes http.request (y anota cuántos van)"""
+    messages = [
+        {'type': 'http.request', 'body': chunk, 'more_body': i < len(chunks) - 1} for i, chunk in enumerate(chunks)
+    ]
+
+    async def receive():
+        if received is not None:
+            received.append(1)
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+    return receive
+
+
+def test_receive_stream_reads_lines_across_chunks():
+    async def read():
+        loop = asyncio.get_running_loop()
+        received = []
+        stream = io.BufferedReader(_ReceiveStream(receive_from([b'{"a":', b' 1}\n{"b"', b': 2}\n', b''], received), loop))
+        first = await asyncio.to_thread(stream.readline)
+        return first, len(received), await asyncio.to_thread(stream.read)
+
+    first, received, rest = asyncio.run(read())
+
+    assert first == b'{"a": 1}\n'
+    assert received == 2  # la primera línea acaba en el segundo trozo: no se pide más
+    assert rest == b'{"b": 2}\n'
+
+
+def test_read_body_stops_past_the_limit():
+    chunks = [b'x' * 10] * 5
+
+    assert asyncio.run(_read_body(receive_from(chunks))) == b'x' * 50
+    assert asyncio.run(_read_body(receive_from(chunks), limit=25)) == b'x' * 30
+
+
+@pytest.fixture
+def asgi(make_app):
+    app = make_app(MAX_CONTENT_LENGTH=4096)
+    with app.app_context():
+        db.session.add_all([Anime(title='Naruto', slug='naruto'), Anime(title='One Piece', slug='one-piece')])
+        db.session.commit()
+    return AsgiApp(app)
+
+
+async def call(asgi, method, url, token=None, **kwargs):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi), base_url='http://test') as client:
+        if token is None:
+            await client.post('/api/auth/register', json={
+                'username': 'kotomare', 'email': 'kotomare@example.com', 'password': 'secreto123'
+            })
+            login = await client.post('/api/auth/login', json={'email': 'kotomare@example.com', 'password': 'secreto123'})
+            token = login.json()['access_token']
+        return await client.request(method, url, headers={'Authorization': f'Bearer {token}'}, **kwargs)
+
+
+def test_library_import_streams_a_chunked_body(asgi):
+    async def body():
+        for line in LINES:
+            yield (json.dumps(line) + '\n').encode()
+
+    response = asyncio.run(call(asgi, 'POST', '/api/user/library/import?format=ndjson', content=body()))
+
+    assert response.status_code == 200
+    done = [json.loads(line) for line in response.text.splitlines()][-1]
+    assert (done['stage'], done['created']) == ('done', 2)
+    with asgi.app.app_context():
+        assert Watchlist.query.one().last_episode == 100
+
+
+@pytest.mark.parametrize('chunked', [False, True])
+def test_body_over_max_content_length_is_rejected(asgi, chunked):
+    data = b'\n'.join(json.dumps({'kind': 'favorite', 'title': 'x' * 100}).encode() for _ in range(60))
+
+    async def body():
+        for start in range(0, len(data), 1000):
+            yield data[start:start + 1000]
+
+    response = asyncio.run(call(
+        asgi, 'POST', '/api/user/library/import?format=ndjson', content=body() if chunked else data
+    ))
+
+    assert response.status_code == 413
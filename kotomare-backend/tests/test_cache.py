@@ -0,0 +1,163 @@
+import os
+import threading
+from types import SimpleNamespace
+import pytest
+from app.cache import Cache, MemoryCache, SQLiteCache
+from app.cache import memory as memory_module, sqlite as sqlite_module
+
+VALUE = 'x' * 8  # 10 bytes en JSON
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj controlado por el test para los dos backends (`clock.now`)"""
+    fake = SimpleNamespace(now=1000.0)
+    fake_time = SimpleNamespace(time=lambda: fake.now)
+    monkeypatch.setattr(memory_module, 'time', fake_time)
+    monkeypatch.setattr(sqlite_module, 'time', fake_time)
+    return fake
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryCache(max_bytes=1024)
+    return SQLiteCache(str(tmp_path / 'cache.db'), max_bytes=1024)
+
+
+def test_entries_expire_after_their_ttl(backend, clock):
+    backend.set('page:a', {'html': '<p>'}, ttl=60)
+    backend.set('page:b', 'sin caducidad')
+
+    clock.now += 59
+    assert backend.get('page:a') == {'html': '<p>'}
+    assert backend.expires_in('page:a') == pytest.approx(1)
+
+    clock.now += 1
+    assert backend.get('page:a') is None
+    assert backend.expires_in('page:a') is None
+    assert backend.get('page:b') == 'sin caducidad'
+    assert backend.expires_in('page:b') == float('inf')
+
+
+def test_default_ttl(tmp_path, clock):
+    for backend in (MemoryCache(default_ttl=10), SQLiteCache(str(tmp_path / 'cache.db'), default_ttl=10)):
+        backend.set('k', 1)
+        clock.now += 10
+        assert backend.get('k') is None
+
+
+def test_oversized_values_are_not_stored(backend):
+    backend.set('k', 'x' * 2000)
+
+    assert backend.get('k') is None
+
+
+def test_memory_evicts_least_recently_used(clock):
+    backend = MemoryCache(max_bytes=30)
+    for key in 'abc':
+        backend.set(key, VALUE)
+
+    backend.get('a')  # 'b' pasa a ser el menos usado
+    backend.set('d', VALUE)
+
+    assert backend.get('b') is None
+    assert [backend.get(key) for key in 'acd'] == [VALUE] * 3
+    assert backend.stats()['bytes'] == 30
+
+
+def test_memory_replacing_a_key_keeps_the_size(clock):
+    backend = MemoryCache(max_bytes=30)
+    backend.set('a', VALUE)
+    backend.set('a', VALUE)
+
+    assert backend.stats() == {'entries': 1, 'bytes': 10, 'max_bytes': 30}
+
+
+def test_sqlite_evicts_least_recently_used(tmp_path, clock):
+    backend = SQLiteCache(str(tmp_path / 'cache.db'), max_bytes=30, touch_interval=0, evict_every=1000)
+    for key in 'abcd':
+        clock.now += 1
+        backend.set(key, VALUE)
+
+    clock.now += 1
+    backend.get('a')  # 'b' pasa a ser el menos usado
+
+    # Se pasa de 30 bytes: se libera hasta quedar en el 90% (27)
+    assert backend.evict() == 2
+    assert [backend.get(key) for key in 'abcd'] == [VALUE, None, None, VALUE]
+
+
+def test_sqlite_evicts_every_n_writes(tmp_path, clock):
+    backend = SQLiteCache(str(tmp_path / 'cache.db'), max_bytes=30, evict_every=5)
+    for n in range(5):
+        clock.now += 1
+        backend.set(f'k{n}', VALUE)
+
+    assert backend.stats()['bytes'] <= 30
+
+
+def test_sqlite_connection_per_thread(tmp_path):
+    backend = SQLiteCache(str(tmp_path / 'cache.db'))
+    connections, errors = [], []
+
+    def worker(n):
+        try:
+            connections.append(backend._connect())
+            for i in range(20):
+                backend.set(f'{n}:{i}', i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len({id(conn) for conn in connections}) == 4
+    assert backend.stats()['entries'] == 80
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='Necesita os.fork')
+def test_sqlite_reconnects_after_fork(tmp_path):
+    backend = SQLiteCache(str(tmp_path / 'cache.db'))
+    parent_conn = backend._connect()
+    backend.set('padre', 1)
+
+    pid = os.fork()
+    if pid == 0:
+        # Hijo (como un worker de gunicorn): no debe reutilizar la conexión del padre
+        ok = backend._connect() is not parent_conn and backend.get('padre') == 1
+        backend.set('hijo', 2)
+        os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert backend._connect() is parent_conn
+    assert backend.get('hijo') == 2
+
+
+def test_cache_uses_the_namespace_ttl(make_app, clock):
+    app = make_app(CACHE_TTL_PAGE=30)
+    cache = Cache(app)
+
+    cache.set('page:a', 'html')
+    assert cache.expires_in('page:a') == pytest.approx(30)
+
+    clock.now += 30
+    assert cache.get('page:a') is None
+
+
+def test_cache_backend_errors_are_misses(make_app, monkeypatch):
+    cache = Cache(make_app())
+
+    def broken(*args):
+        raise OSError('disco lleno')
+
+    monkeypatch.setattr(cache.backend, 'get', broken)
+    monkeypatch.setattr(cache.backend, 'set', broken)
+
+    cache.set('page:a', 'html')
+    assert cache.get('page:a') is None
@@ -0,0 +1,78 @@
+import pytest
+from flask import Flask
+from sqlalchemy import insert, select
+from app.extensions import db
+from app.models import Anime
+from app.utils.db_routing import read_only
+
+
+@pytest.fixture
+def replicated_app(make_app, tmp_path):
+    """
+    App con la principal y la réplica en dos SQLite distintos. La réplica
+    tiene un anime que la principal no (como si la principal lo hubiera
+    borrado y la réplica aún no lo supiera), así se ve de dónde lee cada consulta.
+    """
+    app = make_app(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'primary.db'}",
+        SQLALCHEMY_BINDS={'replica': f"sqlite:///{tmp_path / 'replica.db'}"}
+    )
+    with app.app_context():
+        db.metadata.create_all(db.engines['replica'])
+        with db.engines['replica'].begin() as conn:
+            conn.execute(insert(Anime), [{'title': 'Solo en réplica', 'slug': 'replica'}])
+        db.session.add(Anime(title='Solo en principal', slug='primary'))
+        db.session.commit()
+    yield app
+
+    # `db` es global: sin esto las apps siguientes (sin réplica) intentarían crear sus tablas
+    db.metadatas.pop('replica', None)
+
+
+def test_read_only_views_use_the_replica(replicated_app):
+    client = replicated_app.test_client()
+
+    assert client.get('/api/anime/replica').status_code == 200
+    assert client.get('/api/anime/primary').status_code == 404
+
+
+def test_unmarked_views_use_the_primary(replicated_app):
+    client = replicated_app.test_client()
+
+    assert client.get('/api/anime/replica/episodes').status_code == 404
+    assert client.get('/api/anime/primary/episodes').status_code == 200
+
+
+def slugs() -> set:
+    return set(db.session.scalars(select(Anime.slug)))
+
+
+def test_session_reads_from_the_primary_after_writing(replicated_app):
+    with replicated_app.test_request_context():
+        db.session.info['read_only'] = True
+        assert slugs() == {'replica'}
+
+        db.session.add(Anime(title='Nuevo', slug='nuevo'))
+        db.session.flush()
+
+        # El INSERT fue a la principal y desde ahí se lee también de ella
+        assert slugs() == {'primary', 'nuevo'}
+        db.session.rollback()
+
+
+def test_dml_in_a_read_only_session_goes_to_the_primary(replicated_app):
+    with replicated_app.test_request_context():
+        db.session.info['read_only'] = True
+        db.session.execute(insert(Anime).values(title='Nuevo', slug='nuevo'))
+        db.session.commit()
+
+        assert slugs() == {'primary', 'nuevo'}
+
+
+def test_without_replica_read_only_uses_the_primary(app):
+    db.session.add(Anime(title='Naruto', slug='naruto'))
+    db.session.commit()
+
+    view = read_only(lambda: slugs())
+    with app.test_request_context():
+        assert view() == {'naruto'}
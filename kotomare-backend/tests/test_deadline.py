@@ -0,0 +1,71 @@
+import asyncio
+import httpx
+import pytest
+import requests
+from app.scrapers import get_scraper
+from app.utils import deadline
+
+
+@pytest.fixture
+def timeouts(app, monkeypatch):
+    """Timeouts con los que se llega a pedir cada URL (la petición siempre vence)"""
+    seen = []
+
+    def get(url, timeout=None, **kwargs):
+        seen.append(timeout)
+        raise requests.Timeout('read timeout')
+
+    async def get_async(self, url, timeout=None, **kwargs):
+        seen.append(timeout)
+        raise httpx.ReadTimeout('read timeout')
+
+    monkeypatch.setattr(requests, 'get', get)
+    monkeypatch.setattr(httpx.AsyncClient, 'get', get_async)
+    yield seen
+    deadline.use_deadline(None)
+
+
+def budget_with(*remaining):
+    """Presupuesto cuyas consultas de `remaining()` dan esos valores (y luego 0)"""
+    budget = deadline.start_deadline(60)
+    values = iter(remaining)
+    budget.remaining = lambda: next(values, 0.0)
+    return budget
+
+
+def test_timeout_for_is_capped_by_the_budget():
+    deadline.use_deadline(None)
+    assert deadline.timeout_for(10) == 10
+
+    budget = deadline.start_deadline(2)
+    assert 1.5 < deadline.timeout_for(10) <= 2
+    assert 1.5 < deadline.timeout_for(None) <= 2
+
+    budget.at -= 5
+    assert deadline.expired()
+    assert deadline.timeout_for(10) == 0
+    deadline.use_deadline(None)
+
+
+@pytest.mark.parametrize('remaining', [(), (0.001,)])
+def test_fetch_never_uses_a_zero_timeout(timeouts, remaining):
+    scraper = get_scraper('animeflv')
+    budget = budget_with(*remaining)
+
+    # Sin tiempo no se pide; con el último milisegundo se pide y vence
+    assert scraper._fetch_url(f'{scraper.base_url}/anime/serie', 'episodes') is None
+    assert timeouts == list(remaining)
+    assert budget.cut_off == ['animeflv']
+
+
+@pytest.mark.parametrize('remaining', [(), (0.001,)])
+def test_async_fetch_never_uses_a_zero_timeout(timeouts, remaining):
+    scraper = get_scraper('animeflv')
+
+    async def fetch():
+        budget = budget_with(*remaining)
+        html = await scraper._fetch_url_async(f'{scraper.base_url}/anime/serie', 'episodes')
+        return html, budget.cut_off
+
+    assert asyncio.run(fetch()) == (None, ['animeflv'])
+    assert timeouts == list(remaining)
@@ -0,0 +1,22 @@
+from app.extensions import popularity
+
+
+def test_popularity_requires_the_metrics_token(make_app):
+    client = make_app(METRICS_TOKEN='secreto').test_client()
+
+    assert client.get('/api/health/popularity').status_code == 401
+    assert client.get('/api/metrics').status_code == 401
+
+    response = client.get('/api/health/popularity', headers={'Authorization': 'Bearer secreto'})
+    assert response.status_code == 200
+
+
+def test_popularity_top_is_clamped(make_app, monkeypatch):
+    requested = []
+    monkeypatch.setattr(popularity, 'top', lambda kind, k: requested.append(k) or [])
+    client = make_app().test_client()
+
+    client.get('/api/health/popularity?top=1000000')
+    client.get('/api/health/popularity?top=-5')
+
+    assert set(requested) == {100, 1}
@@ -0,0 +1,104 @@
+import threading
+from datetime import datetime, timedelta
+import pytest
+from app.extensions import db
+from app.models import Job
+from app.services.job_service import JOB_HANDLERS, JobService
+
+
+@pytest.fixture
+def failing_handler(monkeypatch):
+    def handler(payload):
+        raise RuntimeError('la fuente no responde')
+    monkeypatch.setitem(JOB_HANDLERS, 'test_fail', handler)
+
+
+def make_job(**values) -> Job:
+    job = Job(kind=values.pop('kind', 'test_fail'), key=values.pop('key', 'k'), **values)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def test_claim_is_exclusive(app):
+    job = JobService.enqueue('test_fail', 'a')
+
+    assert JobService.claim_next().id == job.id
+    assert JobService.claim_next() is None
+    assert db.session.get(Job, job.id).attempts == 1
+
+
+def test_concurrent_workers_claim_a_job_once(make_app, tmp_path):
+    app = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'jobs.db'}")
+    with app.app_context():
+        JobService.enqueue('test_fail', 'a')
+
+    claimed, barrier = [], threading.Barrier(4)
+
+    def worker():
+        with app.app_context():
+            barrier.wait()
+            job = JobService.claim_next()
+            if job:
+                claimed.append(job.id)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(claimed) == 1
+
+
+def test_failure_is_retried_with_backoff_until_max_attempts(app, failing_handler):
+    app.config.update(JOB_RETRY_BASE_DELAY=10, JOB_RETRY_MAX_DELAY=1000)
+    job = make_job(max_attempts=2)
+
+    JobService.run_job(JobService.claim_next())
+    assert job.status == 'pending'
+    assert job.last_error == 'la fuente no responde'
+    # Primer reintento: base (10s) con ±20% de jitter
+    delay = (job.run_at - datetime.utcnow()).total_seconds()
+    assert 7 <= delay <= 12.5
+
+    job.run_at = datetime.utcnow()
+    db.session.commit()
+    JobService.run_job(JobService.claim_next())
+    assert job.status == 'failed'
+    assert job.finished_at is not None
+
+
+def test_retry_delay_grows_exponentially_and_is_capped(app):
+    app.config.update(JOB_RETRY_BASE_DELAY=10, JOB_RETRY_MAX_DELAY=100)
+
+    assert 8 <= JobService.retry_delay(1) <= 12
+    assert 32 <= JobService.retry_delay(3) <= 48
+    assert 80 <= JobService.retry_delay(10) <= 120
+
+
+def test_stale_running_job_is_reclaimed(app):
+    app.config['JOB_STALE_TIMEOUT'] = 60
+    job = make_job(status='running', attempts=1, max_attempts=3,
+                   started_at=datetime.utcnow() - timedelta(seconds=120))
+
+    assert JobService.claim_next().id == job.id
+    assert job.attempts == 2
+
+
+def test_recent_running_job_is_not_reclaimed(app):
+    app.config['JOB_STALE_TIMEOUT'] = 60
+    make_job(status='running', attempts=1, started_at=datetime.utcnow())
+
+    assert JobService.claim_next() is None
+
+
+def test_stale_job_without_attempts_left_is_failed(app):
+    app.config['JOB_STALE_TIMEOUT'] = 60
+    job = make_job(status='running', attempts=3, max_attempts=3,
+                   started_at=datetime.utcnow() - timedelta(seconds=120))
+
+    assert JobService.claim_next() is None
+    db.session.refresh(job)
+    assert job.status == 'failed'
+    assert job.attempts == 3
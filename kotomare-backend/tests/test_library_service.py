@@ -0,0 +1,193 @@
+import io
+import os
+import pytest
+from app.extensions import db
+from app.models import Anime, EpisodeNotification, Favorite, User, Watchlist
+from app.services.library_service import LibraryService
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'library')
+
+
+def fixture_stream(name: str) -> io.BytesIO:
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+        return io.BytesIO(f.read())
+
+
+def run_import(user, entries, overwrite=False):
+    return list(LibraryService.import_entries(user.id, entries, overwrite=overwrite))
+
+
+@pytest.fixture
+def user(app):
+    user = User(username='kotomare', email='kotomare@example.com')
+    user.set_password('secreto123')
+    db.session.add(user)
+    for title, slug in (('Naruto', 'naruto'), ('Shingeki no Kyojin', 'shingeki-no-kyojin'), ('One Piece', 'one-piece')):
+        db.session.add(Anime(title=title, slug=slug))
+    db.session.commit()
+    return user
+
+
+def anime_id(slug: str) -> int:
+    return Anime.query.filter_by(slug=slug).one().id
+
+
+def test_mal_xml_entries(app):
+    entries, error = LibraryService.read_entries(fixture_stream('mal.xml'), 'mal')
+
+    assert error is None
+    assert [entry['title'] for entry in entries] == ['Shingeki no Kyojin', 'ONE PIECE (TV)', 'Serie Que No Existe']
+    assert [entry['status'] for entry in entries] == ['completed', 'watching', 'plan_to_watch']
+    assert entries[0]['last_episode'] == 25
+    assert entries[0]['started_at'].isoformat() == '2024-01-02T00:00:00'
+    assert entries[1]['started_at'] is None
+    assert entries[1]['notes'] == 'Muy larga'
+    assert entries[0]['notes'] is None
+
+
+def test_malformed_mal_xml(app):
+    entries, error = LibraryService.read_entries(io.BytesIO(b'<myanimelist><anime><series_title>'), 'mal')
+
+    assert entries is None
+    assert error.startswith('XML inválido')
+
+
+def test_ndjson_entries(app):
+    entries, error = LibraryService.read_entries(fixture_stream('library.ndjson'), 'ndjson')
+
+    # La cabecera, la línea vacía y los tipos desconocidos no son entradas
+    assert error is None
+    assert [entry['kind'] for entry in entries] == ['watchlist', 'watchlist', 'favorite']
+    assert entries[0]['preferred_source'] == 'animeflv'
+    assert entries[0]['started_at'].isoformat() == '2025-03-01T00:00:00'
+
+
+@pytest.mark.parametrize('line, error', [
+    (b'{"kind": "watchlist", "title": ', 'Línea 2: JSON inválido'),
+    (b'["naruto"]', 'Línea 2: se esperaba un objeto'),
+    (b'{"kind": "watchlist", "title": "Naruto", "notes": 42}', 'Línea 2: notes debe ser texto'),
+    (b'{"kind": "watchlist", "title": "Naruto", "preferred_source": ["animeflv"]}',
+     'Línea 2: preferred_source debe ser texto'),
+])
+def test_malformed_ndjson_line(app, line, error):
+    stream = io.BytesIO(b'{"kind": "library", "version": 1}\n' + line + b'\n')
+
+    assert LibraryService.read_entries(stream, 'ndjson') == (None, error)
+
+
+def test_ndjson_unknown_source_and_status_are_dropped(app):
+    line = b'{"kind": "watchlist", "slug": "naruto", "status": "rewatching", "preferred_source": "otra"}\n'
+    entries, _ = LibraryService.read_entries(io.BytesIO(line), 'ndjson')
+
+    assert entries[0]['status'] == 'plan_to_watch'
+    assert entries[0]['preferred_source'] is None
+
+
+def test_entry_limit(make_app):
+    app = make_app(LIBRARY_IMPORT_MAX_ENTRIES=2)
+    with app.app_context():
+        entries, error = LibraryService.read_entries(fixture_stream('mal.xml'), 'mal')
+
+    assert entries is None
+    assert '2 entradas' in error
+
+
+def test_matching_by_slug_then_title(user):
+    entries, _ = LibraryService.read_entries(fixture_stream('library.ndjson'), 'ndjson')
+
+    # Slug conocido (aunque el título no coincida), sin encontrar, y título sin distinguir mayúsculas
+    assert LibraryService.match_animes(entries) == [anime_id('naruto'), None, anime_id('shingeki-no-kyojin')]
+
+
+def test_matching_by_normalized_title(user):
+    entries, _ = LibraryService.read_entries(fixture_stream('mal.xml'), 'mal')
+
+    assert LibraryService.match_animes(entries) == [anime_id('shingeki-no-kyojin'), anime_id('one-piece'), None]
+
+
+def test_import_inserts_in_batches_and_reports_unmatched(user, app):
+    app.config['LIBRARY_IMPORT_BATCH_SIZE'] = 2
+    entries, _ = LibraryService.read_entries(fixture_stream('mal.xml'), 'mal')
+
+    progress = run_import(user, entries)
+
+    assert [step['stage'] for step in progress] == ['matching', 'importing', 'importing', 'done']
+    assert progress[-1]['created'] == 2
+    assert progress[-1]['unmatched'] == 1
+    assert progress[-1]['unmatched_titles'] == ['Serie Que No Existe']
+
+    one_piece = Watchlist.query.filter_by(user_id=user.id, anime_id=anime_id('one-piece')).one()
+    assert (one_piece.status, one_piece.last_episode, one_piece.notes) == ('watching', 1000, 'Muy larga')
+
+
+def test_import_favorites_and_duplicates(user):
+    entries, _ = LibraryService.read_entries(fixture_stream('library.ndjson'), 'ndjson')
+
+    done = run_import(user, entries + entries)[-1]
+
+    assert done['created'] == 2
+    assert done['skipped'] == 2  # repetidas en el propio archivo
+    assert Favorite.query.filter_by(user_id=user.id).one().anime_id == anime_id('shingeki-no-kyojin')
+
+
+def test_existing_entries_are_kept_without_overwrite(user):
+    db.session.add(Watchlist(user_id=user.id, anime_id=anime_id('naruto'), status='dropped', last_episode=3))
+    db.session.commit()
+    entries, _ = LibraryService.read_entries(fixture_stream('library.ndjson'), 'ndjson')
+
+    done = run_import(user, entries)[-1]
+
+    assert (done['created'], done['updated'], done['skipped']) == (1, 0, 1)
+    assert Watchlist.query.filter_by(user_id=user.id).one().status == 'dropped'
+
+
+def test_overwrite_updates_entries_and_resets_notifications(user):
+    naruto = anime_id('naruto')
+    db.session.add(Watchlist(user_id=user.id, anime_id=naruto, status='dropped', last_episode=3))
+    db.session.add(EpisodeNotification(user_id=user.id, anime_id=naruto, source='animeflv', unseen_count=1))
+    db.session.commit()
+    entries, _ = LibraryService.read_entries(fixture_stream('library.ndjson'), 'ndjson')
+
+    done = run_import(user, entries, overwrite=True)[-1]
+
+    assert done['updated'] == 1
+    row = Watchlist.query.filter_by(user_id=user.id, anime_id=naruto).one()
+    assert (row.status, row.last_episode, row.notes) == ('watching', 100, 'Relleno')
+    assert EpisodeNotification.query.filter_by(user_id=user.id).count() == 0
+
+
+def test_failed_batch_stops_with_an_error_stage(user, app, monkeypatch):
+    app.config['LIBRARY_IMPORT_BATCH_SIZE'] = 1
+    import_batch = LibraryService._import_batch
+    calls = []
+
+    def failing_second_batch(*args):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError('disco lleno')
+        return import_batch(*args)
+
+    monkeypatch.setattr(LibraryService, '_import_batch', staticmethod(failing_second_batch))
+    entries, _ = LibraryService.read_entries(fixture_stream('mal.xml'), 'mal')
+
+    progress = run_import(user, entries)
+
+    assert [step['stage'] for step in progress] == ['matching', 'importing', 'error']
+    assert progress[-1]['processed'] == 1
+    assert progress[-1]['created'] == 1
+    # El primer lote quedó guardado y el que falló se deshizo entero
+    assert Watchlist.query.filter_by(user_id=user.id).count() == 1
+
+
+def test_export_round_trip(user):
+    entries, _ = LibraryService.read_entries(fixture_stream('library.ndjson'), 'ndjson')
+    run_import(user, entries)
+
+    exported = ''.join(LibraryService.export_lines(user)).encode()
+    reread, error = LibraryService.read_entries(io.BytesIO(exported), 'ndjson')
+
+    assert error is None
+    assert [(entry['kind'], entry['slug']) for entry in reread] == [
+        ('watchlist', 'naruto'), ('favorite', 'shingeki-no-kyojin')
+    ]
+    assert reread[0]['notes'] == 'Relleno'
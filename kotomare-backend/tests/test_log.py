@@ -0,0 +1,26 @@
+import json
+import logging
+from app.utils.log import JsonFormatter, TextFormatter
+
+
+def make_record(**extra) -> logging.LogRecord:
+    record = logging.LogRecord('app.test', logging.WARNING, __file__, 1, 'Error obteniendo episodios', (), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_text_format_appends_extra_fields():
+    line = TextFormatter().format(make_record(anime_id=3, source='animeflv'))
+
+    assert line.endswith('WARNING app.test: Error obteniendo episodios anime_id=3 source=animeflv')
+
+
+def test_text_format_without_extra_fields():
+    assert TextFormatter().format(make_record()).endswith('app.test: Error obteniendo episodios')
+
+
+def test_json_format_includes_extra_fields():
+    data = json.loads(JsonFormatter().format(make_record(anime_id=3)))
+
+    assert data['msg'] == 'Error obteniendo episodios'
+    assert data['anime_id'] == 3
@@ -0,0 +1,32 @@
+from app.scrapers.mirrors import HEDGING, MirrorPool
+
+URLS = ['https://a.example', 'https://b.example', 'https://c.example']
+
+
+def test_unmeasured_mirrors_keep_the_config_order():
+    assert MirrorPool('fuente', URLS).ranked() == URLS
+
+
+def test_measured_mirrors_go_first_fastest_first():
+    pool = MirrorPool('fuente', URLS)
+    pool.record(URLS[2], 0.5, ok=True)
+    pool.record(URLS[1], 0.2, ok=True)
+
+    assert pool.ranked() == [URLS[1], URLS[2], URLS[0]]
+
+
+def test_failing_mirror_does_not_jump_ahead():
+    pool = MirrorPool('fuente', URLS[:2])
+    pool.record(URLS[1], 0.3, ok=True)
+    pool.record(URLS[0], 0.001, ok=False)  # p. ej. conexión rechazada al instante
+
+    assert pool.ranked() == [URLS[1], URLS[0]]
+
+
+def test_mirror_is_set_aside_after_repeated_failures():
+    pool = MirrorPool('fuente', URLS[:2])
+    pool.record(URLS[0], 0.1, ok=True)
+    for _ in range(HEDGING['max_failures']):
+        pool.record(URLS[0], 0.1, ok=False)
+
+    assert pool.ranked() == [URLS[1]]
@@ -0,0 +1,103 @@
+import random
+from types import SimpleNamespace
+import pytest
+from app.utils import rate_limit
+from app.utils.rate_limit import SlidingWindowLimiter, _client_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj controlado por el test para `rate_limit` (`clock.now`)"""
+    fake = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(rate_limit, 'time', SimpleNamespace(time=lambda: fake.now))
+    return fake
+
+
+def test_window_rollover_decays_the_previous_window(clock):
+    limiter = SlidingWindowLimiter(limit=2, window=10)
+
+    assert limiter.hit('a')[0] and limiter.hit('a')[0]
+    assert not limiter.hit('a')[0]
+
+    # Recién empezada la siguiente ventana la anterior aún pesa entera
+    clock.now = 1010.0
+    assert not limiter.hit('a')[0]
+
+    # A mitad de ventana pesa la mitad: cabe uno
+    clock.now = 1015.0
+    assert limiter.hit('a')[0]
+    assert not limiter.hit('a')[0]
+
+    # Dos ventanas después no queda nada de la primera
+    clock.now = 1030.0
+    assert limiter.hit('a')[0] and limiter.hit('a')[0]
+
+
+def test_keys_are_independent(clock):
+    limiter = SlidingWindowLimiter(limit=1, window=10)
+
+    assert limiter.hit('a')[0]
+    assert not limiter.hit('a')[0]
+    assert limiter.hit('b')[0]
+
+
+def test_retry_after_is_exactly_when_an_event_fits_again(clock):
+    rng = random.Random(0)
+    for _ in range(300):
+        limit, window = rng.randint(1, 6), 10.0
+        limiter = SlidingWindowLimiter(limit=limit, window=window)
+        clock.now = 1000.0 + rng.uniform(0, window)
+
+        # Llenar el presupuesto repartido entre la ventana anterior y la actual
+        for _ in range(rng.randint(limit, 3 * limit)):
+            clock.now += rng.uniform(0, window / limit)
+            limiter.hit('a')
+
+        allowed, retry_after = limiter.hit('a')
+        if allowed:
+            continue
+
+        start = clock.now
+        clock.now = start + max(0.0, retry_after - 0.01)
+        if retry_after > 0.01:
+            assert not limiter.hit('a')[0]
+        clock.now = start + retry_after + 1e-6
+        assert limiter.hit('a')[0]
+
+
+def test_429_carries_retry_after(make_app, clock):
+    app = make_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_CHEAP=2, RATE_LIMIT_WINDOW=60)
+    client = app.test_client()
+    clock.now = 6000.0  # inicio de ventana
+
+    assert client.get('/api/anime/batch?ids=1').status_code == 200
+    assert client.get('/api/anime/batch?ids=1').status_code == 200
+    clock.now = 6010.0
+    response = client.get('/api/anime/batch?ids=1')
+
+    # Hay que esperar a que acabe la ventana (50 s) y a que la llena pese la mitad (30 s)
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '80'
+    # Fuera del blueprint limitado no cuenta
+    assert client.get('/api/health').status_code == 200
+
+
+def client_key(app, forwarded: str, trusted_proxies: int) -> str:
+    with app.test_request_context(headers={'X-Forwarded-For': forwarded}, environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+        from flask import request
+        return _client_key(request, trusted_proxies)
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxies(app):
+    assert client_key(app, '1.2.3.4', 0) == 'ip:10.0.0.1'
+
+
+def test_spoofed_forwarded_for_entries_are_ignored(app):
+    # El cliente manda "6.6.6.6"; el proxy de confianza añade la IP real al final
+    assert client_key(app, '6.6.6.6, 203.0.113.7', 1) == 'ip:203.0.113.7'
+    assert client_key(app, '6.6.6.6, 203.0.113.7, 10.0.0.2', 2) == 'ip:203.0.113.7'
+
+
+def test_short_forwarded_for_falls_back_to_the_peer(app):
+    assert client_key(app, '', 1) == 'ip:10.0.0.1'
+    assert client_key(app, '203.0.113.7', 2) == 'ip:10.0.0.1'
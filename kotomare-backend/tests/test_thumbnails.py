@@ -0,0 +1,127 @@
+import io
+import socket
+import pytest
+from PIL import Image
+from app.extensions import thumbnails
+from app.utils import thumbnails as thumbnails_module
+from app.utils.thumbnails import _allowed_source
+
+COVER = 'https://cdn.animeflv.net/uploads/covers/1.jpg'
+
+
+@pytest.fixture
+def resolves_to(monkeypatch):
+    """Hace que cualquier host resuelva a las direcciones dadas"""
+    def set_addresses(*addresses):
+        def getaddrinfo(host, port, *args, **kwargs):
+            return [(socket.AF_INET6 if ':' in a else socket.AF_INET, socket.SOCK_STREAM, 6, '', (a, 443))
+                    for a in addresses]
+        monkeypatch.setattr(thumbnails_module.socket, 'getaddrinfo', getaddrinfo)
+    return set_addresses
+
+
+@pytest.mark.parametrize('address', [
+    '127.0.0.1', '10.0.0.5', '192.168.1.10', '172.16.0.1', '169.254.169.254', '0.0.0.0', '100.64.0.1',
+    '::1', 'fe80::1', 'fd00::1', '::ffff:127.0.0.1', '224.0.0.1',
+])
+def test_internal_addresses_are_rejected(resolves_to, address):
+    resolves_to(address)
+
+    assert not _allowed_source(COVER, ())
+
+
+def test_a_host_with_any_internal_address_is_rejected(resolves_to):
+    resolves_to('93.184.216.34', '127.0.0.1')
+
+    assert not _allowed_source(COVER, ())
+
+
+def test_public_hosts_are_allowed(resolves_to):
+    resolves_to('93.184.216.34', '2606:2800:220:1:248:1893:25c8:1946')
+
+    assert _allowed_source(COVER, ())
+    assert _allowed_source('http://cdn.animeflv.net:80/1.jpg', ())
+
+
+@pytest.mark.parametrize('url', [
+    'ftp://cdn.animeflv.net/1.jpg', 'file:///etc/passwd', '/uploads/1.jpg',
+    'https://cdn.animeflv.net:8080/1.jpg', 'https://cdn.animeflv.net:99999/1.jpg', 'https:///1.jpg',
+])
+def test_only_http_on_default_ports(resolves_to, url):
+    resolves_to('93.184.216.34')
+
+    assert not _allowed_source(url, ())
+
+
+def test_allowed_hosts(resolves_to):
+    resolves_to('93.184.216.34')
+
+    assert _allowed_source(COVER, ('animeflv.net',))
+    assert _allowed_source('https://animeflv.net/1.jpg', ('animeflv.net',))
+    assert not _allowed_source('https://evilanimeflv.net/1.jpg', ('animeflv.net',))
+    assert not _allowed_source('https://example.com/1.jpg', ('animeflv.net',))
+
+
+def test_unresolvable_hosts_are_rejected(monkeypatch):
+    def getaddrinfo(*args, **kwargs):
+        raise socket.gaierror('Name or service not known')
+    monkeypatch.setattr(thumbnails_module.socket, 'getaddrinfo', getaddrinfo)
+
+    assert not _allowed_source(COVER, ())
+
+
+@pytest.fixture
+def store(make_app, tmp_path, monkeypatch):
+    """Proxy de portadas en un directorio temporal con las descargas contadas"""
+    app = make_app(THUMBNAIL_CACHE_DIR=str(tmp_path))
+    fetches = []
+
+    def fetch(self, url):
+        fetches.append(url)
+        return store.source
+
+    monkeypatch.setattr(type(thumbnails), '_fetch', fetch)
+    with app.app_context():
+        store = thumbnails
+        store.fetches = fetches
+        yield store
+
+
+def png(width: int, height: int) -> bytes:
+    output = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(output, 'PNG')
+    return output.getvalue()
+
+
+def test_thumbnail_is_generated_once(store):
+    store.source = png(400, 600)
+
+    path, mimetype = store.get(COVER, 160)
+    assert mimetype == 'image/jpeg'
+    with Image.open(path) as image:
+        assert image.size == (160, 240)
+
+    assert store.get(COVER, 160) == (path, mimetype)
+    store.get(COVER, 320)  # otro ancho sale de la original ya guardada
+    assert store.fetches == [COVER]
+
+
+def test_failed_download_is_not_retried(store):
+    store.source = None
+
+    assert store.get(COVER, 160) is None
+    assert store.get(COVER, 320) is None
+    assert store.fetches == [COVER]
+
+
+def test_failed_resize_is_not_retried(store, monkeypatch):
+    # Empieza como un PNG (pasa el sniff) pero Pillow no lo puede decodificar
+    store.source = b'\x89PNG\r\n\x1a\n' + b'\x00' * 64
+    resizes = []
+    resize = type(store)._resize
+    monkeypatch.setattr(type(store), '_resize', lambda self, *args: resizes.append(1) or resize(self, *args))
+
+    assert store.get(COVER, 160) is None
+    assert store.get(COVER, 160) is None
+    assert store.get(COVER, 320) is None
+    assert len(resizes) == 1